@@ -0,0 +1,39 @@
+'''This script measures how long importing the spaceman3D packages takes in a fresh interpreter, and checks that the heavy
+optional dependencies (matplotlib and pandas) are not loaded until they are used. It exits with an error if one of them is
+loaded at import time, or if an import is slower than the (budget) in seconds.
+
+Usage:
+
+    python -m benchmarks.import_time [budget]
+'''
+import os
+import subprocess
+import sys
+
+MODULES = ('spaceman3D.Orbit', 'spaceman3D.Draw')
+LAZY_DEPENDENCIES = ('matplotlib', 'pandas')
+
+def import_time(module:str=None, repeat:int=5) -> tuple:
+    '''This function imports the (module) in (repeat) fresh interpreters, and returns the fastest import time in seconds with
+    the lazy dependencies that the import loaded.'''
+    code = ('import sys, time; start = time.perf_counter(); import {module}; seconds = time.perf_counter() - start; '
+            'print(seconds, *[name for name in {lazy} if name in sys.modules])').format(module=module, lazy=LAZY_DEPENDENCIES)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get('PYTHONPATH')))))
+    times, loaded = [], set()
+    for i in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True, env=env).stdout.split()
+        times.append(float(output[0]))
+        loaded.update(output[1:])
+    return min(times), sorted(loaded)
+
+def main(budget:float=None):
+    failed = False
+    for module in MODULES:
+        seconds, loaded = import_time(module)
+        print(f'{module:>18}: {seconds*1000:8.1f} ms  loaded: {", ".join(loaded) or "-"}')
+        failed |= bool(loaded) or (budget is not None and seconds > budget)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main(*(float(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,34 @@
+'''This script measures the throughput of the Propagator backends, in satellite-timesteps per second, on a synthetic catalog
+built by repeating the sample TLEs of spaceman3D.Orbit.satellites.
+
+Usage:
+
+    python -m benchmarks.propagation [satellites] [timesteps] [workers]
+'''
+import sys
+import timeit
+import numpy as np
+from spaceman3D.Orbit import ElementSet, Propagator, satellites
+
+def synthetic_catalog(size:int=1000) -> ElementSet:
+    '''This function builds an ElementSet of (size) element sets by repeating the sample TLEs, with the mean anomalies spread
+    out so the satellites are not all in the same place.'''
+    catalog = '\n'.join((satellites.ISS, satellites.Dragon, satellites.chinasat))
+    sample = ElementSet.from_bytes(catalog.encode('ascii'))
+    index = np.arange(size) % len(sample)
+    data = sample.data[index]
+    data['mean_anomaly'] = np.linspace(0, 360, size, endpoint=False)
+    return ElementSet(data=data, titles=sample.titles[index])
+
+def main(size:int=1000, timesteps:int=1440, workers:int=None, repeat:int=3):
+    elements = synthetic_catalog(size)
+    times = np.arange(timesteps) * 60.0
+    print(f'{size} satellites x {timesteps} timesteps, {workers or 1} worker(s)')
+    for backend in Propagator.backends:
+        propagator = Propagator(elements, backend=backend)
+        seconds = min(timeit.repeat(lambda: propagator.propagate(times, since_epoch=True, workers=workers), number=1, repeat=repeat))
+        print(f'{backend:>8}: {seconds:8.3f} s  {size*timesteps/seconds:14,.0f} satellite-timesteps/s')
+    return
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:4]))
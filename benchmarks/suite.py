@@ -0,0 +1,167 @@
+'''This script runs the benchmark suite of the hot paths of spaceman3D (TLE parsing, Kepler's equation, propagation, and drawing)
+on synthetic catalogs built from the sample TLEs of spaceman3D.Orbit.satellites, and compares the throughput of each benchmark,
+in items per second, with the baselines stored in benchmarks/baselines.json. A benchmark regresses when its throughput drops
+below its baseline divided by the (tolerance), in which case the script exits with an error. The baselines are machine
+specific, so they should be saved again (with --save) on the machine the comparisons are run on.
+
+Usage:
+
+    python -m benchmarks.suite [--save] [--tolerance 1.5] [--repeat 3] [name ...]
+'''
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+import numpy as np
+from spaceman3D.Orbit import TLE, ElementSet, Propagator, satellites, solve_kepler
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+SAMPLES = (satellites.ISS, satellites.Dragon, satellites.Dragon_Demo, satellites.chinasat)
+BENCHMARKS = {}
+
+def benchmark(name:str=None, unit:str=None):
+    '''This decorator registers a benchmark under its (name). The decorated function prepares the benchmark, and returns the
+    function to time with the number of (unit) items each call of it processes.'''
+    def register(setup):
+        BENCHMARKS[name] = (setup, unit)
+        return setup
+    return register
+
+def synthetic_tles(size:int=1000) -> str:
+    '''This function builds a 3-line catalog of (size) valid TLEs by repeating the sample TLEs, with unique satellite numbers, the
+    mean anomalies spread out so the satellites are not all in the same place, and the checksums recalculated.'''
+    assert 0 < size < 100000, 'The (size) parameter must be between 1 and 99999, the range of the satellite numbers of a TLE.'
+    parser = TLE()
+    lines = []
+    for number in range(1, size + 1):
+        title, line1, line2 = SAMPLES[number % len(SAMPLES)].split('\n')
+        line1 = f'{line1[:2]}{number:05d}{line1[7:68]}'
+        line2 = f'{line2[:2]}{number:05d}{line2[7:43]}{360.0 * number / size % 360:8.4f}{line2[51:68]}'
+        lines += [f'{title[:16]} {number}', line1 + parser.tle_checksum_algortithm(line1 + '0'), line2 + parser.tle_checksum_algortithm(line2 + '0')]
+    return '\n'.join(lines) + '\n'
+
+def synthetic_elements(size:int=1000) -> ElementSet:
+    '''This function parses the synthetic catalog of the synthetic_tles() function into an ElementSet.'''
+    return ElementSet.from_bytes(synthetic_tles(size).encode('ascii'))
+
+#################### Parsing ####################
+
+@benchmark('parse_single', 'TLEs')
+def parse_single():
+    parser = TLE()
+    title, line1, line2 = satellites.ISS.split('\n')
+    return lambda: [parser.record_from_lines(title, line1, line2) for i in range(1000)], 1000
+
+@benchmark('parse_catalog', 'TLEs')
+def parse_catalog(size:int=10000):
+    catalog = synthetic_tles(size).encode('ascii')
+    return lambda: ElementSet.from_bytes(catalog), size
+
+@benchmark('parse_catalog_stream', 'TLEs')
+def parse_catalog_stream(size:int=10000):
+    import io
+    catalog = synthetic_tles(size).encode('ascii')
+    return lambda: sum(1 for record in TLE().read_catalog(io.BytesIO(catalog))), size
+
+#################### Kepler ####################
+
+@benchmark('kepler_solve', 'solutions')
+def kepler_solve(size:int=1000000):
+    generator = np.random.default_rng(0)
+    mean_anomaly = generator.uniform(0, 2*np.pi, size)
+    eccentricity = generator.uniform(0, 0.9, size)
+    return lambda: solve_kepler(mean_anomaly, eccentricity), size
+
+#################### Propagation ####################
+
+def propagation(backend:str=None, size:int=1000, timesteps:int=1440):
+    propagator = Propagator(synthetic_elements(size), backend=backend)
+    times = np.arange(timesteps) * 60.0
+    return lambda: propagator.propagate(times, since_epoch=True), size * timesteps
+
+@benchmark('propagate_kepler', 'satellite-timesteps')
+def propagate_kepler():
+    return propagation('kepler')
+
+@benchmark('propagate_sgp4', 'satellite-timesteps')
+def propagate_sgp4():
+    return propagation('sgp4')
+
+#################### Drawing ####################
+
+def render(size:int=1):
+    import matplotlib
+    matplotlib.use('Agg')
+    from spaceman3D.Draw.draw import Draw, pyplot
+    elements = synthetic_elements(size)
+    time = elements.epoch_datetime64()[0]
+    def draw():
+        drawing = Draw()
+        drawing.draw_catalog(elements, time=time, show=False)
+        drawing.fig.canvas.draw()
+        pyplot().close(drawing.fig)
+    return draw, size
+
+@benchmark('draw_1', 'satellites')
+def draw_1():
+    return render(1)
+
+@benchmark('draw_100', 'satellites')
+def draw_100():
+    return render(100)
+
+@benchmark('draw_10000', 'satellites')
+def draw_10000():
+    return render(10000)
+
+#################### Suite ####################
+
+def run(name:str=None, repeat:int=3) -> float:
+    '''This function runs a benchmark (repeat) times, and returns its best throughput in items per second.'''
+    function, items = BENCHMARKS[name][0]()
+    function()
+    return items / min(timeit.repeat(function, number=1, repeat=repeat))
+
+def compare(results:dict=None, baselines:dict=None, tolerance:float=1.5) -> list:
+    '''This function compares the throughputs of the (results) with the (baselines), and returns the names of the benchmarks
+    whose throughput dropped below their baseline divided by the (tolerance).'''
+    return [name for name, rate in results.items() if name in baselines and rate < baselines[name] / tolerance]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs the spaceman3D benchmark suite.')
+    parser.add_argument('names', nargs='*', help='The benchmarks to run. By default every benchmark is run.')
+    parser.add_argument('--save', action='store_true', help='Store the results as the new baselines.')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='The slowdown factor that counts as a regression.')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of times each benchmark is timed.')
+    arguments = parser.parse_args(argv)
+    unknown = set(arguments.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'Unknown benchmarks: {", ".join(sorted(unknown))}. The benchmarks are: {", ".join(BENCHMARKS)}.')
+
+    stored = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as file:
+            stored = json.load(file)
+    baselines = stored.get('results', {})
+    results = {}
+    for name in arguments.names or BENCHMARKS:
+        results[name] = run(name, repeat=arguments.repeat)
+        change = f'{results[name] / baselines[name]:6.2f}x baseline' if name in baselines else 'no baseline'
+        print(f'{name:>22}: {results[name]:16,.0f} {BENCHMARKS[name][1]}/s  {change}')
+
+    if arguments.save:
+        stored = {'machine': {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                              'processor': platform.machine()},
+                  'results': dict(baselines, **{name: round(rate, 1) for name, rate in results.items()})}
+        with open(BASELINES, 'w') as file:
+            json.dump(stored, file, indent=2)
+        return
+    regressions = compare(results, baselines, arguments.tolerance)
+    if regressions:
+        print(f'Regressions (slower than the baseline by more than {arguments.tolerance}x): {", ".join(regressions)}')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 # __init__.py
 from .draw import *
+from .render import *
 
-__all__ = ['draw']
+__all__ = ['draw', 'render']
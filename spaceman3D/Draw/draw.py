@@ -1,54 +1,99 @@
-from spaceman3D.Orbit import Orbital
+from spaceman3D.Orbit import Orbital, Propagator, units
+from spaceman3D.Orbit.groundtrack import ground_track
+from spaceman3D.Orbit.orbit import to_datetime64
 import spaceman3D.Orbit.astronomical_objects as a
-import matplotlib.pyplot as plt
-plt.style.use('dark_background')
-from mpl_toolkits.mplot3d import Axes3D
-from mpltools import layout
 import numpy as np
+from datetime import datetime
+from functools import lru_cache, wraps
+import pytz as tz
+
+def pyplot():
+    '''This function imports and returns matplotlib's pyplot module. Matplotlib is only imported the first time a figure is
+    needed, so importing spaceman3D does not pay for loading a plotting backend.
+
+    :returns: The matplotlib.pyplot module.
+    '''
+    import matplotlib.pyplot as plt
+    return plt
+
+def styled(method):
+    '''This decorator runs a drawing method of the Draw class within the dark background style context, so the artists it draws
+    take their default colors from the style without the style being applied to the other figures of the program.'''
+    @wraps(method)
+    def draw(*args, **kwargs):
+        with pyplot().style.context('dark_background'):
+            return method(*args, **kwargs)
+    return draw
+
+@lru_cache(maxsize=32)
+def body_mesh(body:str='Earth', resolution:int=100, radius:float=None) -> tuple:
+    '''This function builds the (resolution x resolution) surface mesh of a celestial body's sphere. The meshes are cached per
+    body, resolution and radius, so a body is only meshed once however many times it is drawn. The returned arrays are read-only.
+
+    :param body: The name of the celestial body.
+    :param resolution: The number of points along each of the two spherical angles.
+    :param radius: The radius of the sphere, which defaults to the radius of the body.
+    :returns: The x, y and z coordinates of the mesh, as (resolution, resolution) arrays.
+    '''
+    radius = a.objects[str(body)]['radius'] if radius is None else radius
+    phi = np.linspace(0, 2*np.pi, resolution)
+    theta = np.linspace(0, np.pi, resolution)
+    mesh = (radius * np.outer(np.cos(phi), np.sin(theta)),
+            radius * np.outer(np.sin(phi), np.sin(theta)),
+            radius * np.outer(np.ones_like(phi), np.cos(theta)))
+    for coordinates in mesh:
+        coordinates.flags.writeable = False
+    return mesh
 
 class Draw(object):
 
     def __init__(self):
+        self._fig = None
+        self._ax = None
         return
 
-    fig = plt.figure(figsize=layout.figaspect(1))
-    ax = fig.add_subplot(111, projection='3d')
+    @property
+    def fig(self):
+        '''The figure of the Draw instance, which is only created the first time it is used. The figure is styled with the
+        dark background style within a style context, so the style of the other figures of the program is left as it is.'''
+        if self._fig is None:
+            plt = pyplot()
+            with plt.style.context('dark_background'):
+                self._fig = plt.figure(figsize=plt.figaspect(1))
+                self._ax = self._fig.add_subplot(111, projection='3d')
+        return self._fig
+
+    @property
+    def ax(self):
+        '''The 3D axes of the Draw instance, which are only created the first time they are used.'''
+        if self._ax is None:
+            self.fig
+        return self._ax
 
     def plot_earth(self,radius):
-        '''This function plots a celestial body at the origin of the plot.
+        '''This function returns the mesh of a sphere of the (radius) at the origin of the plot, from the cached meshes of the
+        body_mesh() function. The arrays are read-only.
         :param radius: Takes the radius of a celestial body
         :returns: angular coordinates
         '''
-
-        coefs = (1, 1, 1)
-        rx, ry, rz = [radius/np.sqrt(coef) for coef in coefs]
-
-        # Azimuth Angle & Altitude in Spherical Coordinates
-        phi = np.linspace(0, 2*np.pi, 100)
-        theta = np.linspace(0, np.pi, 100)
-
-        # Spherical Angles
-        x = rx * np.outer(np.cos(phi), np.sin(theta))
-        y = ry * np.outer(np.sin(phi), np.sin(theta))
-        z = rz * np.outer(np.ones_like(phi), np.cos(theta))
-        return x,y,z
+        return body_mesh(radius=float(radius))
 
     def orientation(self, inclination=0, right_ascension=0, argument_periapsis=0):
         '''This function defines the rotational matricies used to orient the ellipse.'''
-        i = Orbital().degree_to_radian(inclination)
-        R = np.matrix([[1, 0, 0],
-                       [0, np.cos(i), -np.sin(i)],
-                       [0, np.sin(i), np.cos(i)]])
-
-        w_omega = Orbital().degree_to_radian(right_ascension)
-        R2 = np.matrix([[np.cos(w_omega), -np.sin(w_omega), 0],
-                        [np.sin(w_omega), np.cos(w_omega), 0],
-                        [0, 0, 1]])
-
-        omega = Orbital().degree_to_radian(argument_periapsis)
-        R3 = np.matrix([[np.cos(omega), -np.sin(omega), 0],
-                        [np.sin(omega), np.cos(omega), 0],
-                        [0, 0, 1]])
+        i = units.degree_to_radian(inclination)
+        R = np.array([[1, 0, 0],
+                      [0, np.cos(i), -np.sin(i)],
+                      [0, np.sin(i), np.cos(i)]])
+
+        w_omega = units.degree_to_radian(right_ascension)
+        R2 = np.array([[np.cos(w_omega), -np.sin(w_omega), 0],
+                       [np.sin(w_omega), np.cos(w_omega), 0],
+                       [0, 0, 1]])
+
+        omega = units.degree_to_radian(argument_periapsis)
+        R3 = np.array([[np.cos(omega), -np.sin(omega), 0],
+                       [np.sin(omega), np.cos(omega), 0],
+                       [0, 0, 1]])
         return R, R2, R3
 
     def polar_equation_of_ellipse(self,semi_major_axis,eccentricity,theta):
@@ -61,40 +106,63 @@ class Draw(object):
 
     def define_orbit(self,semi_major_axis=0, eccentricity=0, inclination=0,
                     right_ascension=0, argument_periapsis=0,theta=0,define_orbit=True):
-        '''This function takes the orbital elements and uses them to define the Elliptical orbit in 3-Dimensions'''
+        '''This function takes the orbital elements and uses them to define the Elliptical orbit in 3-Dimensions. The points
+        at the true anomalies (theta) are rotated out of the orbit plane by the argument of periapsis, the inclination and then the
+        right ascension, and are returned as a (3, K) array. The (define_orbit) parameter is kept for compatibility.'''
         R, R2, R3 = self.orientation(inclination,right_ascension,argument_periapsis)
-        r, polar_x, polar_y, polar_z = self.polar_equation_of_ellipse(semi_major_axis,eccentricity,theta)
-        if define_orbit is True:
-            points = np.matrix(list(zip(polar_x,polar_y,polar_z)))
-        else:
-            points = np.matrix([polar_x,polar_y,polar_z])
-        pts =  (R * R2 * R3 * points.T)
-        return pts
+        r, polar_x, polar_y, polar_z = self.polar_equation_of_ellipse(semi_major_axis,eccentricity,np.atleast_1d(theta))
+        points = np.stack((polar_x, polar_y, polar_z))
+        return R2 @ R @ R3 @ points
 
+    @styled
     def plot_orbit(self,semi_major_axis=0, eccentricity=0, inclination=0,right_ascension=0, argument_periapsis=0,
                     true_anomaly=0, label=None, object=None):
         "Draws orbit around an earth in units of kilometers."
 
         #Plot Earth
-        x,y,z = self.plot_earth(radius=a.objects[str(object)]['radius'])
-        self.ax.plot_surface(x, y, z, rstride=4, cstride=4, alpha=0.4, color=a.objects[str(object)]['color'])
-        self.ax.set_axis_off()
+        self.plot_body(object)
 
         #Plot Orbit
         theta = np.linspace(0,2*np.pi,360)
-        pts = self.define_orbit(semi_major_axis, eccentricity, inclination, right_ascension, argument_periapsis, theta)
-        orbit_pts = pts.T
-        xr,yr,zr = orbit_pts[:,0].A.flatten(), orbit_pts[:,1].A.flatten(), orbit_pts[:,2].A.flatten()
+        xr, yr, zr = self.define_orbit(semi_major_axis, eccentricity, inclination, right_ascension, argument_periapsis, theta)
         self.ax.plot(xr, yr, zr, color='g', linestyle='-')
 
         # Plot Satellite
-        sat_angle = Orbital().degree_to_radian(true_anomaly)
+        sat_angle = units.degree_to_radian(true_anomaly)
         sat = self.define_orbit(semi_major_axis,eccentricity,inclination,right_ascension,argument_periapsis,sat_angle,define_orbit=False)
-        sat = sat.flatten()
-        satx, saty, satz = sat[0,0], sat[0,1], sat[0,2]
+        satx, saty, satz = sat[:, 0]
         self.ax.plot([0, satx], [0, saty], [0, satz], 'b-')
         self.ax.plot([satx],[saty],[satz], 'bo')
 
+        self.plot_axes()
+
+        # Write satellite name next to it
+        if label is not None:
+            self.ax.text(satx, saty, satz, label, fontsize=11)
+
+        #radius = np.sqrt(satx**2 + saty**2 + satz**2)
+        #polar = np.arccos(satz/radius)
+        #lon = o.degree_to_radian(polar-90)
+        #lat = o.degree_to_radian(np.arctan2(saty, satx))
+
+        #Lat = o.radian_to_degree(lat)
+        #Lon = o.radian_to_degree(lon)
+        #print("----------------------------------------------------------------------------------------")
+        #print("{} : Projected Lat: {}° Long: {}°".format(label, Lat, Lon))
+
+    @styled
+    def plot_body(self, object=None, resolution=100):
+        '''This function plots the surface of the celestial body at the origin of the plot, using the cached mesh of the body.
+        :param object: The name of the celestial body.
+        :param resolution: The resolution of the body's mesh.
+        '''
+        x,y,z = body_mesh(str(object), resolution)
+        self.ax.plot_surface(x, y, z, rstride=4, cstride=4, alpha=0.4, color=a.objects[str(object)]['color'])
+        self.ax.set_axis_off()
+
+    @styled
+    def plot_axes(self):
+        '''This function plots the X, Y and Z axis markers of the plot.'''
         #Create X-axis Marker
         self.ax.plot([0,7500],[0,0],[0,0],'r:')
         self.ax.plot([7500],[0],[0],'r<')
@@ -115,31 +183,169 @@ class Draw(object):
         self.ax.plot([0],[0],[7500],'m<')
         self.ax.text(0,0,7510,s='axis', fontsize=10,color='w')
 
-        # Write satellite name next to it
-        if label is not None:
-            self.ax.text(satx, saty, satz, label, fontsize=11)
-
-        #radius = np.sqrt(satx**2 + saty**2 + satz**2)
-        #polar = np.arccos(satz/radius)
-        #lon = o.degree_to_radian(polar-90)
-        #lat = o.degree_to_radian(np.arctan2(saty, satx))
-
-        #Lat = o.radian_to_degree(lat)
-        #Lon = o.radian_to_degree(lon)
-        #print("----------------------------------------------------------------------------------------")
-        #print("{} : Projected Lat: {}° Long: {}°".format(label, Lat, Lon))
-
-    def draw_orbit(self, *argv, object):
-        '''This function calls the plot orbit function using the TLE elements defined in orbit.py'''
+    @styled
+    def draw_orbit(self, *argv, object, time=None):
+        '''This function calls the plot orbit function using the TLE elements defined in orbit.py. The satellites are drawn
+        at their positions at the (time), which defaults to the current UTC time.'''
+        if time is None:
+            time = datetime.now(tz.utc)
         o=Orbital()
         semi_major_axes = []
         for arg in argv:
             o.import_tle(tle=arg)
             semi_major_axis = o.semi_major_axis_calc()
             semi_major_axes.append(semi_major_axis)
-            true_anomaly = o.anomoly_calc()
+            true_anomaly = o.anomoly_calc(time)
             self.plot_orbit(semi_major_axis, o.eccentricity, o.inclination, o.right_ascension,
                             o.argument_periapsis,true_anomaly, o.title, object=object)
         max_axis = max(semi_major_axes)
         self.ax.auto_scale_xyz([-max_axis,max_axis],[-max_axis,max_axis],[-max_axis,max_axis])
-        plt.show()
+        pyplot().show()
+
+    def label_indices(self, count:int=0, max_labels:int=20) -> np.ndarray:
+        '''This function decimates the labels of a catalog, by picking at most (max_labels) satellites spread evenly over it.
+        :param count: The number of satellites in the catalog.
+        :param max_labels: The maximum number of labels to draw.
+        :returns: The indices of the satellites to label.
+        '''
+        if count == 0 or max_labels is None or max_labels <= 0:
+            return np.zeros(0, dtype=int)
+        return np.unique(np.linspace(0, count - 1, min(count, max_labels)).round().astype(int))
+
+    @styled
+    def draw_catalog(self, elements=None, time=None, object='Earth', backend='kepler', samples=180, max_labels=20, show=True):
+        '''This function draws a whole catalog of satellites at the (time). All of the satellites are drawn as a single scatter
+        collection and all of their orbits as a single Line3DCollection, so the number of artists does not grow with the size of
+        the catalog, and only up to (max_labels) satellites, spread evenly over the catalog, are labeled.
+        :param elements: An ElementSet, a TLE, or a list of TLEs.
+        :param time: The time to draw the satellites at, which defaults to the current UTC time.
+        :param object: The name of the celestial body that the satellites are orbiting.
+        :param backend: The propagation backend, either 'kepler' or 'sgp4'.
+        :param samples: The number of points on each orbit.
+        :param max_labels: The maximum number of satellite labels to draw.
+        :param show: If this is True, the plot is shown in a window.
+        :returns: The scatter collection of the satellites and the line collection of their orbits.
+        '''
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+        if time is None:
+            time = datetime.now(tz.utc)
+        propagator = Propagator(elements, body=object, backend=backend)
+        positions = propagator.propagate(to_datetime64(time).reshape(1), velocity=False)[:, 0]
+
+        self.plot_body(object)
+        self.plot_axes()
+        paths = self.orbit_paths(propagator, samples=samples)
+        self.orbits = Line3DCollection(paths, colors='g', linewidths=0.5)
+        self.ax.add_collection3d(self.orbits)
+        self.satellites = self.ax.scatter(positions[:, 0], positions[:, 1], positions[:, 2], s=6, c='b', depthshade=False)
+        titles = propagator.elements.titles
+        for i in self.label_indices(len(positions), max_labels):
+            self.ax.text(positions[i, 0], positions[i, 1], positions[i, 2], titles[i], fontsize=8)
+
+        max_axis = np.nanmax(np.abs(paths)) if paths.size else 1
+        self.ax.auto_scale_xyz([-max_axis,max_axis],[-max_axis,max_axis],[-max_axis,max_axis])
+        if show is True:
+            pyplot().show()
+        return self.satellites, self.orbits
+
+    def orbit_paths(self, propagator=None, samples:int=360, adaptive:bool=True):
+        '''This function samples the orbit ellipse of every satellite of a Propagator, with the points concentrated near the
+        perigee of eccentric orbits when (adaptive) is True. See the orbit_geometry() function of the propagator module.
+        :param propagator: The Propagator of the satellites.
+        :param samples: The number of points on each orbit.
+        :param adaptive: If this is True, the points are concentrated near the perigee.
+        :returns: The points of the orbits, as an (N, samples, 3) array.
+        '''
+        return propagator.orbit_geometry(samples=samples, adaptive=adaptive)
+
+    @styled
+    def animate(self, elements=None, times=None, object='Earth', backend='kepler', since_epoch=False, interval=50, show=True):
+        '''This function animates a catalog of satellites moving along their orbits. The celestial body, the axis markers and
+        the orbits of all of the satellites (as a single Line3DCollection, as in draw_catalog()) are drawn once as static artists,
+        and the satellites are propagated to the time of every frame at once with the Propagator. Each frame then only moves the single marker artist holding all of the satellites with
+        set_data_3d(), so hundreds of satellites can be animated at interactive frame rates.
+        :param elements: An ElementSet, a TLE, or a list of TLEs.
+        :param times: The time of each frame. See Propagator().propagate().
+        :param object: The name of the celestial body that the satellites are orbiting.
+        :param backend: The propagation backend, either 'kepler' or 'sgp4'.
+        :param since_epoch: If this is True, the (times) are seconds since each satellite's epoch.
+        :param interval: The delay between frames in milliseconds.
+        :param show: If this is True, the animation is shown in a window.
+        :returns: The matplotlib FuncAnimation.
+        '''
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+        propagator = Propagator(elements, body=object, backend=backend)
+        self.frames = propagator.propagate(times, since_epoch=since_epoch, velocity=False)
+
+        self.plot_body(object)
+        self.plot_axes()
+        paths = self.orbit_paths(propagator)
+        self.orbits = Line3DCollection(paths, colors='g', linewidths=0.5)
+        self.ax.add_collection3d(self.orbits)
+        self.markers, = self.ax.plot([], [], [], 'bo', markersize=3, linestyle='')
+        self.animation_frame(0)
+        max_axis = np.nanmax(np.abs(paths))
+        self.ax.auto_scale_xyz([-max_axis,max_axis],[-max_axis,max_axis],[-max_axis,max_axis])
+
+        from matplotlib.animation import FuncAnimation
+        self.animation = FuncAnimation(self.fig, self.animation_frame, frames=self.frames.shape[1], interval=interval)
+        if show is True:
+            pyplot().show()
+        return self.animation
+
+    def animation_frame(self, frame=0):
+        '''This function moves the satellite markers of the animation to their positions at the (frame).
+        :param frame: The index of the frame.
+        :returns: The updated marker artist.
+        '''
+        positions = self.frames[:, frame]
+        self.markers.set_data_3d(positions[:, 0], positions[:, 1], positions[:, 2])
+        return self.markers,
+
+    def ground_track_lines(self, latitude=None, longitude=None) -> tuple:
+        '''This function joins the ground tracks of a catalog into a single line, with NaN points separating the satellites and
+        breaking each track where it wraps around the antimeridian, so that the whole catalog can be drawn as one artist.
+        :param latitude: The latitudes of the ground tracks (degrees), as an (N, M) array.
+        :param longitude: The longitudes of the ground tracks (degrees), as an (N, M) array.
+        :returns: The longitudes and latitudes of the line, as flat arrays.
+        '''
+        latitude, longitude = np.atleast_2d(latitude, longitude)
+        wraps = np.abs(np.diff(longitude, axis=1)) > 180
+        breaks = np.concatenate((wraps, np.ones((len(longitude), 1), dtype=bool)), axis=1)
+        size = longitude.size + np.count_nonzero(breaks)
+        # Every point is shifted along by the number of breaks before it, leaving a NaN after each break.
+        index = np.arange(longitude.size) + np.concatenate(([0], np.cumsum(breaks.ravel())[:-1]))
+        x, y = np.full(size, np.nan), np.full(size, np.nan)
+        x[index], y[index] = longitude.ravel(), latitude.ravel()
+        return x, y
+
+    @styled
+    def draw_ground_track(self, elements=None, times=None, backend='sgp4', max_labels=20, show=True):
+        '''This function draws the ground tracks of a catalog of satellites over the (times) on a flat longitude/latitude map,
+        in a 2D figure of its own. The tracks of every satellite are drawn as a single line artist, and the sub-satellite point of
+        each satellite at the last time is marked, with up to (max_labels) satellites labeled.
+        :param elements: An ElementSet, a TLE, or a list of TLEs.
+        :param times: The times of the ground tracks, as an array of NumPy datetime64 values.
+        :param backend: The propagation backend, either 'sgp4' or 'kepler'.
+        :param max_labels: The maximum number of satellite labels to draw.
+        :param show: If this is True, the plot is shown in a window.
+        :returns: The line artist of the ground tracks.
+        '''
+        plt = pyplot()
+        propagator = Propagator(elements, backend=backend)
+        latitude, longitude, altitude = ground_track(propagator, times)
+
+        self.track_fig, self.track_ax = plt.subplots(figsize=(10, 5))
+        x, y = self.ground_track_lines(latitude, longitude)
+        self.tracks, = self.track_ax.plot(x, y, color='g', linewidth=0.5)
+        self.track_ax.plot(longitude[:, -1], latitude[:, -1], 'bo', markersize=3, linestyle='')
+        titles = propagator.elements.titles
+        for i in self.label_indices(len(latitude), max_labels):
+            self.track_ax.text(longitude[i, -1], latitude[i, -1], titles[i], fontsize=8)
+        self.track_ax.set_xlim(-180, 180)
+        self.track_ax.set_ylim(-90, 90)
+        self.track_ax.set_xlabel('Longitude (degrees)')
+        self.track_ax.set_ylabel('Latitude (degrees)')
+        if show is True:
+            plt.show()
+        return self.tracks
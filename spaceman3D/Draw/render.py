@@ -0,0 +1,158 @@
+import io
+import os
+from datetime import datetime
+import numpy as np
+import pytz as tz
+from spaceman3D.Orbit import Propagator
+from spaceman3D.Orbit.orbit import to_datetime64
+from spaceman3D.Orbit.astronomical_objects import objects
+from spaceman3D.Draw.draw import body_mesh
+
+class Renderer(object):
+    '''This class renders satellites off-screen into image files or in-memory buffers, without opening a window. The figure is
+    drawn on a Matplotlib Agg canvas created directly (so no pyplot backend is involved, and nothing ever blocks on
+    plt.show()), and it is reused between frames: the celestial body and the axis markers are drawn once, and each frame only
+    replaces the orbits, the satellite markers, and the title.
+
+    Frames can be rendered as one thumbnail per satellite with the thumbnails() method, or as one frame per time with the
+    time_series() method. Both accept a (workers) parameter to fan the frames out over a process pool, where each worker renders
+    its share of the frames with its own Renderer.
+
+    Example:
+
+        renderer = Renderer(format='png')
+        renderer.thumbnails(ElementSet.from_file('active.txt'), directory='thumbnails', workers=8)
+    '''
+
+    formats = ('png', 'svg')
+
+    def __init__(self, object:str='Earth', backend:str='kepler', format:str='png', size:tuple=(4, 4), dpi:int=100, samples:int=180):
+        assert format in self.formats, f'The (format) parameter must be one of {self.formats}. Please check the value passed in for (format).'
+        self.options = dict(object=object, backend=backend, format=format, size=size, dpi=dpi, samples=samples)
+        self.object = object
+        self.backend = backend
+        self.format = format
+        self.samples = samples
+        self.fig = None
+        return
+
+    def setup(self):
+        '''This function creates the figure on an Agg canvas, and draws the static artists (the celestial body and the axis
+        markers) that every frame shares. It is called by the first frame that is rendered.'''
+        from matplotlib import style
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+        with style.context('dark_background'):
+            self.fig = Figure(figsize=self.options['size'], dpi=self.options['dpi'])
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot(111, projection='3d')
+            x, y, z = body_mesh(self.object, 50)
+            self.ax.plot_surface(x, y, z, rstride=2, cstride=2, alpha=0.4, color=objects[str(self.object)]['color'])
+            self.ax.set_axis_off()
+            for axis in np.eye(3) * 7500:
+                self.ax.plot([0, axis[0]], [0, axis[1]], [0, axis[2]], 'r:')
+            self.orbits = Line3DCollection([np.zeros((2, 3))], colors='g', linewidths=0.8)
+            self.ax.add_collection3d(self.orbits)
+            self.markers, = self.ax.plot([], [], [], 'bo', markersize=4, linestyle='')
+            self.title = self.ax.set_title('', fontsize=9)
+        return
+
+    def render_frame(self, paths=None, positions=None, title:str='', target=None):
+        '''This function renders a single frame, by updating the orbits, satellite markers and title of the reused figure, and
+        saves it into the (target).
+
+        :param paths: The points of the orbits to draw, as an (N, K, 3) array.
+        :param positions: The positions of the satellites, as an (N, 3) array.
+        :param title: The title of the frame.
+        :param target: A file path to write the frame to. If it is None, the frame is returned in an in-memory buffer.
+        :return: The file path, or the io.BytesIO buffer holding the frame.
+        '''
+        if self.fig is None:
+            self.setup()
+        self.orbits.set_segments(list(paths))
+        self.markers.set_data_3d(positions[:, 0], positions[:, 1], positions[:, 2])
+        self.title.set_text(title)
+        extent = np.nanmax(np.abs(paths)) if np.size(paths) else 1
+        self.ax.auto_scale_xyz([-extent, extent], [-extent, extent], [-extent, extent])
+
+        output = io.BytesIO() if target is None else target
+        self.fig.savefig(output, format=self.format, facecolor=self.fig.get_facecolor())
+        if target is None:
+            output.seek(0)
+        return output
+
+    def render_frames(self, frames=None, targets=None) -> list:
+        '''This function renders a list of (paths, positions, title) frames into the matching (targets). See render_frame().'''
+        return [self.render_frame(paths, positions, title, target) for (paths, positions, title), target in zip(frames, targets)]
+
+    def render(self, frames=None, targets=None, workers:int=None) -> list:
+        '''This function renders the (frames) into the (targets), either in the current process, or split into one contiguous
+        chunk of frames per worker process when (workers) is more than one.
+
+        :param frames: The list of (paths, positions, title) frames.
+        :param targets: The list of file paths, or None for in-memory buffers, matching the frames.
+        :param workers: The number of worker processes.
+        :return: The list of file paths or io.BytesIO buffers of the frames.
+        '''
+        if workers is None or workers <= 1 or len(frames) <= 1:
+            return self.render_frames(frames, targets)
+        from concurrent.futures import ProcessPoolExecutor
+        bounds = np.linspace(0, len(frames), min(workers, len(frames)) + 1).astype(int)
+        chunks = [(self.options, frames[start:stop], targets[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            results = [output for chunk in pool.map(_render_chunk, chunks) for output in chunk]
+        return [io.BytesIO(output) if isinstance(output, bytes) else output for output in results]
+
+    def targets(self, names=None, directory:str=None) -> list:
+        '''This function returns the file path of each frame name inside the (directory), or a None (in-memory) target for
+        each frame name when no (directory) is given.'''
+        if directory is None:
+            return [None] * len(names)
+        os.makedirs(directory, exist_ok=True)
+        return [os.path.join(directory, f'{name}.{self.format}') for name in names]
+
+    def thumbnails(self, elements=None, time=None, directory:str=None, workers:int=None) -> list:
+        '''This function renders one thumbnail per satellite, showing its orbit and its position at the (time), which defaults
+        to the current UTC time. The thumbnails are named after the satellite numbers.
+
+        :param elements: An ElementSet, a TLE, or a list of TLEs.
+        :param time: The time to draw the satellites at.
+        :param directory: The directory to write the thumbnails into. If it is None, in-memory buffers are returned.
+        :param workers: The number of worker processes.
+        :return: The list of file paths or io.BytesIO buffers of the thumbnails.
+        '''
+        if time is None:
+            time = datetime.now(tz.utc)
+        propagator = Propagator(elements, body=self.object, backend=self.backend)
+        positions = propagator.propagate(to_datetime64(time).reshape(1), velocity=False)
+        paths = propagator.orbit_geometry(samples=self.samples)
+        titles = propagator.elements.titles
+        frames = [(paths[i:i+1], positions[i], str(titles[i])) for i in range(len(propagator))]
+        return self.render(frames, self.targets(propagator.elements['satellite_number'], directory), workers=workers)
+
+    def time_series(self, elements=None, times=None, since_epoch:bool=False, directory:str=None, workers:int=None) -> list:
+        '''This function renders one frame per time of the (times), showing every satellite of the catalog at that time. The
+        frames are named by their index, so they sort in time order.
+
+        :param elements: An ElementSet, a TLE, or a list of TLEs.
+        :param times: The time of each frame. See Propagator().propagate().
+        :param since_epoch: If this is True, the (times) are seconds since each satellite's epoch.
+        :param directory: The directory to write the frames into. If it is None, in-memory buffers are returned.
+        :param workers: The number of worker processes.
+        :return: The list of file paths or io.BytesIO buffers of the frames.
+        '''
+        propagator = Propagator(elements, body=self.object, backend=self.backend)
+        positions = propagator.propagate(times, since_epoch=since_epoch, velocity=False)
+        paths = propagator.orbit_geometry(samples=self.samples)
+        labels = np.atleast_1d(times).astype(str)
+        frames = [(paths, positions[:, frame], labels[frame]) for frame in range(positions.shape[1])]
+        return self.render(frames, self.targets([f'{frame:06d}' for frame in range(len(frames))], directory), workers=workers)
+
+def _render_chunk(chunk=None) -> list:
+    '''This function is run by the worker processes of Renderer().render(). It renders a chunk of frames with its own Renderer,
+    and returns the file paths, or the bytes of the in-memory frames.'''
+    options, frames, targets = chunk
+    outputs = Renderer(**options).render_frames(frames, targets)
+    return [output.getvalue() if isinstance(output, io.BytesIO) else output for output in outputs]
@@ -1,5 +1,18 @@
 # __init__.py
+from .units import *
 from .orbit import *
 from .tle import *
+from .elements import *
+from .kepler import *
+from .sgp4 import *
+from .shared import *
+from .propagator import *
+from .groundtrack import *
+from .conjunction import *
+from .passes import *
+from .archive import *
+from .history import *
+from .catalog import *
+from .ingest import *
 
-__all__ = ['orbit', 'tle']
+__all__ = ['units', 'orbit', 'tle', 'elements', 'kepler', 'sgp4', 'shared', 'propagator', 'groundtrack', 'conjunction', 'passes', 'archive', 'history', 'catalog', 'ingest']
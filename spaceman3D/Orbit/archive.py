@@ -0,0 +1,257 @@
+import json
+import os
+import numpy as np
+from spaceman3D.Orbit.orbit import to_datetime64
+from spaceman3D.Orbit.elements import ElementSet, ELEMENT_DTYPE, TITLE_LENGTH
+from spaceman3D.Orbit.propagator import as_element_set
+
+ARCHIVE_VERSION = 2
+
+INDEX_DTYPE = np.dtype([
+    ('satellite_number', np.int32),
+    ('epoch', 'datetime64[ns]'),
+    ('record', np.int64)
+])
+
+EPOCH_INDEX_DTYPE = np.dtype([
+    ('epoch', 'datetime64[ns]'),
+    ('record', np.int64)
+])
+
+def _find_keys(index=None, numbers=None, epochs=None) -> np.ndarray:
+    '''This function finds which of the (satellite number, epoch) keys are in an index of the INDEX_DTYPE. The satellite numbers
+    are found with a binary search of the index, and the epochs with a binary search, run on all of the keys at once, within the
+    rows of their satellite, so only the pages of a memory mapped index that the searches land on are read.'''
+    low = np.searchsorted(index['satellite_number'], numbers, side='left')
+    high = np.searchsorted(index['satellite_number'], numbers, side='right')
+    end = high.copy()
+    searching = low < high
+    while searching.any():
+        middle = (low + high) // 2
+        later = searching & (index['epoch'][np.minimum(middle, len(index) - 1)] < epochs)
+        low = np.where(later, middle + 1, low)
+        high = np.where(searching & ~later, middle, high)
+        searching = low < high
+    found = low < end
+    found[found] = index['epoch'][low[found]] == epochs[found]
+    return found
+
+class ElementArchive(object):
+    '''This class is a persistent, append-only archive of element sets on disk, which is read through NumPy memory maps so that
+    the history of a satellite, or of an epoch range, is loaded without reading or parsing the rest of the archive. An archive is
+    a directory holding:
+
+        elements.bin         The element sets, as fixed-size records of the ELEMENT_DTYPE, in the order they were appended.
+        titles.bin           The titles of the element sets, as fixed-size ASCII records in the same order.
+        index-A-B.bin        The (satellite_number, epoch, record) of the element sets from record A up to record B, sorted by
+                             satellite number and epoch.
+        epochs-A-B.bin       The (epoch, record) of the same element sets, sorted by epoch.
+        archive.json         The format version, the number of records, and the (A, B) ranges of the index segments.
+
+    Element sets are keyed by their satellite number and epoch, and an element set that is already in the archive is skipped when
+    it is appended again. Each append only writes its own records, and a sorted index segment of them, so an append costs as much
+    as the element sets it adds rather than the size of the archive. A lookup searches every segment. To keep the segments few,
+    the last segment is merged into the one before it whenever it has grown as large as it, so a record is rewritten a
+    logarithmic number of times over the life of the archive, and the compact() method merges all of them into one. The records
+    and index segments are written first and archive.json is replaced last to point at them, so an interrupted append leaves the
+    archive as it was before it.
+
+    Example:
+
+        archive = ElementArchive('history')
+        archive.append(ElementSet.from_file('active.txt'))
+        iss = archive.satellite(25544, start=np.datetime64('2010-01-01'), stop=np.datetime64('2020-01-01'))
+    '''
+
+    def __init__(self, directory:str=None):
+        assert isinstance(directory, (str, os.PathLike)), 'The (directory) parameter must be a path. Please check the value passed in for (directory).'
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        metadata = self.path('archive.json')
+        if os.path.exists(metadata):
+            with open(metadata) as file:
+                metadata = json.load(file)
+            assert metadata['version'] == ARCHIVE_VERSION, f'The archive in {directory} has version {metadata["version"]}, but only version {ARCHIVE_VERSION} is supported.'
+            self.count = metadata['records']
+            self.segments = [tuple(segment) for segment in metadata['segments']]
+        else:
+            self.count = 0
+            self.segments = []
+        self.maps = {}
+        return
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f'ElementArchive({self.directory!r}, {len(self)} element sets)'
+
+    def path(self, name:str=None) -> str:
+        '''This method returns the path of one of the files of the archive.'''
+        return os.path.join(self.directory, name)
+
+    def memmap(self, name:str=None, dtype=None, count:int=None) -> np.ndarray:
+        '''This method returns a read-only memory map of the first (count) records of one of the files of the archive, which
+        defaults to every record of the archive. The memory maps are opened the first time they are used, and are reopened after
+        each append.'''
+        count = self.count if count is None else count
+        if name not in self.maps:
+            if count == 0:
+                self.maps[name] = np.zeros(0, dtype=dtype)
+            else:
+                self.maps[name] = np.memmap(self.path(name), dtype=dtype, mode='r', shape=(count,))
+        return self.maps[name]
+
+    @property
+    def records(self) -> np.ndarray:
+        '''The element sets of the archive, as a memory mapped array of the ELEMENT_DTYPE in the order they were appended.'''
+        return self.memmap('elements.bin', ELEMENT_DTYPE)
+
+    @property
+    def titles(self) -> np.ndarray:
+        '''The titles of the element sets, as a memory mapped array of fixed-size ASCII strings.'''
+        return self.memmap('titles.bin', np.dtype(f'S{TITLE_LENGTH}'))
+
+    def segment_index(self, segment:tuple=None) -> np.ndarray:
+        '''This method returns the index of a segment sorted by satellite number and epoch, as a memory mapped array of the
+        INDEX_DTYPE.'''
+        start, stop = segment
+        return self.memmap(f'index-{start}-{stop}.bin', INDEX_DTYPE, stop - start)
+
+    def segment_epoch_index(self, segment:tuple=None) -> np.ndarray:
+        '''This method returns the index of a segment sorted by epoch, as a memory mapped array of the EPOCH_INDEX_DTYPE.'''
+        start, stop = segment
+        return self.memmap(f'epochs-{start}-{stop}.bin', EPOCH_INDEX_DTYPE, stop - start)
+
+    @property
+    def index(self) -> np.ndarray:
+        '''The index of every element set sorted by satellite number and epoch, merged from the index segments into an array of
+        the INDEX_DTYPE. It is read from every segment, so the lookups search the segments one by one instead.'''
+        index = np.concatenate([self.segment_index(segment) for segment in self.segments] or [np.zeros(0, dtype=INDEX_DTYPE)])
+        return index[np.lexsort((index['epoch'], index['satellite_number']))]
+
+    def append(self, elements=None) -> int:
+        '''This method appends element sets to the archive. The element sets whose satellite number and epoch are already in the
+        archive, or that repeat an earlier element set of the same call, are skipped. The added element sets get an index segment
+        of their own, which is then merged into the segments before it while they are no larger than it.
+
+        :param elements: An ElementSet, a TLE, or a list of TLEs.
+        :return: The number of element sets that were added.
+        '''
+        elements = as_element_set(elements)
+        epochs = elements.epoch_datetime64()
+        numbers = elements['satellite_number']
+
+        # The first element set of each key in the call is kept, unless the key is already in one of the segments.
+        order = np.lexsort((np.arange(len(numbers)), epochs, numbers))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (numbers[order][1:] != numbers[order][:-1]) | (epochs[order][1:] != epochs[order][:-1])
+        unique = order[first]
+        known = np.zeros(len(unique), dtype=bool)
+        for segment in self.segments:
+            known |= _find_keys(self.segment_index(segment), numbers[unique], epochs[unique])
+        added = np.sort(unique[~known])
+        if len(added) == 0:
+            return 0
+
+        count = self.count + len(added)
+        titles = np.char.encode(elements.titles[added].astype(f'U{TITLE_LENGTH}'), 'ascii', 'replace').astype(f'S{TITLE_LENGTH}')
+        index = np.zeros(len(added), dtype=INDEX_DTYPE)
+        index['satellite_number'], index['epoch'], index['record'] = numbers[added], epochs[added], np.arange(self.count, count)
+        segments, merged = list(self.segments), []
+        start = self.count
+        while segments and segments[-1][1] - segments[-1][0] <= count - start:
+            merged.append(segments.pop())
+            index = np.concatenate((np.array(self.segment_index(merged[-1])), index))
+            start = merged[-1][0]
+        self.maps = {}
+
+        for name, rows, itemsize in (('elements.bin', elements.data[added], ELEMENT_DTYPE.itemsize), ('titles.bin', titles, TITLE_LENGTH)):
+            with open(self.path(name), 'r+b' if os.path.exists(self.path(name)) else 'wb') as file:
+                file.seek(self.count * itemsize)
+                file.write(rows.tobytes())
+                file.truncate()
+        self._commit(count, segments, index, merged)
+        return len(added)
+
+    def compact(self):
+        '''This method merges every index segment of the archive into one, so that the lookups search a single segment.'''
+        if len(self.segments) > 1:
+            index = self.index
+            merged, self.maps = list(self.segments), {}
+            self._commit(self.count, [], index, merged)
+        return
+
+    def _commit(self, count:int=None, segments:list=None, index:np.ndarray=None, merged:list=None):
+        '''This method writes the (index) as a new segment after the (segments), which covers the records up to the (count), then
+        points archive.json at the segments, and finally removes the files of the (merged) segments the new one replaces.'''
+        segment = (int(count - len(index)), int(count))
+        index = index[np.lexsort((index['epoch'], index['satellite_number']))]
+        epoch_index = np.zeros(len(index), dtype=EPOCH_INDEX_DTYPE)
+        epoch_index['epoch'], epoch_index['record'] = index['epoch'], index['record']
+        epoch_index = epoch_index[np.argsort(epoch_index['epoch'], kind='stable')]
+        index.tofile(self.path(f'index-{segment[0]}-{segment[1]}.bin'))
+        epoch_index.tofile(self.path(f'epochs-{segment[0]}-{segment[1]}.bin'))
+        segments = segments + [segment]
+        with open(self.path('archive.json.tmp'), 'w') as file:
+            json.dump({'version': ARCHIVE_VERSION, 'records': count, 'segments': segments}, file)
+        os.replace(self.path('archive.json.tmp'), self.path('archive.json'))
+        for start, stop in merged:
+            for name in (f'index-{start}-{stop}.bin', f'epochs-{start}-{stop}.bin'):
+                if os.path.exists(self.path(name)):
+                    os.remove(self.path(name))
+        self.count, self.segments = count, segments
+        return
+
+    def load(self, records=None) -> ElementSet:
+        '''This method reads the element sets at the (records) positions of the archive into an ElementSet.'''
+        records = np.asarray(records, dtype=np.int64)
+        titles = np.char.decode(self.titles[records], 'ascii', 'replace').astype(f'U{TITLE_LENGTH}')
+        return ElementSet(data=np.array(self.records[records], dtype=ELEMENT_DTYPE), titles=titles)
+
+    def satellite_numbers(self) -> np.ndarray:
+        '''This method returns the sorted satellite numbers of every satellite in the archive.'''
+        return np.unique(np.concatenate([self.segment_index(segment)['satellite_number'] for segment in self.segments] or [np.zeros(0, dtype=np.int32)]))
+
+    def satellite(self, satellite_number:int=None, start=None, stop=None) -> ElementSet:
+        '''This method loads the history of a satellite from the archive, sorted by epoch. The element sets are found with a
+        binary search of each index segment, so only the records of the satellite are read.
+
+        :param satellite_number: The satellite number.
+        :param start: If it is given, only the element sets with an epoch at or after the (start) are loaded.
+        :param stop: If it is given, only the element sets with an epoch before the (stop) are loaded.
+        :return: An ElementSet of the element sets of the satellite.
+        '''
+        records, epochs = [], []
+        for segment in self.segments:
+            index = self.segment_index(segment)
+            low, high = np.searchsorted(index['satellite_number'], [satellite_number, satellite_number + 1])
+            segment_epochs = index['epoch'][low:high]
+            first = 0 if start is None else np.searchsorted(segment_epochs, to_datetime64(start))
+            last = len(segment_epochs) if stop is None else np.searchsorted(segment_epochs, to_datetime64(stop))
+            records.append(index['record'][low + first:low + last])
+            epochs.append(segment_epochs[first:last])
+        return self.load(self._by_epoch(records, epochs))
+
+    def between(self, start=None, stop=None) -> ElementSet:
+        '''This method loads every element set with an epoch from the (start) up to the (stop) from the archive, sorted by epoch.
+
+        :param start: The start of the epoch range, as a datetime or a NumPy datetime64.
+        :param stop: The end of the epoch range (exclusive), as a datetime or a NumPy datetime64.
+        :return: An ElementSet of the element sets in the epoch range.
+        '''
+        records, epochs = [], []
+        for segment in self.segments:
+            epoch_index = self.segment_epoch_index(segment)
+            low, high = np.searchsorted(epoch_index['epoch'], [to_datetime64(start), to_datetime64(stop)])
+            records.append(epoch_index['record'][low:high])
+            epochs.append(epoch_index['epoch'][low:high])
+        return self.load(self._by_epoch(records, epochs))
+
+    def _by_epoch(self, records:list=None, epochs:list=None) -> np.ndarray:
+        '''This method merges the records found in each index segment, and sorts them by their epochs (and then by the order they
+        were appended in).'''
+        if len(records) == 0:
+            return np.zeros(0, dtype=np.int64)
+        records, epochs = np.concatenate(records), np.concatenate(epochs)
+        return records[np.lexsort((records, epochs))]
@@ -0,0 +1,152 @@
+import os
+import numpy as np
+from spaceman3D.Orbit.tle import TLE, TLECatalogError
+from spaceman3D.Orbit.orbit import Orbital
+from spaceman3D.Orbit.elements import ElementSet, ELEMENT_DTYPE, TITLE_LENGTH, CATALOG_KEY_DTYPE, read_keys
+
+class Catalog(object):
+    '''This class holds the latest element set of every satellite of a catalog that is downloaded again and again, and refreshes
+    it incrementally. Each new download is passed to the refresh() method, which reads only the key of every TLE (the satellite
+    number, the element set number, and the epoch) from the raw catalog, and compares the keys with the ones held. Only the TLEs
+    that are new or whose key changed are parsed with the TLE parser, and only their Orbitals are re-derived, while the records,
+    element sets and Orbitals of the unchanged satellites are kept as they are.
+
+    The satellite numbers that were added, updated, or removed by the last refresh are exposed as sorted arrays, so that caches
+    of positions, passes, or conjunctions can be invalidated for those satellites only. TLEs that fail the validity checks are
+    reported in the (errors) list as TLECatalogErrors, which holds the errors of the last refresh only, and the satellites keep
+    their previous element set.
+
+    Example:
+
+        catalog = Catalog()
+        catalog.refresh('active.txt')
+        ...
+        changed = catalog.refresh('active.txt')
+        positions[np.isin(satellite_numbers, changed)] = np.nan
+    '''
+
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=CATALOG_KEY_DTYPE)
+        self.elements = ElementSet()
+        self.records = {}
+        self.orbitals = {}
+        self.errors = []
+        self.added = self.updated = self.removed = np.zeros(0, dtype=np.int32)
+        self.parsed = 0
+        return
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, satellite_number):
+        return satellite_number in self.records
+
+    def __repr__(self):
+        return f'Catalog({len(self)} satellites)'
+
+    @property
+    def satellite_numbers(self) -> np.ndarray:
+        '''The sorted satellite numbers of the catalog, in the order of the rows of (elements).'''
+        return self.keys['satellite_number']
+
+    @property
+    def changed(self) -> np.ndarray:
+        '''The sorted satellite numbers that were added, updated, or removed by the last refresh.'''
+        return np.union1d(np.union1d(self.added, self.updated), self.removed)
+
+    def index(self, satellite_numbers=None) -> np.ndarray:
+        '''This method finds the rows of the (elements) of the (satellite_numbers), so that derived arrays kept in the order of the
+        catalog can be updated for the changed satellites only.
+
+        :param satellite_numbers: The satellite numbers, which must be in the catalog.
+        :return: The rows of the satellites in (elements).
+        '''
+        numbers = np.atleast_1d(satellite_numbers)
+        rows = np.searchsorted(self.satellite_numbers, numbers)
+        assert np.all(rows < len(self)) and np.all(self.satellite_numbers[np.minimum(rows, len(self) - 1)] == numbers), 'Every satellite in (satellite_numbers) must be in the catalog. Please check the value passed in for (satellite_numbers).'
+        return rows
+
+    def orbital(self, satellite_number:int=None) -> Orbital:
+        '''This method returns the Orbital of a satellite of the catalog. The Orbital is created the first time it is requested, and
+        is kept across refreshes, where its elements are re-imported only when the TLE of the satellite changes.
+
+        :param satellite_number: The satellite number.
+        :return: The Orbital of the satellite.
+        '''
+        assert satellite_number in self.records, 'The (satellite_number) parameter must be a satellite of the catalog. Please check the value passed in for (satellite_number).'
+        if satellite_number not in self.orbitals:
+            orbital = Orbital()
+            orbital.import_tle(self.records[satellite_number])
+            self.orbitals[satellite_number] = orbital
+        return self.orbitals[satellite_number]
+
+    def refresh(self, source=None) -> np.ndarray:
+        '''This method ingests a new download of the catalog. A satellite whose TLE has the same key as the one held is left
+        untouched, a satellite with a new key is parsed and updated, a new satellite is added, and a satellite that is no longer
+        in the download is removed. If a satellite appears more than once in the download, its TLE with the latest epoch is used.
+
+        :param source: A path to a catalog file, a file object opened on one in binary mode, or the raw bytes of a catalog.
+        :return: The sorted satellite numbers that were added, updated, or removed (see the (changed) property).
+        '''
+        self.errors = []
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as catalog:
+                source = catalog.read()
+        elif hasattr(source, 'read'):
+            source = source.read()
+        keys, lines = read_keys(source)
+        buffer, starts, lengths, line1, is_tle_line = lines
+
+        # The latest TLE of each satellite is kept, in the order of the satellite numbers.
+        order = np.lexsort((np.arange(len(keys)), keys['epoch'], keys['satellite_number']))
+        latest = np.ones(len(order), dtype=bool)
+        latest[:-1] = keys['satellite_number'][order][1:] != keys['satellite_number'][order][:-1]
+        order = order[latest]
+        keys, line1 = keys[order], line1[order]
+
+        # The keys are compared with the held keys of the same satellites, which are found with a binary search.
+        numbers = keys['satellite_number']
+        held = np.minimum(np.searchsorted(self.satellite_numbers, numbers), max(len(self) - 1, 0))
+        known = np.zeros(len(keys), dtype=bool) if len(self) == 0 else self.satellite_numbers[held] == numbers
+        same = known & (self.keys['element_set_number'][held] == keys['element_set_number']) & (self.keys['epoch'][held] == keys['epoch']) if len(self) else known
+
+        parser = TLE()
+        text = lambda line: bytes(buffer[starts[line]:starts[line] + lengths[line]]).decode('ascii', 'replace').strip()
+        records = []
+        failed = np.zeros(len(keys), dtype=bool)
+        for row in np.flatnonzero(~same):
+            line = line1[row]
+            title = '' if line == 0 or is_tle_line[line - 1] else text(line - 1)
+            title = title[2:].strip() if title.startswith('0 ') else title
+            try:
+                records.append(parser.record_from_lines(title, text(line), text(line + 1)))
+            except (AssertionError, ValueError) as error:
+                self.errors.append(TLECatalogError(line_number=int(line) + 1, lines=(text(line), text(line + 1)), message=str(error)))
+                failed[row] = True
+        self.parsed = len(records)
+
+        # A satellite whose new TLE failed the validity checks keeps its previous element set, or is left out if it is new.
+        kept = same | (failed & known)
+        new = ~same & ~failed
+        present = kept | new
+        keys[kept] = self.keys[held[kept]]
+        data = np.zeros(len(keys), dtype=ELEMENT_DTYPE)
+        titles = np.full(len(keys), '', dtype=f'U{TITLE_LENGTH}')
+        data[kept], titles[kept] = self.elements.data[held[kept]], self.elements.titles[held[kept]]
+        if len(records):
+            fresh = ElementSet.from_records(records)
+            data[new], titles[new] = fresh.data, fresh.titles
+
+        self.added = numbers[new & ~known]
+        self.updated = numbers[new & known]
+        self.removed = np.setdiff1d(self.satellite_numbers, numbers[present])
+        for number in self.removed.tolist():
+            self.records.pop(number, None)
+            self.orbitals.pop(number, None)
+        for record in records:
+            self.records[record.satellite_number] = record
+            if record.satellite_number in self.orbitals:
+                self.orbitals[record.satellite_number].import_tle(record)
+        self.keys = keys[present]
+        self.elements = ElementSet(data=data[present], titles=titles[present])
+        return self.changed
@@ -0,0 +1,321 @@
+import itertools
+import numpy as np
+from spaceman3D.Orbit.orbit import to_datetime64
+from spaceman3D.Orbit.propagator import Propagator
+from spaceman3D.Orbit.astronomical_objects import objects
+
+CONJUNCTION_DTYPE = np.dtype([
+    ('primary', np.int64),
+    ('secondary', np.int64),
+    ('primary_number', np.int32),
+    ('secondary_number', np.int32),
+    ('time', 'datetime64[ns]'),
+    ('miss_distance', np.float64),
+    ('relative_speed', np.float64)
+])
+
+#################### Prefilters ####################
+
+def apsis_buckets(perigee=None, apogee=None, distance:float=0.0) -> np.ndarray:
+    '''This function is the apogee/perigee prefilter, which splits the catalog into buckets of satellites whose bands of radii,
+    from the perigee to the apogee, overlap (within the (distance)) in a chain. Satellites in different buckets can not come within
+    the (distance) of each other, so only the satellites of the same bucket need to be compared, and a satellite that is alone in
+    its bucket is left out of the screening. The bands are sorted by their perigee, so the whole catalog is bucketed in O(N log N)
+    rather than by comparing every pair.
+
+    :param perigee: The perigee radii (km), as an (N,) array.
+    :param apogee: The apogee radii (km), as an (N,) array.
+    :param distance: The distance (km) the bands must come within.
+    :return: The bucket of each satellite, as an (N,) array, which is -1 for the satellites that are alone in their bucket.
+    '''
+    perigee, apogee = np.asarray(perigee, dtype=np.float64), np.asarray(apogee, dtype=np.float64)
+    order = np.argsort(perigee, kind='stable')
+    q, Q = perigee[order], apogee[order]
+    # A band starts a new bucket if it is above the highest apogee of the bands below it.
+    new = np.concatenate(([True], q[1:] > np.maximum.accumulate(Q)[:-1] + distance))
+    bucket = np.cumsum(new) - 1
+    bucket = np.where(np.bincount(bucket)[bucket] > 1, bucket, -1)
+    buckets = np.empty(len(perigee), dtype=np.int64)
+    buckets[order] = bucket
+    return buckets
+
+def apsis_filter(perigee=None, apogee=None, distance:float=0.0) -> np.ndarray:
+    '''This function finds the satellites whose band of radii comes within the (distance) of the band of any other satellite,
+    which are the satellites that are not alone in their bucket of the apsis_buckets() function.
+
+    :param perigee: The perigee radii (km), as an (N,) array.
+    :param apogee: The apogee radii (km), as an (N,) array.
+    :param distance: The distance (km) the bands must come within.
+    :return: A boolean mask of the satellites that pass the filter.
+    '''
+    return apsis_buckets(perigee, apogee, distance) >= 0
+
+def _radius_range(semi_major_axis=None, eccentricity=None, anomaly=None, width=None) -> tuple:
+    '''This function returns the smallest and largest radius an orbit reaches over the true anomalies within (width) of the
+    (anomaly), using the polar equation of the ellipse.'''
+    p = semi_major_axis * (1 - eccentricity**2)
+    radius = lambda cosine: p / (1 + eccentricity * cosine)
+    cos_low, cos_high = np.cos(anomaly - width), np.cos(anomaly + width)
+    offset = np.remainder(anomaly + np.pi, 2*np.pi) - np.pi
+    contains_perigee = np.abs(offset) <= width
+    contains_apogee = np.pi - np.abs(offset) <= width
+    smallest = np.where(contains_perigee, radius(1.0), radius(np.maximum(cos_low, cos_high)))
+    largest = np.where(contains_apogee, radius(-1.0), radius(np.minimum(cos_low, cos_high)))
+    return smallest, largest
+
+def plane_filter(first=None, second=None, semi_major_axis=None, eccentricity=None, rotation=None, distance:float=0.0) -> np.ndarray:
+    '''This function is the orbit-plane prefilter for pairs of satellites. Two orbits in different planes can only come close
+    near the line where their planes intersect, since a point an angle φ from that line is r*sin(φ)*sin(I) away from the other
+    plane, where I is the angle between the planes. The filter finds the range of radii each orbit passes through near both
+    crossings of the line, and rejects the pairs whose ranges are more than the (distance) apart at both crossings. Pairs in
+    nearly the same plane always pass.
+
+    :param first: The indices of the first satellite of each pair, as a (P,) array.
+    :param second: The indices of the second satellite of each pair, as a (P,) array.
+    :param semi_major_axis: The semi-major axes (km) of the catalog, as an (N,) array.
+    :param eccentricity: The eccentricities of the catalog, as an (N,) array.
+    :param rotation: The rotation matrices of the catalog (see the rotation_matrices() function), as an (N, 3, 3) array.
+    :param distance: The distance (km) the orbits must come within.
+    :return: A boolean mask of the pairs that pass the filter.
+    '''
+    first, second = np.asarray(first, dtype=np.int64), np.asarray(second, dtype=np.int64)
+    node = np.cross(rotation[first, :, 2], rotation[second, :, 2])
+    sin_angle = np.linalg.norm(node, axis=-1)
+    node = node / np.where(sin_angle > 0, sin_angle, 1)[:, None]
+
+    separated = np.ones(len(first), dtype=bool)
+    widths = []
+    for satellite in (first, second):
+        perigee = semi_major_axis[satellite] * (1 - eccentricity[satellite])
+        widths.append(np.arcsin(np.clip(distance / np.maximum(perigee * sin_angle, 1e-300), 0, 1)))
+    for side in (0.0, np.pi):
+        ranges = []
+        for satellite, width in zip((first, second), widths):
+            P, Q = rotation[satellite, :, 0], rotation[satellite, :, 1]
+            anomaly = np.arctan2(np.sum(node * Q, axis=-1), np.sum(node * P, axis=-1)) + side
+            ranges.append(_radius_range(semi_major_axis[satellite], eccentricity[satellite], anomaly, width))
+        (low_first, high_first), (low_second, high_second) = ranges
+        separated &= (low_first > high_second + distance) | (low_second > high_first + distance)
+    # Within the width (π/2 at most) of the line, the out of plane separation can stay within the distance everywhere.
+    coplanar = np.maximum(widths[0], widths[1]) >= np.pi/2
+    return coplanar | ~separated
+
+#################### Spatial Index ####################
+
+def grid_pairs(positions=None, distance:float=None, groups=None) -> tuple:
+    '''This function finds every pair of satellites within the (distance) of each other at each time step, using a uniform grid
+    hash. The positions are binned into cubic cells as wide as the (distance), and each point is only compared against the points
+    in its own cell and the neighbouring cells of the same time step, so the work grows with the number of points and close pairs
+    rather than with the square of the catalog size. The cells of all the time steps are hashed and searched together. If the
+    satellites are split into (groups), such as the buckets of the apsis_buckets() function, each group is hashed into cells of
+    its own, so only the satellites of the same group are paired.
+
+    :param positions: The positions (km), as an (N, T, 3) array. Points that are not finite (e.g. decayed satellites) are skipped.
+    :param distance: The distance (km) between the satellites of a pair.
+    :param groups: The group of each satellite, as an (N,) array. By default all of the satellites are in the same group.
+    :return: The first and second satellite of each pair (with first < second), the time step, and the distance, as (P,) arrays.
+    '''
+    assert distance is not None and distance > 0, 'The (distance) parameter must be a positive number. Please check the value passed in for (distance).'
+    positions = np.asarray(positions, dtype=np.float64)
+    satellite, step = np.nonzero(np.all(np.isfinite(positions), axis=-1))
+    points = positions[satellite, step]
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    cells = np.floor(points / distance).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    span = cells.max(axis=0) + 2
+    group = np.zeros(len(points), dtype=np.int64) if groups is None else np.unique(np.asarray(groups), return_inverse=True)[1].ravel()[satellite]
+    assert float(np.prod(span.astype(np.float64))) * positions.shape[1] * (group.max() + 1) < 2.0**62, 'The grid of the (positions) is too fine to be hashed. Please use a larger (distance) or fewer time steps per call.'
+    keys = (((group * positions.shape[1] + step) * span[0] + cells[:, 0]) * span[1] + cells[:, 1]) * span[2] + cells[:, 2]
+
+    # The key is linear in the cell coordinates, so the keys of the neighbouring cells are the sorted keys plus a constant, and
+    # the neighbours of every point are searched for in sorted order. Only half of the neighbouring cells are searched, as the
+    # other half finds the same pairs the other way around.
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    cell_end = np.searchsorted(sorted_keys, sorted_keys, side='right')
+    index = np.arange(len(points))
+    firsts, seconds = [], []
+    for offset in itertools.product((-1, 0, 1), repeat=3):
+        if offset < (0, 0, 0):
+            continue
+        neighbours = sorted_keys + (offset[0] * span[1] + offset[1]) * span[2] + offset[2]
+        low = index + 1 if offset == (0, 0, 0) else np.searchsorted(sorted_keys, neighbours, side='left')
+        occupied = sorted_keys[np.minimum(low, len(points) - 1)] == neighbours
+        counts = np.where(occupied & (low < len(points)), cell_end[np.minimum(low, len(points) - 1)] - low, 0)
+        total = counts.sum()
+        if total == 0:
+            continue
+        starts = np.cumsum(counts) - counts
+        firsts.append(order[np.repeat(index, counts)])
+        seconds.append(order[np.repeat(low - starts, counts) + np.arange(total)])
+
+    if len(firsts) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    separation = np.linalg.norm(points[first] - points[second], axis=-1)
+    close = separation <= distance
+    first, second, steps = satellite[first[close]], satellite[second[close]], step[first[close]]
+    return np.minimum(first, second), np.maximum(first, second), steps, separation[close]
+
+#################### Screening ####################
+
+class ConjunctionScreen(object):
+    '''This class screens a catalog of satellites for close approaches (conjunctions) over a window of time. The screening runs
+    in three stages, so that it scales with the size of the catalog rather than with the number of pairs of satellites:
+
+        1. The apogee/perigee prefilter (see the apsis_buckets() function) splits the catalog into buckets of satellites whose
+           ranges of altitudes overlap, and leaves out the satellites that are alone in their bucket.
+        2. The remaining satellites are propagated over the window at a fixed time step, and a uniform grid hash (see the
+           grid_pairs() function) finds the pairs of satellites of the same bucket that are close at each time step. As two
+           satellites can pass each other between the time steps, the pairs are searched for within the (threshold) plus the
+           distance they can close in half a time step. The close pairs then go through the orbit-plane prefilter (see the
+           plane_filter() function), which drops the pairs whose orbits are too far apart where their planes cross.
+        3. The time of closest approach (TCA) of each encounter is refined by repeatedly sampling the separation of the pair on a
+           shrinking window around the closest time step, followed by a final step along the relative velocity.
+
+    The prefilters use the mean elements at their epochs, so the (margin) is added to the (threshold) in it to cover the
+    short-periodic and secular changes of the orbits over the window.
+
+    Example:
+
+        screen = ConjunctionScreen(ElementSet.from_file('active.txt'), threshold=5.0)
+        conjunctions = screen.screen(np.datetime64('2019-03-04T00:00'), np.datetime64('2019-03-05T00:00'))
+    '''
+
+    def __init__(self, elements=None, threshold:float=5.0, backend:str='sgp4', margin:float=25.0):
+        assert isinstance(threshold, (int, float)) and threshold > 0, 'The (threshold) parameter must be a positive number. Please check the value passed in for (threshold).'
+        assert isinstance(margin, (int, float)) and margin >= 0, 'The (margin) parameter must be a non-negative number. Please check the value passed in for (margin).'
+        self.propagator = Propagator(elements, backend=backend)
+        self.elements = self.propagator.elements
+        self.threshold = float(threshold)
+        self.margin = float(margin)
+        self.backend = backend
+        mu = objects['Earth']['standard_gravitational_parameter']
+        a, e = self.propagator.semi_major_axis, self.propagator.eccentricity
+        self.perigee = a * (1 - e)
+        self.apogee = a * (1 + e)
+        self.speed = np.sqrt(mu * (1 + e) / self.perigee)
+        return
+
+    def buckets(self) -> np.ndarray:
+        '''This method returns the bucket of each satellite of the apogee/perigee prefilter (see the apsis_buckets() function).'''
+        return apsis_buckets(self.perigee, self.apogee, self.threshold + self.margin)
+
+    def candidates(self) -> np.ndarray:
+        '''This method returns the indices of the satellites that pass the apogee/perigee prefilter.'''
+        return np.flatnonzero(self.buckets() >= 0)
+
+    def encounters(self, start=None, offsets=None, chunk:int=64) -> tuple:
+        '''This method propagates the candidate satellites to the (offsets) and finds the pairs that are close at each time step
+        with the grid hash, which only pairs the satellites of the same bucket of the apogee/perigee prefilter. The close pairs of
+        each chunk of time steps that fail the orbit-plane prefilter are dropped, and the consecutive close time steps of each
+        remaining pair are grouped into one encounter, of which the closest is kept.
+
+        :param start: The start of the window, as a NumPy datetime64.
+        :param offsets: The time steps, as seconds since the (start).
+        :param chunk: The number of time steps that are propagated and hashed at once.
+        :return: The first and second satellite, and the closest time step, of each encounter, as (E,) arrays.
+        '''
+        buckets = self.buckets()
+        active = np.flatnonzero(buckets >= 0)
+        if len(active) < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        step = offsets[1] - offsets[0] if len(offsets) > 1 else 0.0
+        propagator = Propagator(self.elements[active], backend=self.backend)
+        base = (start - propagator.epochs) / np.timedelta64(1, 's')
+        speed = self.speed[active]
+        distance = self.threshold + speed.max() * step
+
+        found = []
+        for begin in range(0, len(offsets), chunk):
+            seconds = base[:, None] + offsets[None, begin:begin + chunk]
+            first, second, steps, separation = grid_pairs(propagator.propagate(seconds, since_epoch=True, velocity=False), distance, buckets[active])
+            close = separation <= self.threshold + (speed[first] + speed[second]) * step / 2
+            close[close] = plane_filter(first[close], second[close], propagator.semi_major_axis, propagator.eccentricity,
+                                        propagator.rotation, self.threshold + self.margin)
+            found.append((first[close], second[close], steps[close] + begin, separation[close]))
+        first, second, steps, separation = (np.concatenate(column) for column in zip(*found))
+        first, second = active[first], active[second]
+
+        order = np.lexsort((steps, second, first))
+        first, second, steps, separation = first[order], second[order], steps[order], separation[order]
+        new = np.ones(len(first), dtype=bool)
+        new[1:] = (first[1:] != first[:-1]) | (second[1:] != second[:-1]) | (steps[1:] != steps[:-1] + 1)
+        encounter = np.cumsum(new) - 1
+        # Within each encounter, the time steps are sorted by their separation, so the first of each is the closest.
+        closest = np.lexsort((separation, encounter))
+        closest = closest[np.concatenate(([True], encounter[closest][1:] != encounter[closest][:-1]))] if len(closest) else closest
+        return first[closest], second[closest], steps[closest]
+
+    def refine(self, first=None, second=None, start=None, center=None, width:float=None, samples:int=9, iterations:int=12) -> tuple:
+        '''This method refines the time of closest approach (TCA) of encounters. Each pair is sampled at (samples) times across
+        a window of (width) seconds either side of its closest time, the window is re-centered on the closest sample and shrunk
+        to the sample spacing, and this is repeated (iterations) times. A final step along the relative velocity then places the
+        TCA where the relative position and velocity are perpendicular.
+
+        :param first: The first satellite of each encounter, as an (E,) array.
+        :param second: The second satellite of each encounter, as an (E,) array.
+        :param start: The start of the window, as a NumPy datetime64.
+        :param center: The closest time of each encounter, as seconds since the (start).
+        :param width: The half width (seconds) of the initial window.
+        :param samples: The number of samples per iteration.
+        :param iterations: The number of iterations.
+        :return: The TCA (seconds since the (start)), the miss distance (km), and the relative speed (km/s) of each encounter.
+        '''
+        count = len(first)
+        propagator = Propagator(self.elements[np.concatenate((first, second))], backend=self.backend)
+        base = (start - propagator.epochs) / np.timedelta64(1, 's')
+        def relative(seconds, velocity=False):
+            states = propagator.propagate(base[:, None] + np.concatenate((seconds, seconds)), since_epoch=True, velocity=velocity)
+            if velocity is False:
+                return states[count:] - states[:count]
+            return states[0][count:] - states[0][:count], states[1][count:] - states[1][:count]
+
+        center = np.asarray(center, dtype=np.float64)
+        grid = np.linspace(-1, 1, samples)
+        for iteration in range(iterations):
+            times = center[:, None] + width * grid[None, :]
+            separation = np.linalg.norm(relative(times), axis=-1)
+            closest = np.argmin(np.where(np.isfinite(separation), separation, np.inf), axis=1)
+            center = times[np.arange(count), closest]
+            width = width * 2 / (samples - 1)
+
+        position, velocity = relative(center[:, None], velocity=True)
+        position, velocity = position[:, 0], velocity[:, 0]
+        shift = -np.sum(position * velocity, axis=-1) / np.maximum(np.sum(velocity**2, axis=-1), 1e-300)
+        center = center + np.clip(shift, -width, width)
+        position, velocity = relative(center[:, None], velocity=True)
+        return center, np.linalg.norm(position[:, 0], axis=-1), np.linalg.norm(velocity[:, 0], axis=-1)
+
+    def screen(self, start=None, stop=None, step:float=10.0, chunk:int=64) -> np.ndarray:
+        '''This method screens the catalog for conjunctions closer than the (threshold) between the (start) and the (stop).
+
+        :param start: The start of the window, as a datetime or a NumPy datetime64.
+        :param stop: The end of the window, as a datetime or a NumPy datetime64.
+        :param step: The time step (seconds) the satellites are sampled at.
+        :param chunk: The number of time steps that are propagated and hashed at once.
+        :return: The conjunctions, as a NumPy array of the CONJUNCTION_DTYPE sorted by their time of closest approach. The
+        (primary) and (secondary) fields are the indices of the satellites in the catalog.
+        '''
+        assert isinstance(step, (int, float)) and step > 0, 'The (step) parameter must be a positive number. Please check the value passed in for (step).'
+        start, stop = to_datetime64(start), to_datetime64(stop)
+        duration = (stop - start) / np.timedelta64(1, 's')
+        assert duration > 0, 'The (stop) parameter must be later than the (start) parameter. Please check the values passed in for (start) and (stop).'
+        offsets = np.arange(0.0, duration + step, step)
+        offsets[-1] = min(offsets[-1], duration)
+
+        first, second, steps = self.encounters(start, offsets, chunk=chunk)
+        conjunctions = np.zeros(len(first), dtype=CONJUNCTION_DTYPE)
+        if len(first) == 0:
+            return conjunctions
+        tca, miss_distance, relative_speed = self.refine(first, second, start, offsets[steps], width=step)
+        numbers = self.elements['satellite_number']
+        conjunctions['primary'], conjunctions['secondary'] = first, second
+        conjunctions['primary_number'], conjunctions['secondary_number'] = numbers[first], numbers[second]
+        conjunctions['time'] = start + np.round(tca * 1e9).astype('timedelta64[ns]')
+        conjunctions['miss_distance'] = miss_distance
+        conjunctions['relative_speed'] = relative_speed
+        conjunctions = conjunctions[(miss_distance <= self.threshold) & (tca >= 0) & (tca <= duration)]
+        return conjunctions[np.argsort(conjunctions['time'], kind='stable')]
@@ -0,0 +1,332 @@
+import os
+from collections import namedtuple
+import numpy as np
+from spaceman3D.Orbit import units
+
+ELEMENT_DTYPE = np.dtype([
+    ('satellite_number', np.int32),
+    ('element_set_number', np.int32),
+    ('epoch_year', np.int16),
+    ('epoch', np.float64),
+    ('inclination', np.float64),
+    ('right_ascension', np.float64),
+    ('eccentricity', np.float64),
+    ('argument_periapsis', np.float64),
+    ('mean_anomaly', np.float64),
+    ('mean_motion', np.float64),
+    ('bstar_drag_term', np.float64),
+    ('ballistic_coeffecient', np.float64),
+    ('second_time_derivative_of_mean_motion', np.float64),
+    ('revolution', np.float64)
+])
+
+CATALOG_KEY_DTYPE = np.dtype([
+    ('satellite_number', np.int32),
+    ('element_set_number', np.int32),
+    ('epoch', 'datetime64[ns]')
+])
+
+CatalogLines = namedtuple('CatalogLines', ['buffer', 'starts', 'lengths', 'line1', 'is_tle_line'])
+
+TLE_LINE_LENGTH = 69
+TITLE_LENGTH = 24
+
+TLE_VALID = 0
+TLE_ERROR_LINE_NUMBER = 1
+TLE_ERROR_SATELLITE_NUMBER = 2
+TLE_ERROR_CHECKSUM_LINE1 = 4
+TLE_ERROR_CHECKSUM_LINE2 = 8
+TLE_ERROR_MISSING_LINE = 16
+
+# The value each ASCII character adds to the Modulo-10 checksum of a TLE line.
+_CHECKSUM_VALUES = np.zeros(256, dtype=np.uint8)
+_CHECKSUM_VALUES[48:58] = np.arange(10)
+_CHECKSUM_VALUES[45] = 1
+
+def _fixed_width_integer(chars:np.ndarray=None) -> np.ndarray:
+    '''This function converts a fixed-width column of ASCII characters, given as an (N, width) uint8 array, into the (N,) int64
+    array of the unsigned integers it contains. Every character that is not a digit (such as spaces or a decimal point) is skipped.'''
+    digits = (chars >= 48) & (chars <= 57)
+    values = np.where(digits, chars - 48, 0).astype(np.int64)
+    places = digits[:, ::-1].cumsum(axis=1)[:, ::-1] - digits
+    return (values * 10**places).sum(axis=1)
+
+def _fixed_width_float(chars:np.ndarray=None, implied_decimal:bool=False) -> np.ndarray:
+    '''This function converts a fixed-width column of ASCII characters, given as an (N, width) uint8 array, into the (N,) float64
+    array of the decimal numbers it contains (i.e. " 51.6416" or "-.00002182"). The digits are accumulated into an exact integer
+    mantissa that is divided by the matching power of ten, so the result is the same as calling float() on each field. If
+    (implied_decimal) is True, the field is read as having a leading decimal point, as the TLE eccentricity is.'''
+    digits = (chars >= 48) & (chars <= 57)
+    mantissa = _fixed_width_integer(chars)
+    if implied_decimal is True:
+        decimals = digits.sum(axis=1)
+    else:
+        dots = chars == 46
+        decimals = np.where(dots.any(axis=1), (digits & (dots.cumsum(axis=1) > 0)).sum(axis=1), 0)
+    sign = np.where((chars == 45).any(axis=1), -1.0, 1.0)
+    return sign * mantissa / 10.0**decimals
+
+def _fixed_width_exponential(chars:np.ndarray=None) -> np.ndarray:
+    '''This function converts the 8 character, exponential TLE fields (i.e. "-11606-4"), given as an (N, 8) uint8 array, into
+    the (N,) float64 array of their values (i.e. -0.11606e-4). These are the BSTAR drag term and the second time derivative of the
+    mean motion.'''
+    sign = np.where(chars[:, 0] == 45, -1.0, 1.0)
+    mantissa = _fixed_width_integer(chars[:, 1:6]).astype(np.float64)
+    exponent = np.where(chars[:, 6] == 45, -1, 1) * _fixed_width_integer(chars[:, 7:8])
+    places = 5 - exponent
+    return sign * np.where(places >= 0, mantissa / 10.0**np.abs(places), mantissa * 10.0**np.abs(places))
+
+def _checksums(chars:np.ndarray=None) -> np.ndarray:
+    '''This function calculates the Modulo-10 checksums of TLE lines, given as an (N, 69) uint8 array, over their first 68
+    characters. Each digit adds its value and each minus sign adds one, as in the TLE().tle_checksum_algortithm() method.'''
+    return np.add.reduce(_CHECKSUM_VALUES[chars[:, :TLE_LINE_LENGTH - 1]], axis=1, dtype=np.uint16) % 10
+
+def _record_errors(line1_chars:np.ndarray=None, line2_chars:np.ndarray=None) -> np.ndarray:
+    '''This function runs the validity checks of the TLE().check_valid_tle() method on every TLE of a catalog at once, given the
+    characters of their first and second lines as (N, 69) uint8 arrays, and returns the (N,) uint8 array of their error codes.
+    The error code of a TLE is the sum of the TLE_ERROR flags of the checks it fails, so it is TLE_VALID (0) if it passes them all.'''
+    errors = np.zeros(len(line1_chars), dtype=np.uint8)
+    errors |= np.where((line1_chars[:, 0] != 49) | (line2_chars[:, 0] != 50), TLE_ERROR_LINE_NUMBER, 0).astype(np.uint8)
+    errors |= np.where((line1_chars[:, 2:7] != line2_chars[:, 2:7]).any(axis=1), TLE_ERROR_SATELLITE_NUMBER, 0).astype(np.uint8)
+    for chars, flag in ((line1_chars, TLE_ERROR_CHECKSUM_LINE1), (line2_chars, TLE_ERROR_CHECKSUM_LINE2)):
+        errors |= np.where(_checksums(chars) != chars[:, TLE_LINE_LENGTH - 1].astype(np.int16) - 48, flag, 0).astype(np.uint8)
+    return errors
+
+def _lines(buffer=None) -> tuple:
+    '''This function views a raw catalog as a uint8 array without carriage returns, and locates its lines with a single search
+    for newlines. It returns the array, and the start and length of every line.'''
+    buffer = np.frombuffer(buffer, dtype=np.uint8)
+    if (buffer == 13).any():
+        buffer = buffer[buffer != 13]
+    ends = np.flatnonzero(buffer == 10)
+    if len(buffer) and buffer[-1] != 10:
+        ends = np.append(ends, len(buffer))
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    return buffer, starts, ends - starts
+
+def validate_bytes(buffer=None) -> tuple:
+    '''This function validates every TLE of a raw catalog at once, without parsing its elements. The full length lines of the
+    catalog (the TLE lines) are paired in order between the title lines, and each pair is checked for its line numbers, matching
+    satellite numbers, and the Modulo-10 checksums of both lines, all as array operations over a uint8 view of the buffer. A TLE
+    line left without a partner is reported with the TLE_ERROR_MISSING_LINE flag.
+
+    :param buffer: The raw catalog, as bytes or any object supporting the buffer protocol.
+    :return: A boolean mask of the valid TLEs, the uint8 error codes of the TLEs (see the TLE_ERROR flags), and the satellite
+    numbers of their first lines, each as an array with one entry per TLE in the order of the catalog.
+    '''
+    buffer, starts, lengths = _lines(buffer)
+    if len(buffer) == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int64)
+    last = len(buffer) - 1
+    second_chars = np.where(lengths > 1, buffer[np.minimum(starts + 1, last)], 0)
+    is_tle_line = (lengths >= TLE_LINE_LENGTH) & (second_chars == 32)
+
+    # The TLE lines are numbered within each run of consecutive TLE lines, and every even line is paired with the line after it.
+    line = np.flatnonzero(is_tle_line)
+    new_run = np.concatenate(([True], np.diff(line) > 1))
+    run_start = np.maximum.accumulate(np.where(new_run, np.arange(len(line)), 0))
+    first = (np.arange(len(line)) - run_start) % 2 == 0
+    paired = first & np.concatenate((~new_run[1:], [False]))
+    line1 = line[first]
+    line2 = np.where(paired[first], line[np.minimum(np.flatnonzero(first) + 1, len(line) - 1)], -1)
+
+    line1_chars = _gather(buffer, starts[line1], TLE_LINE_LENGTH)
+    line2_chars = _gather(buffer, starts[np.maximum(line2, 0)], TLE_LINE_LENGTH)
+    line2_chars[line2 < 0] = 32
+    errors = _record_errors(line1_chars, line2_chars)
+    errors[line2 < 0] = TLE_ERROR_MISSING_LINE
+    return errors == TLE_VALID, errors, _fixed_width_integer(line1_chars[:, 2:7])
+
+def _tle_pairs(buffer:np.ndarray=None, starts:np.ndarray=None, lengths:np.ndarray=None) -> tuple:
+    '''This function finds the TLEs among the lines of a catalog located by the _lines() function, as the full length lines
+    starting with "1 " that are directly followed by a full length line starting with "2 ". It returns the line numbers of their
+    first lines, the masks of the first and second TLE lines, and the first two characters of every line.'''
+    last = len(buffer) - 1
+    first_chars = np.where(lengths > 0, buffer[np.minimum(starts, last)], 0)
+    second_chars = np.where(lengths > 1, buffer[np.minimum(starts + 1, last)], 0)
+    full_length = (lengths >= TLE_LINE_LENGTH) & (second_chars == 32)
+    is_line1 = full_length & (first_chars == 49)
+    is_line2 = full_length & (first_chars == 50)
+    line1 = np.flatnonzero(is_line1[:-1] & is_line2[1:])
+    return line1, is_line1, is_line2, first_chars, second_chars
+
+def _gather(buffer:np.ndarray=None, starts:np.ndarray=None, width:int=None, lengths:np.ndarray=None) -> np.ndarray:
+    '''This function gathers (width) characters from each of the lines beginning at (starts) into an (N, width) uint8 array. If
+    the (lengths) of the lines are given, characters past the end of each line are returned as spaces.'''
+    index = starts[:, None] + np.arange(width)
+    if lengths is None:
+        return buffer[index]
+    chars = buffer[np.minimum(index, len(buffer) - 1)]
+    chars[np.arange(width) >= lengths[:, None]] = 32
+    return chars
+
+def read_keys(buffer=None) -> tuple:
+    '''This function reads the keys of the TLEs of a raw catalog, which are the satellite number, the element set number, and the
+    epoch, from their first lines without parsing any other element. The TLEs are located as in the ElementSet.from_bytes() method,
+    and the located lines are returned along with the keys, so that the TLEs can be read again without another search.
+
+    :param buffer: The raw catalog, as bytes or any object supporting the buffer protocol.
+    :return: The keys of the TLEs, as an array of the CATALOG_KEY_DTYPE in the order of the catalog, and the CatalogLines of the
+    catalog, which hold the catalog as a uint8 array, the start and length of every line, the line numbers of the first lines of
+    the TLEs, and the mask of the TLE lines.
+    '''
+    buffer, starts, lengths = _lines(buffer)
+    if len(buffer) == 0:
+        line1 = is_tle_line = np.zeros(0, dtype=np.int64)
+    else:
+        line1, is_line1, is_line2 = _tle_pairs(buffer, starts, lengths)[:3]
+        is_tle_line = is_line1 | is_line2
+    chars = _gather(buffer, starts[line1], TLE_LINE_LENGTH)
+    keys = np.zeros(len(line1), dtype=CATALOG_KEY_DTYPE)
+    keys['satellite_number'] = _fixed_width_integer(chars[:, 2:7])
+    keys['element_set_number'] = _fixed_width_integer(chars[:, 64:68])
+    keys['epoch'] = units.epoch_to_datetime64(units.full_epoch_year(_fixed_width_integer(chars[:, 18:20])), _fixed_width_float(chars[:, 20:32]))
+    return keys, CatalogLines(buffer=buffer, starts=starts, lengths=lengths, line1=line1, is_tle_line=is_tle_line)
+
+class ElementSet(object):
+    '''This class is a columnar container holding the elements of a whole catalog of Two-Line Elements (TLE). The elements are
+    stored in a single structured NumPy array (see ELEMENT_DTYPE) with one fixed-size row per TLE, so each element of the catalog,
+    such as the inclination, is available as an array through indexing (i.e. element_set['inclination']). The satellite titles are
+    kept in a separate string array, as they are the only variable length element.
+
+    An ElementSet is built directly from the raw bytes of a catalog file with the from_bytes() or from_file() methods, which slice
+    and convert every fixed-width column of every TLE at once instead of one TLE at a time.
+    '''
+
+    def __init__(self, data:np.ndarray=None, titles:np.ndarray=None):
+        data = np.zeros(0, dtype=ELEMENT_DTYPE) if data is None else data
+        assert isinstance(data, np.ndarray) and data.dtype == ELEMENT_DTYPE, 'The (data) parameter must be a NumPy array of the ELEMENT_DTYPE. Please check the value passed in for (data).'
+        titles = np.full(len(data), '', dtype=f'U{TITLE_LENGTH}') if titles is None else np.asarray(titles)
+        assert len(titles) == len(data), 'The (titles) parameter must have one title for each element set. Please check the value passed in for (titles).'
+        self.data = data
+        self.titles = titles
+        return
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.data[key]
+        if isinstance(key, (int, np.integer)):
+            key = [key]
+        return ElementSet(data=self.data[key], titles=self.titles[key])
+
+    def __repr__(self):
+        return f'ElementSet({len(self)} element sets)'
+
+    @classmethod
+    def from_bytes(cls, buffer=None, validate:bool=False):
+        '''This method parses a catalog of Two-Line Elements (TLE) from its raw bytes into an ElementSet. The buffer is viewed as a
+        uint8 array, the line boundaries are located with a single search for newlines, and each element is then converted for every
+        TLE at once from its fixed columns. Both the 2-line and 3-line formats are supported: a line that is directly followed by a
+        TLE, and is not a TLE line itself, is taken as its title. Lines are expected to start in the first column, as they do in the
+        catalog files published by CelesTrak and Space-Track.
+
+        If (validate) is True, the satellite numbers and checksums of every TLE are checked as well (see the validate_bytes()
+        function), and the TLEs that fail are left out.
+
+        :param buffer: The raw catalog, as bytes or any object supporting the buffer protocol.
+        :param validate: If this is True, the TLEs that fail the validity checks are left out.
+        :return: An ElementSet holding every TLE in the catalog.
+        '''
+        buffer, starts, lengths = _lines(buffer)
+        if len(buffer) == 0:
+            return cls()
+
+        line1, is_line1, is_line2, first_chars, second_chars = _tle_pairs(buffer, starts, lengths)
+        line1_chars = _gather(buffer, starts[line1], TLE_LINE_LENGTH)
+        line2_chars = _gather(buffer, starts[line1 + 1], TLE_LINE_LENGTH)
+        if validate is True:
+            valid = _record_errors(line1_chars, line2_chars) == TLE_VALID
+            line1, line1_chars, line2_chars = line1[valid], line1_chars[valid], line2_chars[valid]
+
+        data = np.zeros(len(line1), dtype=ELEMENT_DTYPE)
+        data['satellite_number'] = _fixed_width_integer(line1_chars[:, 2:7])
+        data['element_set_number'] = _fixed_width_integer(line1_chars[:, 64:68])
+        year = _fixed_width_integer(line1_chars[:, 18:20])
+        data['epoch_year'] = units.full_epoch_year(year)
+        data['epoch'] = _fixed_width_float(line1_chars[:, 20:32])
+        data['ballistic_coeffecient'] = _fixed_width_float(line1_chars[:, 33:43])
+        data['second_time_derivative_of_mean_motion'] = _fixed_width_exponential(line1_chars[:, 44:52])
+        data['bstar_drag_term'] = _fixed_width_exponential(line1_chars[:, 53:61])
+        data['inclination'] = _fixed_width_float(line2_chars[:, 8:16])
+        data['right_ascension'] = _fixed_width_float(line2_chars[:, 17:25])
+        data['eccentricity'] = _fixed_width_float(line2_chars[:, 26:33], implied_decimal=True)
+        data['argument_periapsis'] = _fixed_width_float(line2_chars[:, 34:42])
+        data['mean_anomaly'] = _fixed_width_float(line2_chars[:, 43:51])
+        data['mean_motion'] = _fixed_width_float(line2_chars[:, 52:63])
+        data['revolution'] = _fixed_width_integer(line2_chars[:, 63:68])
+
+        titles = np.full(len(line1), '', dtype=f'U{TITLE_LENGTH}')
+        title_lines = line1 - 1
+        has_title = (title_lines >= 0) & (lengths[np.maximum(title_lines, 0)] > 0) & ~is_line1[np.maximum(title_lines, 0)] & ~is_line2[np.maximum(title_lines, 0)]
+        if has_title.any():
+            title_lines = title_lines[has_title]
+            title_starts = starts[title_lines]
+            title_lengths = lengths[title_lines]
+            prefixed = (first_chars[title_lines] == 48) & (second_chars[title_lines] == 32)
+            title_starts = title_starts + 2 * prefixed
+            title_lengths = np.minimum(title_lengths - 2 * prefixed, TITLE_LENGTH)
+            title_chars = _gather(buffer, title_starts, TITLE_LENGTH, title_lengths)
+            titles[has_title] = np.char.strip(np.char.decode(title_chars.view(f'S{TITLE_LENGTH}').ravel(), 'ascii', 'replace'))
+        return cls(data=data, titles=titles)
+
+    @classmethod
+    def from_file(cls, source=None):
+        '''This method reads a catalog of Two-Line Elements (TLE) from a path or a binary file object, and parses it into an
+        ElementSet with the from_bytes() method.
+
+        :param source: A path to a catalog file, or a file object opened on one in binary mode.
+        :return: An ElementSet holding every TLE in the catalog.
+        '''
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as catalog:
+                return cls.from_bytes(catalog.read())
+        return cls.from_bytes(source.read())
+
+    @classmethod
+    def from_records(cls, records=None):
+        '''This method builds an ElementSet from an iterable of TLERecords, such as the records yielded by the TLECatalogReader.
+
+        :param records: An iterable of TLERecords.
+        :return: An ElementSet holding the elements of each of the records.
+        '''
+        records = list(records)
+        data = np.zeros(len(records), dtype=ELEMENT_DTYPE)
+        for name in ELEMENT_DTYPE.names:
+            data[name] = [getattr(record, name) for record in records]
+        data['epoch_year'] = units.full_epoch_year(data['epoch_year'])
+        titles = np.array([record.title for record in records], dtype=f'U{TITLE_LENGTH}')
+        return cls(data=data, titles=titles)
+
+    def epoch_datetime64(self) -> np.ndarray:
+        '''This method converts the epoch year and epoch day of every element set into a single array of NumPy datetime64 values,
+        without creating a datetime object for each TLE.
+
+        :return: The epochs of the element sets, as a datetime64[ns] array.
+        '''
+        return units.epoch_to_datetime64(self.data['epoch_year'], self.data['epoch'])
+
+    def epoch_julian(self) -> np.ndarray:
+        '''This method converts the epoch year and epoch day of every element set into a single array of Julian dates. The
+        datetime64 epochs of the epoch_datetime64() method are more precise (to the nanosecond), so they should be preferred for
+        time differences, while the Julian dates are what astronomical formulas (such as the sidereal time) are written in.
+
+        :return: The epochs of the element sets, as a float64 array of Julian dates.
+        '''
+        return np.atleast_1d(units.epoch_to_julian(self.data['epoch_year'], self.data['epoch']))
+
+    def to_dataframe(self, titles:bool=False):
+        '''This method returns the element sets as a Pandas DataFrame with one row per TLE and one column per element. The numeric
+        columns of the DataFrame are views onto the structured array of the ElementSet, so no element data is copied.
+
+        :param titles: If this is True, a (title) column is added. The titles are copied into the DataFrame.
+        :return: a Pandas DataFrame of the element sets.
+        '''
+        columns = {name: self.data[name] for name in ELEMENT_DTYPE.names}
+        import pandas as pd
+        df = pd.DataFrame(columns, copy=False)
+        if titles is True:
+            df.insert(0, 'title', self.titles.astype(object))
+        return df
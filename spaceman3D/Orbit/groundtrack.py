@@ -0,0 +1,94 @@
+import numpy as np
+from spaceman3D.Orbit import units
+from spaceman3D.Orbit.sgp4 import gstime
+from spaceman3D.Orbit.propagator import Propagator
+
+#################### WGS84 Ellipsoid ####################
+
+WGS84_RADIUS = 6378.137
+WGS84_FLATTENING = 1/298.257223563
+WGS84_ECCENTRICITY_SQUARED = WGS84_FLATTENING * (2 - WGS84_FLATTENING)
+
+def gmst(times=None):
+    '''This function returns the Greenwich Mean Sidereal Time (radians) at the (times), which is the angle the Earth has
+    rotated through relative to the inertial frame. UTC is used in place of UT1, which differ by less than a second.
+
+    :param times: The times, as a NumPy datetime64 scalar or array.
+    :return: The Greenwich Mean Sidereal Time (radians), with the shape of (times).
+    '''
+    return gstime(units.datetime64_to_julian(times))
+
+def eci_to_ecef(positions=None, times=None) -> np.ndarray:
+    '''This function rotates inertial positions into the Earth-centered, Earth-fixed (ECEF) frame, by rotating them about the
+    z-axis by the Greenwich Mean Sidereal Time of their times. The (positions) are an (..., M, 3) array, such as the (N, M, 3)
+    positions of a catalog from the Propagator, and the (times) are the M matching times (or an array with the shape of the
+    positions without their last axis).
+
+    :param positions: The inertial (TEME) positions.
+    :param times: The times of the positions, as NumPy datetime64 values.
+    :return: The ECEF positions, with the shape of (positions).
+    '''
+    positions = np.asarray(positions, dtype=np.float64)
+    theta = gmst(times)
+    cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+    ecef = np.empty_like(positions)
+    ecef[..., 0] = cos_theta*positions[..., 0] + sin_theta*positions[..., 1]
+    ecef[..., 1] = -sin_theta*positions[..., 0] + cos_theta*positions[..., 1]
+    ecef[..., 2] = positions[..., 2]
+    return ecef
+
+def ecef_to_geodetic(ecef=None, iterations:int=5) -> tuple:
+    '''This function converts Earth-centered, Earth-fixed (ECEF) positions into geodetic latitudes, longitudes and altitudes
+    above the WGS84 ellipsoid. The latitude is found by fixed-point iteration, which converges to well under a millimeter in a
+    few iterations for any point outside of the Earth's core.
+
+    :param ecef: The ECEF positions (km), as an (..., 3) array.
+    :param iterations: The number of iterations for the latitude.
+    :return: The geodetic latitudes (degrees), longitudes (degrees, in [-180, 180)) and altitudes (km).
+    '''
+    ecef = np.asarray(ecef, dtype=np.float64)
+    x, y, z = ecef[..., 0], ecef[..., 1], ecef[..., 2]
+    p = np.hypot(x, y)
+    longitude = np.arctan2(y, x)
+    latitude = np.arctan2(z, p * (1 - WGS84_ECCENTRICITY_SQUARED))
+    for i in range(iterations):
+        sin_latitude = np.sin(latitude)
+        N = WGS84_RADIUS / np.sqrt(1 - WGS84_ECCENTRICITY_SQUARED * sin_latitude**2)
+        latitude = np.arctan2(z + N * WGS84_ECCENTRICITY_SQUARED * sin_latitude, p)
+    sin_latitude = np.sin(latitude)
+    altitude = p*np.cos(latitude) + z*sin_latitude - WGS84_RADIUS*np.sqrt(1 - WGS84_ECCENTRICITY_SQUARED * sin_latitude**2)
+    longitude = np.remainder(units.radian_to_degree(longitude) + 180, 360) - 180
+    return units.radian_to_degree(latitude)[()], longitude[()], altitude[()]
+
+def geodetic_to_ecef(latitude=None, longitude=None, altitude=0.0) -> np.ndarray:
+    '''This function converts geodetic latitudes, longitudes and altitudes above the WGS84 ellipsoid into Earth-centered,
+    Earth-fixed (ECEF) positions, such as the positions of ground stations. The inputs can be scalars or broadcastable arrays.
+
+    :param latitude: The geodetic latitude (degrees).
+    :param longitude: The longitude (degrees).
+    :param altitude: The altitude (km).
+    :return: The ECEF positions (km), as an (..., 3) array.
+    '''
+    latitude, longitude = units.degree_to_radian(latitude), units.degree_to_radian(longitude)
+    latitude, longitude, altitude = np.broadcast_arrays(latitude, longitude, np.asarray(altitude, dtype=np.float64))
+    sin_latitude, cos_latitude = np.sin(latitude), np.cos(latitude)
+    N = WGS84_RADIUS / np.sqrt(1 - WGS84_ECCENTRICITY_SQUARED * sin_latitude**2)
+    return np.stack(((N + altitude) * cos_latitude * np.cos(longitude),
+                     (N + altitude) * cos_latitude * np.sin(longitude),
+                     (N * (1 - WGS84_ECCENTRICITY_SQUARED) + altitude) * sin_latitude), axis=-1)
+
+def ground_track(elements=None, times=None, backend:str='sgp4', workers:int=None) -> tuple:
+    '''This function computes the ground tracks of a whole catalog, which are the geodetic coordinates of the point on the
+    Earth directly below each satellite (the sub-satellite point) at each of the (times). The satellites are propagated to every
+    time at once with the Propagator, rotated into the Earth-fixed frame, and converted into geodetic coordinates.
+
+    :param elements: An ElementSet, a TLE, or a list of TLEs, or a Propagator that is already initialized for the catalog.
+    :param times: The times, as a one-dimensional array of NumPy datetime64 values.
+    :param backend: The propagation backend, either 'sgp4' or 'kepler'. It is not used if (elements) is a Propagator.
+    :param workers: The number of worker processes to propagate with. See Propagator().propagate().
+    :return: The latitudes (degrees), longitudes (degrees) and altitudes (km), each as an (N, M) array.
+    '''
+    times = np.atleast_1d(np.asarray(times, dtype='datetime64[ns]'))
+    propagator = elements if isinstance(elements, Propagator) else Propagator(elements, backend=backend)
+    positions = propagator.propagate(times, velocity=False, workers=workers)
+    return ecef_to_geodetic(eci_to_ecef(positions, times))
@@ -0,0 +1,131 @@
+import numpy as np
+from spaceman3D.Orbit.orbit import to_datetime64
+from spaceman3D.Orbit.elements import ElementSet
+from spaceman3D.Orbit.propagator import Propagator, as_element_set
+
+class ElementHistory(object):
+    '''This class holds the history of element sets of one or more satellites, sorted by satellite number and epoch, and
+    propagates each satellite to a time from the element set it had at that time. For every query time the nearest preceding
+    element set of the satellite is selected with a single merge of the sorted epochs and the sorted times (times before the first
+    element set of a satellite use its first element set), and all of the selected element sets are then propagated in one
+    batched call of the Propagator. This reconstructs past tracks from the element sets that were current along them, instead
+    of propagating a single element set for weeks.
+
+    Example:
+
+        history = ElementHistory.from_archive(ElementArchive('history'), [25544], start=np.datetime64('2019-01-01'))
+        positions, velocities = history.propagate(np.arange('2019-01-01', '2019-02-01', dtype='datetime64[h]'))
+    '''
+
+    def __init__(self, elements=None, backend:str='sgp4'):
+        assert backend in Propagator.backends, f'The (backend) parameter must be one of {Propagator.backends}. Please check the value passed in for (backend).'
+        elements = as_element_set(elements)
+        assert len(elements) > 0, 'The (elements) parameter must hold at least one element set. Please check the value passed in for (elements).'
+        epochs = elements.epoch_datetime64()
+        order = np.lexsort((epochs, elements['satellite_number']))
+        self.elements = elements[order]
+        self.epochs = epochs[order]
+        self.backend = backend
+        numbers = self.elements['satellite_number']
+        self.satellite_numbers, self.first = np.unique(numbers, return_index=True)
+        self.rank = np.cumsum(np.concatenate(([False], numbers[1:] != numbers[:-1])))
+        return
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __repr__(self):
+        return f'ElementHistory({len(self.satellite_numbers)} satellites, {len(self)} element sets)'
+
+    @classmethod
+    def from_archive(cls, archive=None, satellite_numbers=None, start=None, stop=None, backend:str='sgp4'):
+        '''This method loads the histories of satellites from an ElementArchive. Along with the element sets with epochs from the
+        (start) up to the (stop), the last element set before the (start) is loaded, as it is the one that is current at the (start).
+
+        :param archive: The ElementArchive.
+        :param satellite_numbers: The satellite number, or a list of them.
+        :param start: If it is given, the earliest time the history is needed for.
+        :param stop: If it is given, the epoch (exclusive) up to which element sets are loaded.
+        :param backend: The propagation backend, either 'sgp4' or 'kepler'.
+        :return: An ElementHistory of the satellites.
+        '''
+        histories = []
+        for number in np.atleast_1d(satellite_numbers):
+            history = archive.satellite(int(number), stop=stop)
+            if start is not None and len(history):
+                current = np.searchsorted(history.epoch_datetime64(), to_datetime64(start), side='right') - 1
+                history = history[np.arange(max(current, 0), len(history))]
+            histories.append(history)
+        return cls(ElementSet(data=np.concatenate([history.data for history in histories]),
+                              titles=np.concatenate([history.titles for history in histories])), backend=backend)
+
+    def select(self, times=None, satellite_numbers=None) -> np.ndarray:
+        '''This method selects the element set of each satellite that is current at each of the (times), which is the element set
+        with the latest epoch at or before the time, or the first element set of the satellite for times before it.
+
+        :param times: The times, as a one-dimensional array of NumPy datetime64 values.
+        :param satellite_numbers: The satellite numbers to select for. By default every satellite of the history is used.
+        :return: The indices of the selected element sets in (elements), as an (S, M) array.
+        '''
+        times = np.atleast_1d(to_datetime64(times))
+        assert times.ndim == 1, 'The (times) parameter must be a one-dimensional array of times. Please check the value passed in for (times).'
+        numbers = self.satellite_numbers if satellite_numbers is None else np.atleast_1d(satellite_numbers)
+        ranks = np.searchsorted(self.satellite_numbers, numbers)
+        assert np.all(ranks < len(self.satellite_numbers)) and np.all(self.satellite_numbers[np.minimum(ranks, len(self.satellite_numbers) - 1)] == numbers), 'Every satellite in (satellite_numbers) must be in the history. Please check the value passed in for (satellite_numbers).'
+
+        # The element sets and the queries are merged in (satellite, time) order, with each element set placed before the queries at
+        # its epoch, so the last element set before each query is the running maximum of the element set indices.
+        query_ranks = np.repeat(ranks, len(times))
+        query_times = np.tile(times, len(ranks))
+        keys_rank = np.concatenate((self.rank, query_ranks))
+        keys_time = np.concatenate((self.epochs, query_times))
+        is_query = np.arange(len(keys_rank)) >= len(self)
+        order = np.lexsort((is_query, keys_time, keys_rank))
+        latest = np.maximum.accumulate(np.where(is_query[order], -1, order))
+        preceding = np.empty(len(query_ranks), dtype=np.int64)
+        preceding[order[is_query[order]] - len(self)] = latest[is_query[order]]
+
+        # A query before the first element set of its satellite finds the element set of another satellite, or none at all.
+        other = (preceding < 0) | (self.rank[np.maximum(preceding, 0)] != query_ranks)
+        selected = np.where(other, self.first[query_ranks], preceding)
+        return selected.reshape(len(ranks), len(times))
+
+    def propagate(self, times=None, satellite_numbers=None, velocity:bool=True):
+        '''This method propagates each satellite to each of the (times) from the element set that is current at that time (see
+        the select() method). Every selected element set is initialized once, and propagated to all of the times it was selected
+        for. The element sets are propagated in batches of the ones selected for a similar number of times (up to the same power
+        of two), so the padding of the batches stays below the number of times propagated, however uneven the selection is.
+
+        :param times: The times, as a one-dimensional array of NumPy datetime64 values.
+        :param satellite_numbers: The satellite numbers to propagate. By default every satellite of the history is propagated.
+        :param velocity: If this is True, the velocities are returned along with the positions.
+        :return: The positions (km) as an (S, M, 3) array, and if (velocity) is True, the velocities (km/s) as an (S, M, 3) array.
+        '''
+        times = np.atleast_1d(to_datetime64(times))
+        selected = self.select(times, satellite_numbers)
+        seconds = ((times[None, :] - self.epochs[selected]) / np.timedelta64(1, 's')).ravel()
+
+        # Each time gets a column in the row of its element set, and the rows are batched by their length rounded up to a power of two.
+        used, inverse, counts = np.unique(selected.ravel(), return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind='stable')
+        column = np.empty(len(inverse), dtype=np.int64)
+        column[order] = np.arange(len(inverse)) - np.repeat(np.cumsum(counts) - counts, counts)
+        width = np.left_shift(1, np.ceil(np.log2(counts)).astype(np.int64))
+        row = np.empty(len(used), dtype=np.int64)
+
+        states = [np.empty((len(inverse), 3)) for state in range(2 if velocity else 1)]
+        for size in np.unique(width):
+            rows = np.flatnonzero(width == size)
+            row[rows] = np.arange(len(rows))
+            members = np.flatnonzero(width[inverse] == size)
+            grid = np.zeros((len(rows), size))
+            grid[row[inverse[members]], column[members]] = seconds[members]
+            batch = Propagator(self.elements[used[rows]], backend=self.backend).propagate(grid, since_epoch=True, velocity=velocity)
+            for state, values in zip(states, batch if velocity else (batch,)):
+                state[members] = values[row[inverse[members]], column[members]]
+
+        shape = selected.shape + (3,)
+        if velocity is False:
+            return states[0].reshape(shape)
+        return states[0].reshape(shape), states[1].reshape(shape)
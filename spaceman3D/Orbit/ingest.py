@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import http.client
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, quote
+from spaceman3D.Orbit.tle import TLE
+
+CELESTRAK_URL = 'https://celestrak.org/NORAD/elements/gp.php?GROUP={group}&FORMAT=tle'
+
+class ConnectionPool(object):
+    '''This class keeps HTTP/1.1 connections open between requests, so that a series of downloads from the same server reuses
+    its connections instead of paying for a new TCP (and TLS) handshake on every request. Idle connections are kept per scheme,
+    host, and port, and a connection is taken out of the pool for the duration of each request, so the pool can be shared by
+    several threads.
+    '''
+
+    def __init__(self, timeout:float=30.0):
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.opened = 0
+        return
+
+    def connection(self, scheme:str=None, host:str=None, port:int=None):
+        '''This method takes an idle connection to the server out of the pool, or opens a new one if there is none.'''
+        with self.lock:
+            idle = self.idle.get((scheme, host, port))
+            if idle:
+                return idle.pop()
+            self.opened += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def request(self, url:str=None, headers:dict=None) -> tuple:
+        '''This method sends a GET request over a pooled connection and reads the whole response. The connection is returned to
+        the pool afterwards, unless the server asked to close it. A connection whose request fails, such as one the server closed
+        while it was idle or one that timed out, is discarded, and the request is retried once on a new connection.
+
+        :param url: The URL to request.
+        :param headers: The headers of the request.
+        :return: The status code, the headers of the response (with lower case names), and the body of the response.
+        '''
+        parts = urlsplit(url)
+        assert parts.scheme in ('http', 'https'), 'The (url) parameter must be an http or https URL. Please check the value passed in for (url).'
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        for attempt in range(2):
+            connection = self.connection(*key)
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if attempt == 0:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self.lock:
+                    self.idle.setdefault(key, []).append(connection)
+            return response.status, {name.lower(): value for name, value in response.getheaders()}, body
+
+    def close(self):
+        '''This method closes every idle connection of the pool.'''
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+        return
+
+class ResponseCache(object):
+    '''This class stores downloaded catalogs on disk, along with the validators (the ETag and the Last-Modified date) the server
+    sent with them, so that the next download of the same URL can be a conditional request. Each URL is stored as a body file and
+    a metadata file named by the hash of the URL. Both files are written to temporary files that then replace them, the metadata
+    file last, so an interrupted write leaves the previous response in place.
+    '''
+
+    def __init__(self, directory:str=None):
+        assert isinstance(directory, (str, os.PathLike)), 'The (directory) parameter must be a path. Please check the value passed in for (directory).'
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        return
+
+    def paths(self, url:str=None) -> tuple:
+        '''This method returns the paths of the body and metadata files of a URL.'''
+        name = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.directory, name + '.body'), os.path.join(self.directory, name + '.json')
+
+    def load(self, url:str=None) -> tuple:
+        '''This method loads the cached response of a URL.
+
+        :param url: The URL.
+        :return: The metadata and the body of the cached response, or (None, None) if the URL is not cached.
+        '''
+        body_path, metadata_path = self.paths(url)
+        if not os.path.exists(metadata_path):
+            return None, None
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+        with open(body_path, 'rb') as file:
+            body = file.read()
+        if len(body) != metadata['length']:
+            return None, None
+        return metadata, body
+
+    def store(self, url:str=None, headers:dict=None, body:bytes=None):
+        '''This method stores a response to a URL, with the validators in its (headers).'''
+        body_path, metadata_path = self.paths(url)
+        with open(body_path + '.tmp', 'wb') as file:
+            file.write(body)
+        os.replace(body_path + '.tmp', body_path)
+        metadata = {'url': url, 'etag': headers.get('etag'), 'last_modified': headers.get('last-modified'), 'length': len(body)}
+        with open(metadata_path + '.tmp', 'w') as file:
+            json.dump(metadata, file)
+        os.replace(metadata_path + '.tmp', metadata_path)
+        return
+
+class CatalogFetcher(object):
+    '''This class downloads catalog groups (such as 'stations' or 'active') from CelesTrak, or from any server whose URL for a
+    group is given as a template with a {group} field. The downloads go through a ConnectionPool, so the requests of a session
+    reuse the same keep-alive connections. With a (cache) directory, every download is stored in a ResponseCache, and the next
+    download of the group is a conditional request (If-None-Match and If-Modified-Since) that the server answers with an empty
+    304 (Not Modified) response while the group is unchanged, in which case the cached catalog is returned.
+
+    Several groups are downloaded concurrently with the fetch_all() method, which runs the downloads as asyncio tasks, each doing
+    its blocking HTTP request on a thread of a pool of (connections) threads. The downloaded catalogs are raw bytes, which can be
+    streamed through the TLECatalogReader with the records() method, or passed into ElementSet.from_bytes() or Catalog().refresh().
+    Extra (headers), such as the session cookie of a Space-Track login, are sent with every request.
+
+    Example:
+
+        fetcher = CatalogFetcher(cache='~/.spaceman3D/catalogs')
+        catalogs = fetcher.fetch_all(['stations', 'active'])
+        records = list(fetcher.records('stations'))
+    '''
+
+    def __init__(self, url:str=CELESTRAK_URL, cache:str=None, connections:int=4, timeout:float=30.0, headers:dict=None):
+        assert isinstance(url, str) and '{group}' in url, 'The (url) parameter must be a URL template with a {group} field. Please check the value passed in for (url).'
+        assert isinstance(connections, int) and connections > 0, 'The (connections) parameter must be a positive integer. Please check the value passed in for (connections).'
+        self.url = url
+        self.cache = None if cache is None else ResponseCache(os.path.expanduser(cache))
+        self.pool = ConnectionPool(timeout=timeout)
+        self.connections = connections
+        self.headers = dict(headers or {})
+        self.status = {}
+        self.executor = None
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def group_url(self, group:str=None) -> str:
+        '''This method returns the URL of a catalog group.'''
+        return self.url.format(group=quote(group))
+
+    def fetch(self, group:str=None) -> bytes:
+        '''This method downloads a catalog group. If the group is cached, the request is conditional on the cached validators, and
+        the cached catalog is returned when the server reports that it has not been modified. The outcome of the request is kept in
+        (status) under the group, as 'fetched' or 'not modified'.
+
+        :param group: The name of the catalog group.
+        :return: The catalog, as raw bytes.
+        '''
+        assert isinstance(group, str), 'The (group) parameter must be of type string. Please check the value passed in for (group).'
+        url = self.group_url(group)
+        metadata, cached = self.cache.load(url) if self.cache is not None else (None, None)
+        headers = dict(self.headers)
+        if metadata is not None:
+            if metadata['etag']:
+                headers['If-None-Match'] = metadata['etag']
+            if metadata['last_modified']:
+                headers['If-Modified-Since'] = metadata['last_modified']
+
+        status, response_headers, body = self.pool.request(url, headers=headers)
+        if status == 304 and cached is not None:
+            self.status[group] = 'not modified'
+            return cached
+        if status != 200:
+            raise ConnectionError(f'The request for the ({group}) group failed with the HTTP status {status}.')
+        if self.cache is not None:
+            self.cache.store(url, response_headers, body)
+        self.status[group] = 'fetched'
+        return body
+
+    async def fetch_async(self, group:str=None) -> bytes:
+        '''This method is the asyncio version of the fetch() method. The request runs on the thread pool of the fetcher, so the
+        event loop is free while it waits for the server.'''
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.connections)
+        return await asyncio.get_event_loop().run_in_executor(self.executor, self.fetch, group)
+
+    async def fetch_all_async(self, groups=None) -> dict:
+        '''This method downloads several catalog groups concurrently, as one asyncio task per group.
+
+        :param groups: The names of the catalog groups.
+        :return: A dictionary of the catalogs (raw bytes) by group.
+        '''
+        groups = list(groups)
+        catalogs = await asyncio.gather(*(self.fetch_async(group) for group in groups))
+        return dict(zip(groups, catalogs))
+
+    def fetch_all(self, groups=None) -> dict:
+        '''This method downloads several catalog groups concurrently (see the fetch_all_async() method), from code that is not
+        running in an event loop. The downloads run on an event loop of their own, which is closed afterwards.
+
+        :param groups: The names of the catalog groups.
+        :return: A dictionary of the catalogs (raw bytes) by group.
+        '''
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.fetch_all_async(groups))
+        finally:
+            loop.close()
+
+    def records(self, group:str=None, on_error=None):
+        '''This method downloads a catalog group and streams it through the TLECatalogReader.
+
+        :param group: The name of the catalog group.
+        :param on_error: An optional function that is called with a TLECatalogError for each bad record in the catalog.
+        :return: A TLECatalogReader that yields a TLERecord for each valid TLE of the group.
+        '''
+        return TLE().read_catalog(io.BytesIO(self.fetch(group)), on_error=on_error)
+
+    def close(self):
+        '''This method closes the pooled connections and the thread pool of the fetcher.'''
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.pool.close()
+        return
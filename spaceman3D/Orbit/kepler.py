@@ -0,0 +1,57 @@
+import numpy as np
+
+def solve_kepler(mean_anomaly=None, eccentricity=None, tolerance:float=1e-12, max_iterations:int=50):
+    '''This function solves Kepler's equation (M = E - e*sin(E)) for the eccentric anomaly (E), given the mean anomaly (M) and the
+    eccentricity (e) of an elliptical orbit. The inputs can be scalars or NumPy arrays of any shapes that broadcast together, such as
+    an (N, 1) column of eccentricities for N satellites against an (N, M) grid of mean anomalies at M timesteps, and the whole array
+    is solved at once.
+
+    The mean anomalies are first reduced into the range [-π, π), and each solution starts from Danby's starter (E = M + 0.85e*sign(sin M)),
+    which keeps Newton's method convergent even for highly eccentric orbits. The Newton iterations then only update the elements that
+    have not yet converged to within the (tolerance), so a few slowly converging elements do not cost a full pass over the array.
+
+    :param mean_anomaly: The mean anomaly (radians).
+    :param eccentricity: The eccentricity, which must be in the range [0, 1).
+    :param tolerance: The size of the final Newton step (radians) below which an element is considered converged.
+    :param max_iterations: The maximum number of Newton iterations.
+    :return: The eccentric anomaly (radians), with the broadcast shape of the inputs. The solution keeps the same number of whole
+    revolutions as the mean anomaly that was passed in.
+    '''
+    assert tolerance > 0, 'The (tolerance) parameter must be positive. Please check the value passed in for (tolerance).'
+    assert isinstance(max_iterations, int) and max_iterations > 0, 'The (max_iterations) parameter must be a positive integer. Please check the value passed in for (max_iterations).'
+
+    mean_anomaly, eccentricity = np.broadcast_arrays(np.asarray(mean_anomaly, dtype=np.float64), np.asarray(eccentricity, dtype=np.float64))
+    assert np.all((eccentricity >= 0) & (eccentricity < 1)), 'The (eccentricity) must be in the range [0, 1) for an elliptical orbit. Please check the value passed in for (eccentricity).'
+
+    shape = mean_anomaly.shape
+    mean_anomaly = mean_anomaly.ravel()
+    eccentricity = eccentricity.ravel()
+    reduced = np.remainder(mean_anomaly + np.pi, 2*np.pi) - np.pi
+
+    eccentric_anomaly = reduced + 0.85 * eccentricity * np.sign(np.sin(reduced))
+    active = np.arange(eccentric_anomaly.size)
+    for i in range(max_iterations):
+        E, e, M = eccentric_anomaly[active], eccentricity[active], reduced[active]
+        step = (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+        eccentric_anomaly[active] = E - step
+        active = active[np.abs(step) > tolerance]
+        if active.size == 0:
+            break
+
+    eccentric_anomaly += mean_anomaly - reduced
+    return eccentric_anomaly.reshape(shape)[()]
+
+def true_anomaly_from_eccentric(eccentric_anomaly=None, eccentricity=None):
+    '''This function converts the eccentric anomaly (E) of an elliptical orbit into its true anomaly (ν), using the half-angle
+    form (ν = 2*arctan2(sqrt(1+e)*sin(E/2), sqrt(1-e)*cos(E/2))), which is well behaved over the whole orbit. The inputs can be
+    scalars or broadcastable NumPy arrays.
+
+    :param eccentric_anomaly: The eccentric anomaly (radians).
+    :param eccentricity: The eccentricity.
+    :return: The true anomaly (radians), in the range (-π, π].
+    '''
+    eccentric_anomaly = np.asarray(eccentric_anomaly, dtype=np.float64)
+    eccentricity = np.asarray(eccentricity, dtype=np.float64)
+    true_anomaly = 2*np.arctan2(np.sqrt(1 + eccentricity) * np.sin(eccentric_anomaly/2.0), np.sqrt(1 - eccentricity) * np.cos(eccentric_anomaly/2.0))
+    # The half angle puts E in (π, 2π) (and past whole revolutions) outside of (-π, π], so the result is wrapped back into it.
+    return (np.pi - np.remainder(np.pi - true_anomaly, 2*np.pi))[()]
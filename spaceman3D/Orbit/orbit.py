@@ -3,12 +3,39 @@ from datetime import datetime, timedelta
 import pytz as tz
 import urllib
 from spaceman3D.Orbit.tle import TLE
+from spaceman3D.Orbit.kepler import solve_kepler, true_anomaly_from_eccentric
+from spaceman3D.Orbit.propagator import rotation_matrices
+from spaceman3D.Orbit import units
 from spaceman3D.Orbit.astronomical_objects import objects
 
+def to_datetime64(times=None) -> np.ndarray:
+    '''This function converts a datetime, a NumPy datetime64, or a list or array of either into a NumPy datetime64[ns] array in
+    UTC. Timezone aware datetimes are converted into UTC, while datetimes without a timezone are taken to already be in UTC.
+
+    :param times: The times to convert.
+    :return: The times, as a datetime64[ns] array.
+    '''
+    def utc(time):
+        if isinstance(time, datetime) and time.tzinfo is not None:
+            return time.astimezone(tz.utc).replace(tzinfo=None)
+        return time
+    if isinstance(times, datetime):
+        return np.asarray(np.datetime64(utc(times), 'ns'))
+    if isinstance(times, (list, tuple)):
+        times = [utc(time) for time in times]
+    return np.asarray(times, dtype='datetime64[ns]')
+
 class Orbital(object):
+    '''This class holds the orbital elements of a single satellite. The quantities derived from the elements (such as the
+    semi-major axis, the mean motion in radians per second, or the orientation matrix of the orbit) are computed the first time
+    they are requested and cached, and the cache is cleared whenever one of the elements they are derived from is set.
+    '''
+
+    derived_from = ('inclination', 'right_ascension', 'eccentricity', 'argument_periapsis', 'mean_motion', 'epoch_date')
 
-    def __init__(self, title:str=None, right_ascension:float=None, eccentricity:float=None, argument_periapsis:float=None, mean_anomaly:float=None, mean_motion:float=None, epoch_date=None):
+    def __init__(self, title:str=None, right_ascension:float=None, eccentricity:float=None, argument_periapsis:float=None, mean_anomaly:float=None, mean_motion:float=None, epoch_date=None, inclination:float=None):
         self.title = title
+        self.inclination = inclination
         self.right_ascension = right_ascension
         self.eccentricity = eccentricity
         self.argument_periapsis = argument_periapsis
@@ -17,70 +44,104 @@ class Orbital(object):
         self.epoch_date = epoch_date
         return
 
+    def __setattr__(self, name, value):
+        if name in self.derived_from:
+            self.__dict__['derived'] = {}
+        object.__setattr__(self, name, value)
+
+    def cached(self, key, calculation):
+        '''This method returns the derived quantity stored under the (key) in the cache, and only calls the (calculation)
+        function to compute it when it is not cached yet. The cache is cleared when any of the elements in (derived_from) is set.
+
+        :param key: The name of the derived quantity, which is a tuple when it also depends on a parameter (i.e. the body).
+        :param calculation: A function without parameters computing the derived quantity.
+        :return: The derived quantity.
+        '''
+        derived = self.__dict__.setdefault('derived', {})
+        if key not in derived:
+            derived[key] = calculation()
+        return derived[key]
+
     def import_tle(self, tle:str=None):
         '''This method takes a Two line Element (TLE) as a multi-line string into the (tle) parameter. It then uses the
-        TLE module's, satellite_orbital_elements method to return the core orbital elements. These returned core elements
-        are used to populate class variables.
+        TLE module's tle_record method to parse the TLE once, and the core orbital elements of the returned TLERecord
+        are used to populate class variables. A TLERecord can also be passed in directly.
 
-        :param tle: The Two-Line Element (TLE).
+        :param tle: The Two-Line Element (TLE), or a TLERecord.
         :return: Nothing
         '''
-        self.title, self.inclination, self.right_ascension, self.eccentricity, self.argument_periapsis, self.mean_anomaly, self.mean_motion, self.epoch_date = TLE().satellite_orbital_elements(tle=tle)
+        record = TLE().tle_record(tle)
+        self.title = record.title
+        self.inclination = record.inclination
+        self.right_ascension = record.right_ascension
+        self.eccentricity = record.eccentricity
+        self.argument_periapsis = record.argument_periapsis
+        self.mean_anomaly = record.mean_anomaly
+        self.mean_motion = record.mean_motion
+        self.epoch_date = record.epoch_date
+        self.cached('epoch_datetime64', lambda: record.epoch_datetime64)
         return
 
     def radian_to_degree(self, radian:float=None) -> float:
-        '''This method takes a radian value as a float in the (radian) parameter. It returns the radian
-        value converted into its corresponding degree value.
+        '''This method takes a radian value, or a NumPy array of them, in the (radian) parameter. It returns the radian
+        value converted into its corresponding degree value. See the units module.
 
         :param radian: The radian value to be converted.
         :return: The degree value corresponding to the radian value.
         '''
-        assert isinstance(radian, (float, int)), 'The (radian) parameter must be of type float or int. Please check that the celestial body passed in for (radian) is a float or int.'
-        return radian * 180/np.pi
+        return units.radian_to_degree(radian)
 
     def degree_to_radian(self, degree:float=None) -> float:
-        '''This method takes a degree value as a float in the (degree) parameter. It returns the degree
-        value converted into its corresponding radian value.
+        '''This method takes a degree value, or a NumPy array of them, in the (degree) parameter. It returns the degree
+        value converted into its corresponding radian value. See the units module.
 
         :param degree: The degree value to be converted.
         :return: The radian value corresponding to the degree value.
         '''
-        assert isinstance(degree, (float, int)), 'The (degree) parameter must be of type float or int. Please check that the celestial body passed in for (degree) is a float or int.'
-        return degree * np.pi/180
+        return units.degree_to_radian(degree)
 
     def eccentric_anomoly_calculation(self, mean_anomaly:float=None, eccentricity:float=None, max_iterations:int=500, max_accuracy:float=0.0001) -> float:
-        '''Approximates Eccentric Anomaly from Mean Anomaly (input and outputs are in radians).
+        '''This method solves Kepler's equation for the Eccentric Anomaly from the Mean Anomaly (input and outputs are in radians),
+        using the vectorized solve_kepler function of the kepler module. NumPy arrays of mean anomalies and eccentricities can be
+        passed in as well as single values.
 
         :param mean_anomaly: the mean anomaly (radians)
         :param eccentricity: the eccentricity.
-        :param max_iterations:
-        :param max_accuracy:
-        :return: the radian
-        '''
-
-        if mean_anomaly >= 0.8:
-            initial = np.pi
-        else:
-            initial = mean_anomaly
-        for i in range(max_iterations):
-            eccentric_anomaly = initial - (initial - eccentricity * np.sin(initial) - mean_anomaly) / (1.0 - eccentricity * np.cos(initial))
-            if (np.abs(eccentric_anomaly-initial) > max_accuracy):
-                return eccentric_anomaly
-            else:
-                break
-
-    def epoch_time_diff(self) -> float:
-        '''This method calculates the time difference between the epoch and now in seconds. The method uses
-        the datetime module to get todays UTC date and time. Given that I am in CST, my timedelta is plus 6
-        hours, and this is added to the current UTC datetime. We then get the difference between the epoch
-        date of the satellite and the UTC datetime with the 6 hour delta. This method then coverts this
-        time difference into seconds.
-
-        :return: the time difference from the satellites epoch and now in seconds
+        :param max_iterations: the maximum number of Newton iterations.
+        :param max_accuracy: the size of the final Newton step (radians) at which the solution is accepted.
+        :return: the eccentric anomaly (radians)
+        '''
+        return solve_kepler(mean_anomaly=mean_anomaly, eccentricity=eccentricity, tolerance=max_accuracy, max_iterations=max_iterations)
+
+    def seconds_since_epoch(self, times=None, since_epoch:bool=False):
+        '''This method converts the target (times) into the seconds elapsed since the epoch of the satellite. The (times) can be a
+        datetime, a NumPy datetime64, or a list or array of either (such as a NumPy datetime64 range). Datetimes without a timezone
+        are taken to be in UTC. If no (times) are passed in, the current UTC time is used, as in the epoch_time_diff() method. If
+        (since_epoch) is True, the (times) are already seconds since the epoch, and are returned as is.
+
+        :param times: The target times, which default to the current UTC time.
+        :param since_epoch: If this is True, the (times) are seconds since the epoch.
+        :return: The seconds since the epoch, as a float or a NumPy array with the shape of (times).
         '''
+        if since_epoch is True:
+            if times is None:
+                raise ValueError('The (times) parameter cannot be None when (since_epoch) is True. Please pass in the seconds since the epoch.')
+            return np.asarray(times, dtype=np.float64)[()]
+        if times is None:
+            times = datetime.now(tz.utc)
         assert self.epoch_date is not None, 'The epoch_date parameter cannot be None. Check that the TLE data passed was properly computed.'
-        diff = datetime.now().replace(tzinfo=tz.utc) + timedelta(hours=6) - self.epoch_date
-        return 24*60*60*diff.days + diff.seconds + 1e-6*diff.microseconds
+        epoch = self.cached('epoch_datetime64', lambda: to_datetime64(self.epoch_date))
+        return ((to_datetime64(times) - epoch) / np.timedelta64(1, 's'))[()]
+
+    def epoch_time_diff(self, time=None) -> float:
+        '''This method calculates the time difference between the epoch and the (time) in seconds. If no (time) is passed in,
+        the current UTC time is used, so the target time should be passed in explicitly wherever the result needs to be
+        reproducible.
+
+        :param time: The target time, as a datetime or a NumPy datetime64.
+        :return: the time difference from the satellites epoch and the (time) in seconds
+        '''
+        return self.seconds_since_epoch(time)
 
     def motion_radian_per_second(self) -> float:
         '''This method uses the mean motion (n) to calculate the mean motion per second (radians/sec) of the orbiting object.
@@ -92,7 +153,7 @@ class Orbital(object):
         :return: the mean motion expressed as radians per second (rads/sec)
         '''
         assert self.mean_motion is not None, 'The mean_motion parameter cannot be None. Check that the TLE data passed was properly computed.'
-        return self.mean_motion * 2*np.pi / (24*60*60)
+        return self.cached('motion_radian_per_second', lambda: units.rev_per_day_to_radian_per_second(self.mean_motion))
 
     def get_standard_gravitational_parameter(self, body:str=None) -> float:
         '''This method uses the astronomical_objects object to dynamically return the standard gravitational parameter
@@ -100,27 +161,29 @@ class Orbital(object):
 
         :return: The standard gravitational parameter associated with the defined celestial body parameter.
         '''
-        assert body.title() in list(objects.keys()), 'The celestial body that you passed into the body parameter is not avaliable. Please re-try a new body.'
         assert isinstance(body, str), 'The (body) parameter must be of type string. Please check that the celestial body passed in for (body) is a string.'
-        return objects[f'{body.title()}']['standard_gravitational_parameter']
+        assert body.title() in objects, 'The celestial body that you passed into the body parameter is not avaliable. Please re-try a new body.'
+        return objects[body.title()]['standard_gravitational_parameter']
 
     def period_calc(self) -> float:
         '''This method infers the orbital period from the mean motion value provided in the Two line Element (TLE).
 
         :return: the infered orbital period for the satellite
         '''
-        return 24*60*60/self.mean_motion
+        return self.cached('period', lambda: 24*60*60/self.mean_motion)
 
-    def time_adjusted_mean_anomaly_calc(self) -> float:
-        '''This function calculates the offset(in Radians) from the time differece from now until the epoch into Degrees.
+    def time_adjusted_mean_anomaly_calc(self, times=None, since_epoch:bool=False):
+        '''This method calculates the mean anomaly (degrees) of the satellite at the target (times), by advancing the mean
+        anomaly of the epoch by the mean motion over the time elapsed since the epoch. The satellite is not modified, so the
+        method returns the same result every time it is called with the same (times).
 
-        :return: the time adjusted mean anomaly
+        :param times: The target times. See the seconds_since_epoch() method.
+        :param since_epoch: If this is True, the (times) are seconds since the epoch.
+        :return: the time adjusted mean anomaly (degrees), in the range [0, 360).
         '''
-        #Calls the epoch_time_diff() and motion_per_sec()
-        adjusted_mean_anomaly = self.radian_to_degree(self.epoch_time_diff() *  self.motion_radian_per_second())
-        self.mean_anomaly += adjusted_mean_anomaly % 360
-        return self.mean_anomaly
-
+        assert self.mean_anomaly is not None, 'The mean_anomaly parameter cannot be None. Check that the TLE data passed was properly computed.'
+        seconds = self.seconds_since_epoch(times, since_epoch=since_epoch)
+        return np.remainder(self.mean_anomaly + units.radian_to_degree(seconds * self.motion_radian_per_second()), 360)[()]
 
     def semi_major_axis_calc(self, body='Earth') -> float:
         '''This method derives the semi major axis (a) of the satellites orbit using the standard gravitational paramter (mu)
@@ -132,14 +195,80 @@ class Orbital(object):
         :param body: the name of the celestial body that the satellite is orbiting.
         :return: the semi-major axis of the satellites orbit.
         '''
-        mu = self.get_standard_gravitational_parameter(body=body)
-        motion_per_sec = self.motion_radian_per_second()
-        return (mu**(1/3))/((motion_per_sec)**(2/3))
-
-    def anomoly_calc(self) -> float:
-        '''This function calculates the true and eccentric anomalies.'''
-        self.mean_anomaly = self.radian_to_degree(self.time_adjusted_mean_anomaly_calc())
-        eccentric_anomaly = self.eccentric_anomoly_calculation(self.eccentricity, self.mean_anomaly)
-        true_anomaly = 2*np.arctan2(np.sqrt(1+self.eccentricity) * np.sin(eccentric_anomaly/2.0), np.sqrt(1-self.eccentricity) * np.cos(eccentric_anomaly/2.0))
-        true_anomaly = self.radian_to_degree(true_anomaly)
-        return true_anomaly
+        def calculation():
+            mu = self.get_standard_gravitational_parameter(body=body)
+            motion_per_sec = self.motion_radian_per_second()
+            return (mu**(1/3))/((motion_per_sec)**(2/3))
+        return self.cached(('semi_major_axis', body.title()), calculation)
+
+    def eccentricity_factor_calc(self) -> float:
+        '''This method calculates the factor sqrt(1 - e^2) of the satellites orbit, which relates the semi-minor axis (b) to
+        the semi-major axis (a) through (b = a*sqrt(1 - e^2)).
+
+        :return: the eccentricity factor sqrt(1 - e^2).
+        '''
+        assert self.eccentricity is not None, 'The eccentricity parameter cannot be None. Check that the TLE data passed was properly computed.'
+        return self.cached('eccentricity_factor', lambda: np.sqrt(1 - self.eccentricity**2))
+
+    def perigee_radius_calc(self, body='Earth') -> float:
+        '''This method calculates the distance from the center of the celestial body to the perigee of the satellites orbit,
+        using the equation (a(1 - e)).
+
+        :param body: the name of the celestial body that the satellite is orbiting.
+        :return: the perigee radius of the satellites orbit.
+        '''
+        return self.cached(('perigee_radius', body.title()), lambda: self.semi_major_axis_calc(body=body) * (1 - self.eccentricity))
+
+    def apogee_radius_calc(self, body='Earth') -> float:
+        '''This method calculates the distance from the center of the celestial body to the apogee of the satellites orbit,
+        using the equation (a(1 + e)).
+
+        :param body: the name of the celestial body that the satellite is orbiting.
+        :return: the apogee radius of the satellites orbit.
+        '''
+        return self.cached(('apogee_radius', body.title()), lambda: self.semi_major_axis_calc(body=body) * (1 + self.eccentricity))
+
+    def orientation_matrix_calc(self) -> np.ndarray:
+        '''This method calculates the orientation matrix that rotates the plane of the satellites orbit into the inertial frame.
+        See the rotation_matrices() function of the propagator module.
+
+        :return: the (3, 3) orientation matrix.
+        '''
+        assert self.inclination is not None, 'The inclination parameter cannot be None. Check that the TLE data passed was properly computed.'
+        return self.cached('orientation_matrix', lambda: rotation_matrices(units.degree_to_radian(self.inclination), units.degree_to_radian(self.right_ascension), units.degree_to_radian(self.argument_periapsis)))
+
+    def anomoly_calc(self, times=None, since_epoch:bool=False):
+        '''This method calculates the true anomaly (degrees) of the satellite at the target (times), by solving Kepler's
+        equation for the eccentric anomaly at the time adjusted mean anomaly. The satellite is not modified.
+
+        :param times: The target times, which default to the current UTC time. See the seconds_since_epoch() method.
+        :param since_epoch: If this is True, the (times) are seconds since the epoch.
+        :return: the true anomaly (degrees), in the range (-180, 180].
+        '''
+        mean_anomaly = units.degree_to_radian(self.time_adjusted_mean_anomaly_calc(times, since_epoch=since_epoch))
+        eccentric_anomaly = solve_kepler(mean_anomaly, self.eccentricity)
+        return units.radian_to_degree(true_anomaly_from_eccentric(eccentric_anomaly, self.eccentricity))[()]
+
+    def propagate(self, times=None, since_epoch:bool=False, body:str='Earth'):
+        '''This method propagates the satellite to the target (times) as a two-body (Keplerian) orbit around the (body), and
+        returns its positions and velocities in the inertial frame the TLE elements are defined in. The satellite is not
+        modified.
+
+        :param times: The target times. See the seconds_since_epoch() method.
+        :param since_epoch: If this is True, the (times) are seconds since the epoch.
+        :param body: the name of the celestial body that the satellite is orbiting.
+        :return: The positions (km) and velocities (km/s), as arrays with the shape of (times) plus a last axis of 3.
+        '''
+        a = self.semi_major_axis_calc(body=body)
+        e = self.eccentricity
+        b = a * self.eccentricity_factor_calc()
+        n = self.motion_radian_per_second()
+        mean_anomaly = units.degree_to_radian(self.time_adjusted_mean_anomaly_calc(times, since_epoch=since_epoch))
+        eccentric_anomaly = np.asarray(solve_kepler(mean_anomaly, e))
+        cos_E, sin_E = np.cos(eccentric_anomaly)[..., None], np.sin(eccentric_anomaly)[..., None]
+
+        rotation = self.orientation_matrix_calc()
+        P, Q = rotation[:, 0], rotation[:, 1]
+        positions = a * (cos_E - e) * P + b * sin_E * Q
+        velocities = n / (1 - e * cos_E) * (b * cos_E * Q - a * sin_E * P)
+        return positions, velocities
@@ -0,0 +1,224 @@
+import numpy as np
+from spaceman3D.Orbit import units
+from spaceman3D.Orbit.orbit import to_datetime64
+from spaceman3D.Orbit.elements import ElementSet
+from spaceman3D.Orbit.propagator import Propagator
+from spaceman3D.Orbit.shared import shared_array, attach_array, release_blocks
+from spaceman3D.Orbit.groundtrack import eci_to_ecef, geodetic_to_ecef
+
+PASS_DTYPE = np.dtype([
+    ('station', np.int64),
+    ('satellite', np.int64),
+    ('satellite_number', np.int32),
+    ('rise', 'datetime64[ns]'),
+    ('culmination', 'datetime64[ns]'),
+    ('set', 'datetime64[ns]'),
+    ('max_elevation', np.float64)
+])
+
+def look_angles(ecef=None, latitude=None, longitude=None, altitude=0.0) -> tuple:
+    '''This function calculates the look angles of Earth-centered, Earth-fixed (ECEF) positions from a ground station, which are
+    the azimuth (measured clockwise from north), the elevation above the local horizon, and the range.
+
+    :param ecef: The ECEF positions (km), as an (..., 3) array.
+    :param latitude: The geodetic latitude of the station (degrees).
+    :param longitude: The longitude of the station (degrees).
+    :param altitude: The altitude of the station (km).
+    :return: The azimuths (degrees), elevations (degrees) and ranges (km), with the shape of (ecef) without its last axis.
+    '''
+    offset = np.asarray(ecef, dtype=np.float64) - geodetic_to_ecef(latitude, longitude, altitude)
+    sin_latitude, cos_latitude = np.sin(units.degree_to_radian(latitude)), np.cos(units.degree_to_radian(latitude))
+    sin_longitude, cos_longitude = np.sin(units.degree_to_radian(longitude)), np.cos(units.degree_to_radian(longitude))
+    east = -sin_longitude*offset[..., 0] + cos_longitude*offset[..., 1]
+    north = -sin_latitude*cos_longitude*offset[..., 0] - sin_latitude*sin_longitude*offset[..., 1] + cos_latitude*offset[..., 2]
+    up = cos_latitude*cos_longitude*offset[..., 0] + cos_latitude*sin_longitude*offset[..., 1] + sin_latitude*offset[..., 2]
+    distance = np.linalg.norm(offset, axis=-1)
+    azimuth = np.remainder(units.radian_to_degree(np.arctan2(east, north)), 360)
+    return azimuth, units.radian_to_degree(np.arctan2(up, np.hypot(east, north))), distance
+
+class PassPredictor(object):
+    '''This class predicts the passes of a catalog of satellites over a set of ground stations, which are the times each satellite
+    rises above the (min_elevation), culminates at its highest elevation, and sets below the (min_elevation) again.
+
+    The satellites are first propagated to a coarse grid of times across the window, and the elevations of every satellite from a
+    station are computed from it at once. The changes of visibility between the coarse time steps bracket the rises and sets, and
+    only those brackets are then narrowed down by repeatedly sampling the elevation inside them, and likewise for the culmination
+    around the highest coarse time step of each pass. Passes shorter than the coarse time step can fall between its time steps and
+    be missed, so the (step) of the predict() method should be shorter than the shortest pass of interest.
+
+    The coarse positions do not depend on the station, so they are computed once, and with the (workers) parameter of the
+    predict() method the stations are split across worker processes that read them from shared memory.
+
+    Example:
+
+        predictor = PassPredictor(ElementSet.from_file('active.txt'), stations=[(51.48, 0.0, 0.05), (40.71, -74.0, 0.01)])
+        passes = predictor.predict(np.datetime64('2019-03-04T00:00'), np.datetime64('2019-03-05T00:00'), workers=2)
+    '''
+
+    def __init__(self, elements=None, stations=None, backend:str='sgp4', min_elevation:float=0.0):
+        stations = np.atleast_2d(np.asarray(stations, dtype=np.float64))
+        assert stations.ndim == 2 and stations.shape[1] in (2, 3), 'The (stations) parameter must be a list of (latitude, longitude) or (latitude, longitude, altitude) tuples. Please check the value passed in for (stations).'
+        assert -90 < min_elevation < 90, 'The (min_elevation) parameter must be between -90 and 90 degrees. Please check the value passed in for (min_elevation).'
+        if stations.shape[1] == 2:
+            stations = np.column_stack((stations, np.zeros(len(stations))))
+        self.propagator = Propagator(elements, backend=backend)
+        self.elements = self.propagator.elements
+        self.stations = stations
+        self.backend = backend
+        self.min_elevation = float(min_elevation)
+        return
+
+    def coarse_positions(self, start=None, offsets=None) -> np.ndarray:
+        '''This method propagates every satellite to the coarse time steps, and returns their ECEF positions.
+
+        :param start: The start of the window, as a NumPy datetime64.
+        :param offsets: The coarse time steps, as seconds since the (start).
+        :return: The ECEF positions (km), as an (N, M, 3) array.
+        '''
+        seconds = ((start - self.propagator.epochs) / np.timedelta64(1, 's'))[:, None] + offsets[None, :]
+        positions = self.propagator.propagate(seconds, since_epoch=True, velocity=False)
+        return eci_to_ecef(positions, start + np.round(offsets * 1e9).astype('timedelta64[ns]'))
+
+    def elevations(self, station:int=0, propagator=None, start=None, seconds=None) -> np.ndarray:
+        '''This method calculates the elevations (above the min_elevation) of the satellites of a (propagator) from a station at
+        their own times, given as an (B, K) array of (seconds) since the (start). Elevations that can not be calculated, such as
+        those of decayed satellites, are returned as -inf.'''
+        base = ((start - propagator.epochs) / np.timedelta64(1, 's'))[:, None]
+        positions = propagator.propagate(base + seconds, since_epoch=True, velocity=False)
+        ecef = eci_to_ecef(positions, start + np.round(seconds * 1e9).astype('timedelta64[ns]'))
+        elevation = look_angles(ecef, *self.stations[station])[1] - self.min_elevation
+        return np.where(np.isfinite(elevation), elevation, -np.inf)
+
+    def crossings(self, station:int=0, propagator=None, start=None, low=None, high=None, rising:bool=True, samples:int=9, iterations:int=6) -> np.ndarray:
+        '''This method finds the times the satellites of a (propagator) cross the min_elevation, inside brackets from (low) to
+        (high) seconds since the (start) that are known to contain a crossing. Each bracket is sampled at (samples) times and
+        narrowed to the samples either side of the crossing, and after (iterations) of this the crossing is interpolated between
+        the ends of the bracket.
+
+        :param rising: If this is True, the crossings are rises, otherwise they are sets.
+        :return: The times of the crossings, as seconds since the (start).
+        '''
+        low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+        grid = np.linspace(0, 1, samples)
+        rows = np.arange(len(low))
+        for iteration in range(iterations):
+            times = low[:, None] + (high - low)[:, None] * grid[None, :]
+            above = self.elevations(station, propagator, start, times) > 0
+            crossed = np.clip(np.argmax(above if rising else ~above, axis=1), 1, samples - 1)
+            low, high = times[rows, crossed - 1], times[rows, crossed]
+        elevation = self.elevations(station, propagator, start, np.column_stack((low, high)))
+        below, above = (elevation[:, 0], elevation[:, 1]) if rising else (elevation[:, 1], elevation[:, 0])
+        fraction = np.clip(np.where(np.isfinite(below) & (above > below), -below / np.where(above > below, above - below, 1), 0.5), 0, 1)
+        return low + (high - low) * (fraction if rising else 1 - fraction)
+
+    def culminations(self, station:int=0, propagator=None, start=None, center=None, width=None, low=None, high=None, samples:int=9, iterations:int=8) -> tuple:
+        '''This method finds the culminations of the satellites of a (propagator), by sampling the elevation on a window of
+        (width) seconds either side of the (center), which is re-centered on the highest sample and shrunk to the sample spacing
+        (iterations) times. The samples are kept between the (low) and (high) ends of the pass.
+
+        :return: The times of the culminations, as seconds since the (start), and the elevations at them (degrees).
+        '''
+        rows = np.arange(len(center))
+        grid = np.linspace(-1, 1, samples)
+        for iteration in range(iterations):
+            times = np.clip(center[:, None] + width * grid[None, :], low[:, None], high[:, None])
+            elevation = self.elevations(station, propagator, start, times)
+            center = times[rows, np.argmax(elevation, axis=1)]
+            width = width * 2 / (samples - 1)
+        return center, self.elevations(station, propagator, start, center[:, None])[:, 0] + self.min_elevation
+
+    def station_passes(self, station:int=0, start=None, offsets=None, ecef=None) -> np.ndarray:
+        '''This method predicts the passes of every satellite over a single station from the coarse ECEF positions.
+
+        :param station: The index of the station.
+        :param start: The start of the window, as a NumPy datetime64.
+        :param offsets: The coarse time steps, as seconds since the (start).
+        :param ecef: The coarse ECEF positions (see the coarse_positions() method).
+        :return: The passes, as a NumPy array of the PASS_DTYPE.
+        '''
+        elevation = look_angles(ecef, *self.stations[station])[1] - self.min_elevation
+        visible = np.pad(elevation > 0, ((0, 0), (1, 1)))
+        change = np.diff(visible.astype(np.int8), axis=1)
+        satellite, first = np.nonzero(change == 1)
+        after = np.nonzero(change == -1)[1]
+        passes = np.zeros(len(satellite), dtype=PASS_DTYPE)
+        if len(satellite) == 0:
+            return passes
+        subset = lambda mask: Propagator(self.elements[satellite[mask]], backend=self.backend)
+        end = len(offsets) - 1
+
+        # The passes in progress at the start, or still in progress at the end, of the window have no rise, or no set.
+        rise = np.full(len(satellite), np.nan)
+        rising = first > 0
+        if rising.any():
+            rise[rising] = self.crossings(station, subset(rising), start, offsets[first[rising] - 1], offsets[first[rising]], rising=True)
+        setting = after <= end
+        set_ = np.full(len(satellite), np.nan)
+        if setting.any():
+            set_[setting] = self.crossings(station, subset(setting), start, offsets[after[setting] - 1], offsets[after[setting]], rising=False)
+
+        # The highest coarse time step of each pass, found by sorting the visible time steps by pass and then by elevation.
+        rows, columns = np.nonzero(visible[:, 1:-1])
+        pass_of = (np.cumsum(change[:, :-1] == 1, axis=None).reshape(elevation.shape) - 1)[rows, columns]
+        order = np.lexsort((-elevation[rows, columns], pass_of))
+        highest = columns[order][np.concatenate(([True], pass_of[order][1:] != pass_of[order][:-1]))]
+        step = offsets[1] - offsets[0] if len(offsets) > 1 else 0.0
+        low, high = np.where(rising, rise, offsets[0]), np.where(setting, set_, offsets[-1])
+        culmination, max_elevation = self.culminations(station, subset(slice(None)), start, offsets[highest], step, low, high)
+
+        to_time = lambda seconds: np.where(np.isnan(seconds), np.datetime64('NaT'), start + np.round(np.nan_to_num(seconds) * 1e9).astype('timedelta64[ns]'))
+        passes['station'] = station
+        passes['satellite'] = satellite
+        passes['satellite_number'] = self.elements['satellite_number'][satellite]
+        passes['rise'], passes['culmination'], passes['set'] = to_time(rise), to_time(culmination), to_time(set_)
+        passes['max_elevation'] = max_elevation
+        return passes
+
+    def predict(self, start=None, stop=None, step:float=60.0, workers:int=None) -> np.ndarray:
+        '''This method predicts the passes of every satellite over every station between the (start) and the (stop).
+
+        :param start: The start of the window, as a datetime or a NumPy datetime64.
+        :param stop: The end of the window, as a datetime or a NumPy datetime64.
+        :param step: The coarse time step (seconds).
+        :param workers: The number of worker processes to split the stations across. By default, every station is predicted in
+        the current process.
+        :return: The passes, as a NumPy array of the PASS_DTYPE sorted by station, satellite and time. The (rise) of a pass that
+        is in progress at the (start), and the (set) of a pass still in progress at the (stop), are NaT.
+        '''
+        assert isinstance(step, (int, float)) and step > 0, 'The (step) parameter must be a positive number. Please check the value passed in for (step).'
+        if workers is not None:
+            assert isinstance(workers, int) and workers > 0, 'The (workers) parameter must be a positive integer. Please check the value passed in for (workers).'
+        start, stop = to_datetime64(start), to_datetime64(stop)
+        duration = (stop - start) / np.timedelta64(1, 's')
+        assert duration > 0, 'The (stop) parameter must be later than the (start) parameter. Please check the values passed in for (start) and (stop).'
+        offsets = np.arange(0.0, duration + step, step)
+        offsets[-1] = min(offsets[-1], duration)
+        ecef = self.coarse_positions(start, offsets)
+
+        if workers is None or workers <= 1 or len(self.stations) <= 1:
+            return np.concatenate([self.station_passes(station, start, offsets, ecef) for station in range(len(self.stations))])
+
+        from concurrent.futures import ProcessPoolExecutor
+        block, description = shared_array(ecef)
+        try:
+            options = dict(elements=self.elements.data, stations=self.stations, backend=self.backend, min_elevation=self.min_elevation,
+                           start=start, offsets=offsets, ecef=description)
+            bounds = np.linspace(0, len(self.stations), min(workers, len(self.stations)) + 1).astype(int)
+            tasks = [(options, np.arange(begin, stop)) for begin, stop in zip(bounds[:-1], bounds[1:])]
+            with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+                results = list(pool.map(_predict_stations, tasks))
+        finally:
+            release_blocks([block], unlink=True)
+        return np.concatenate(results)
+
+def _predict_stations(task=None) -> np.ndarray:
+    '''This function is run by the worker processes of PassPredictor().predict(). It predicts the passes over a chunk of
+    stations with its own PassPredictor, reading the coarse ECEF positions from shared memory.'''
+    options, stations = task
+    predictor = PassPredictor(ElementSet(data=options['elements']), options['stations'], backend=options['backend'], min_elevation=options['min_elevation'])
+    block, ecef = attach_array(options['ecef'])
+    try:
+        return np.concatenate([predictor.station_passes(station, options['start'], options['offsets'], ecef) for station in stations])
+    finally:
+        ecef = None
+        release_blocks([block])
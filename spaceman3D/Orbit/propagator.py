@@ -0,0 +1,263 @@
+import numpy as np
+from spaceman3D.Orbit.tle import TLE, TLERecord
+from spaceman3D.Orbit.elements import ElementSet
+from spaceman3D.Orbit.kepler import solve_kepler
+from spaceman3D.Orbit.sgp4 import SGP4
+from spaceman3D.Orbit.shared import shared_block, shared_array, attach_array, release_blocks
+from spaceman3D.Orbit.astronomical_objects import objects
+from spaceman3D.Orbit import units
+
+def as_element_set(elements=None) -> ElementSet:
+    '''This function converts the ways a catalog can be passed into the propagation functions into an ElementSet. An ElementSet is
+    returned as is, while a single TLE string or TLERecord, or a list of them, is parsed into a new ElementSet.
+
+    :param elements: An ElementSet, a TLE, a TLERecord, or a list of TLEs or TLERecords.
+    :return: The elements as an ElementSet.
+    '''
+    if isinstance(elements, ElementSet):
+        return elements
+    if isinstance(elements, (str, TLERecord)):
+        elements = [elements]
+    assert isinstance(elements, (list, tuple)), 'The (elements) parameter must be an ElementSet, a TLE, or a list of TLEs. Please check the value passed in for (elements).'
+    parser = TLE()
+    return ElementSet.from_records(parser.tle_record(tle) for tle in elements)
+
+def rotation_matrices(inclination=None, right_ascension=None, argument_periapsis=None) -> np.ndarray:
+    '''This function builds the rotation matrices that rotate the perifocal frame of each orbit (x towards the perigee, z along the
+    orbit normal) into the inertial frame. The rotation is R = Rz(right_ascension) @ Rx(inclination) @ Rz(argument_periapsis).
+    The first column of each matrix is the unit vector towards the perigee (P), and the second is the unit vector (Q) that is
+    90° ahead of it in the orbit plane.
+
+    :param inclination: The inclinations (radians), as an (N,) array.
+    :param right_ascension: The right ascensions of the ascending nodes (radians), as an (N,) array.
+    :param argument_periapsis: The arguments of periapsis (radians), as an (N,) array.
+    :return: The rotation matrices, as an (N, 3, 3) array.
+    '''
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    cos_raan, sin_raan = np.cos(right_ascension), np.sin(right_ascension)
+    cos_w, sin_w = np.cos(argument_periapsis), np.sin(argument_periapsis)
+
+    matrices = np.empty(np.shape(inclination) + (3, 3))
+    matrices[..., 0, 0] = cos_raan*cos_w - sin_raan*sin_w*cos_i
+    matrices[..., 0, 1] = -cos_raan*sin_w - sin_raan*cos_w*cos_i
+    matrices[..., 0, 2] = sin_raan*sin_i
+    matrices[..., 1, 0] = sin_raan*cos_w + cos_raan*sin_w*cos_i
+    matrices[..., 1, 1] = -sin_raan*sin_w + cos_raan*cos_w*cos_i
+    matrices[..., 1, 2] = -cos_raan*sin_i
+    matrices[..., 2, 0] = sin_w*sin_i
+    matrices[..., 2, 1] = cos_w*sin_i
+    matrices[..., 2, 2] = cos_i
+    return matrices
+
+def orbit_geometry(semi_major_axis=None, eccentricity=None, rotation=None, samples:int=360, adaptive:bool=True) -> np.ndarray:
+    '''This function samples the orbit ellipses of a batch of satellites, and returns the points of every orbit in a single
+    array. Each point is found with the polar equation of the ellipse, r = a(1 - e^2)/(1 + e*cos(ν)), and rotated out of the orbit
+    plane with the satellite's rotation matrix (see the rotation_matrices() function).
+
+    With (adaptive) sampling, the true anomalies are spaced as ν = u - e*sin(u) for evenly spaced u, which places more points
+    near the perigee, where an eccentric orbit turns the fastest, and fewer near the apogee. Circular orbits are still sampled
+    evenly. Without it, the true anomalies are evenly spaced.
+
+    :param semi_major_axis: The semi-major axes, as an (N,) array.
+    :param eccentricity: The eccentricities, as an (N,) array.
+    :param rotation: The rotation matrices, as an (N, 3, 3) array.
+    :param samples: The number of points on each orbit. The first and last points are both the perigee, closing the orbit.
+    :param adaptive: If this is True, the points are concentrated near the perigee.
+    :return: The points of the orbits, as an (N, samples, 3) array.
+    '''
+    e = np.asarray(eccentricity, dtype=np.float64)[:, None]
+    u = np.linspace(0, 2*np.pi, samples)
+    true_anomaly = u - e*np.sin(u) if adaptive is True else np.broadcast_to(u, (len(e), samples))
+    r = (np.asarray(semi_major_axis, dtype=np.float64)[:, None] * (1 - e**2)) / (1 + e*np.cos(true_anomaly))
+    P = rotation[:, None, :, 0]
+    Q = rotation[:, None, :, 1]
+    return (r*np.cos(true_anomaly))[..., None] * P + (r*np.sin(true_anomaly))[..., None] * Q
+
+def _propagate_shard(task=None):
+    '''This function is run by the worker processes of the Propagator().propagate() method. It propagates the satellites from
+    (start) to (stop) of the element sets in shared memory, and writes their states into the output arrays in shared memory.'''
+    start, stop, elements, times, outputs, options = task
+    blocks = []
+    data = shared_times = shard_times = output = None
+    try:
+        block, data = attach_array(elements)
+        blocks.append(block)
+        shard = ElementSet(data=data[start:stop].copy())
+        block, shared_times = attach_array(times)
+        blocks.append(block)
+        shard_times = shared_times[start:stop] if shared_times.ndim == 2 else shared_times
+        states = Propagator(shard, body=options['body'], backend=options['backend']).propagate(shard_times.copy(), since_epoch=options['since_epoch'],
+                                                                                             velocity=options['velocity'], tolerance=options['tolerance'])
+        for description, state in zip(outputs, states if options['velocity'] is True else (states,)):
+            block, output = attach_array(description)
+            blocks.append(block)
+            output[start:stop] = state
+            output = None
+    finally:
+        # The views are dropped before the blocks are closed, as a block that is still viewed can not be closed.
+        data = shared_times = shard_times = output = None
+        release_blocks(blocks)
+    return stop - start
+
+class Propagator(object):
+    '''This class propagates a whole catalog of satellites to many times in a single call. Everything that only depends on the
+    element sets (the semi-major axes, mean motions, and the rotation matrices from each orbit's plane into the inertial frame) is
+    computed once when the Propagator is created, and the propagate() method then solves Kepler's equation and rotates the
+    positions for every satellite and every time at once with NumPy array operations.
+
+    The (backend) parameter selects the propagation theory. The 'kepler' backend is a two-body (Keplerian) propagation around the
+    celestial body passed into the (body) parameter. The 'sgp4' backend uses the SGP4/SDP4 theory the TLE elements are generated for
+    (see the SGP4 class), which includes the Earth's oblateness, atmospheric drag, and the lunar-solar perturbations, and is only
+    available around the Earth. Positions are returned in kilometers and velocities in kilometers per second, in the inertial frame
+    the TLE elements are defined in (the TEME frame).
+
+    A large catalog can be propagated across several CPU cores with the (workers) parameter of the propagate() method. The
+    satellites are then split into one shard per worker process, and the element sets, the times, and the output arrays are
+    placed in shared memory so that the worker processes read and write them directly instead of having them pickled.
+
+    Example:
+
+        propagator = Propagator(ElementSet.from_file('active.txt'), backend='sgp4')
+        positions, velocities = propagator.propagate(np.arange(0, 86400, 60), since_epoch=True, workers=8)
+    '''
+
+    backends = ('kepler', 'sgp4')
+
+    def __init__(self, elements=None, body:str='Earth', backend:str='kepler'):
+        assert isinstance(body, str), 'The (body) parameter must be of type string. Please check that the celestial body passed in for (body) is a string.'
+        assert body.title() in objects, 'The celestial body that you passed into the body parameter is not avaliable. Please re-try a new body.'
+        assert backend in self.backends, f'The (backend) parameter must be one of {self.backends}. Please check the value passed in for (backend).'
+        assert backend != 'sgp4' or body.title() == 'Earth', 'The sgp4 backend can only propagate orbits around the Earth. Please check the values passed in for (body) and (backend).'
+        self.elements = as_element_set(elements)
+        self.body = body.title()
+        self.backend = backend
+        mu = objects[self.body]['standard_gravitational_parameter']
+
+        data = self.elements.data
+        self.eccentricity = data['eccentricity'].astype(np.float64)
+        self.mean_motion = units.rev_per_day_to_radian_per_second(data['mean_motion'])
+        self.semi_major_axis = mu**(1/3) / self.mean_motion**(2/3)
+        self.semi_minor_axis = self.semi_major_axis * np.sqrt(1 - self.eccentricity**2)
+        self.mean_anomaly = units.degree_to_radian(data['mean_anomaly'])
+        self.epochs = self.elements.epoch_datetime64()
+        self.rotation = rotation_matrices(units.degree_to_radian(data['inclination']), units.degree_to_radian(data['right_ascension']), units.degree_to_radian(data['argument_periapsis']))
+        self.sgp4 = SGP4(self.elements) if backend == 'sgp4' else None
+        return
+
+    def __len__(self):
+        return len(self.elements)
+
+    def orbit_geometry(self, samples:int=360, adaptive:bool=True) -> np.ndarray:
+        '''This method samples the orbit ellipse of every satellite of the catalog. See the orbit_geometry() function.
+
+        :param samples: The number of points on each orbit.
+        :param adaptive: If this is True, the points are concentrated near the perigee.
+        :return: The points of the orbits, as an (N, samples, 3) array.
+        '''
+        return orbit_geometry(self.semi_major_axis, self.eccentricity, self.rotation, samples=samples, adaptive=adaptive)
+
+    def seconds_since_epoch(self, times=None, since_epoch:bool=False) -> np.ndarray:
+        '''This method converts the (times) passed into the propagate() method into the seconds elapsed since each satellite's epoch.
+
+        :param times: An array of times. See the propagate() method.
+        :param since_epoch: If this is True, the (times) are already seconds since each satellite's epoch.
+        :return: The seconds since epoch, as an (N, M) array.
+        '''
+        if since_epoch is True:
+            seconds = np.asarray(times, dtype=np.float64)
+            assert seconds.ndim in (0, 1, 2), 'The (times) parameter must be a scalar, an (M,) array, or an (N, M) array. Please check the value passed in for (times).'
+            seconds = np.atleast_1d(seconds)
+            return np.broadcast_to(seconds if seconds.ndim == 2 else seconds[None, :], (len(self), seconds.shape[-1]))
+        times = np.atleast_1d(np.asarray(times, dtype='datetime64[ns]'))
+        assert times.ndim == 1, 'The (times) parameter must be a one-dimensional array of times. Please check the value passed in for (times).'
+        return (times[None, :] - self.epochs[:, None]) / np.timedelta64(1, 's')
+
+    def propagate(self, times=None, since_epoch:bool=False, velocity:bool=True, tolerance:float=1e-12, workers:int=None):
+        '''This method propagates every satellite of the catalog to every time in (times). By default the (times) are absolute
+        times, as an array of NumPy datetime64 values (or anything that converts into one). If (since_epoch) is True, the (times)
+        are instead seconds since each satellite's epoch, either as an (M,) array shared by all satellites or an (N, M) array.
+
+        :param times: The times to propagate to.
+        :param since_epoch: If this is True, the (times) are seconds since each satellite's epoch.
+        :param velocity: If this is True, the velocities are returned along with the positions.
+        :param tolerance: The tolerance of the Kepler equation solver (radians). It is only used by the 'kepler' backend.
+        :param workers: The number of worker processes to split the satellites across. By default, the satellites are propagated
+        in the current process.
+        :return: The positions (km) as an (N, M, 3) array, and if (velocity) is True, the velocities (km/s) as an (N, M, 3) array.
+        With the 'sgp4' backend, the positions and velocities of a satellite are NaN at the times its elements are no longer valid.
+        '''
+        if workers is not None:
+            assert isinstance(workers, int) and workers > 0, 'The (workers) parameter must be a positive integer. Please check the value passed in for (workers).'
+            if workers > 1 and len(self) > 1:
+                return self.propagate_parallel(times, since_epoch=since_epoch, velocity=velocity, tolerance=tolerance, workers=workers)
+
+        seconds = self.seconds_since_epoch(times, since_epoch=since_epoch)
+        if self.backend == 'sgp4':
+            positions, velocities, errors = self.sgp4.propagate(seconds / 60.0)
+            if velocity is False:
+                return positions
+            return positions, velocities
+
+        n = self.mean_motion[:, None]
+        e = self.eccentricity[:, None]
+        eccentric_anomaly = solve_kepler(self.mean_anomaly[:, None] + n * seconds, e, tolerance=tolerance)
+        cos_E, sin_E = np.cos(eccentric_anomaly), np.sin(eccentric_anomaly)
+
+        P = self.rotation[:, None, :, 0]
+        Q = self.rotation[:, None, :, 1]
+        a = self.semi_major_axis[:, None, None]
+        b = self.semi_minor_axis[:, None, None]
+        positions = a * (cos_E - e)[..., None] * P + b * sin_E[..., None] * Q
+        if velocity is False:
+            return positions
+
+        rate = (n / (1 - e * cos_E))[..., None]
+        velocities = rate * (b * cos_E[..., None] * Q - a * sin_E[..., None] * P)
+        return positions, velocities
+
+    def propagate_parallel(self, times=None, since_epoch:bool=False, velocity:bool=True, tolerance:float=1e-12, workers:int=2):
+        '''This method is the process pool mode of the propagate() method, which is used when it is called with more than one
+        worker. The satellites are split into one contiguous shard per worker, and each worker process propagates its shard with
+        its own Propagator, reading the element sets and times from, and writing its states into, arrays in shared memory.
+
+        :param times: The times to propagate to. See the propagate() method.
+        :param since_epoch: If this is True, the (times) are seconds since each satellite's epoch.
+        :param velocity: If this is True, the velocities are returned along with the positions.
+        :param tolerance: The tolerance of the Kepler equation solver (radians).
+        :param workers: The number of worker processes.
+        :return: The same positions (and velocities) as the propagate() method.
+        '''
+        if since_epoch is True:
+            times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+            assert times.ndim in (1, 2), 'The (times) parameter must be a scalar, an (M,) array, or an (N, M) array. Please check the value passed in for (times).'
+            times = np.ascontiguousarray(np.broadcast_to(times, (len(self), times.shape[-1]))) if times.ndim == 2 else times
+        else:
+            times = np.atleast_1d(np.asarray(times, dtype='datetime64[ns]'))
+            assert times.ndim == 1, 'The (times) parameter must be a one-dimensional array of times. Please check the value passed in for (times).'
+
+        from concurrent.futures import ProcessPoolExecutor
+        shape = (len(self), times.shape[-1], 3)
+        blocks = []
+        try:
+            block, elements = shared_array(self.elements.data)
+            blocks.append(block)
+            block, shared_times = shared_array(times)
+            blocks.append(block)
+            outputs = []
+            for i in range(2 if velocity is True else 1):
+                block = shared_block(create=True, size=int(np.prod(shape)) * 8)
+                blocks.append(block)
+                outputs.append((block.name, shape, np.dtype(np.float64)))
+
+            options = dict(body=self.body, backend=self.backend, since_epoch=since_epoch, velocity=velocity, tolerance=tolerance)
+            bounds = np.linspace(0, len(self), min(workers, len(self)) + 1).astype(int)
+            tasks = [(start, stop, elements, shared_times, outputs, options) for start, stop in zip(bounds[:-1], bounds[1:])]
+            with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+                list(pool.map(_propagate_shard, tasks))
+
+            states = tuple(np.ndarray(shape, dtype=np.float64, buffer=block.buf).copy() for block in blocks[2:])
+        finally:
+            release_blocks(blocks, unlink=True)
+        if velocity is False:
+            return states[0]
+        return states
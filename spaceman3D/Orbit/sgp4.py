@@ -0,0 +1,676 @@
+import numpy as np
+from spaceman3D.Orbit import units
+
+gravity_models = {
+    'wgs72old': {
+        'mu': 398600.79964,
+        'radius': 6378.135,
+        'xke': 0.0743669161,
+        'j2': 0.001082616,
+        'j3': -0.00000253881,
+        'j4': -0.00000165597
+    },
+    'wgs72': {
+        'mu': 398600.8,
+        'radius': 6378.135,
+        'xke': 60.0 / np.sqrt(6378.135**3 / 398600.8),
+        'j2': 0.001082616,
+        'j3': -0.00000253881,
+        'j4': -0.00000165597
+    },
+    'wgs84': {
+        'mu': 398600.5,
+        'radius': 6378.137,
+        'xke': 60.0 / np.sqrt(6378.137**3 / 398600.5),
+        'j2': 0.00108262998905,
+        'j3': -0.00000253215306,
+        'j4': -0.00000161098761
+    }
+}
+
+TWOPI = 2*np.pi
+X2O3 = 2.0/3.0
+RPTIM = 4.37526908801129966e-3
+STEP = 720.0
+
+#################### Error codes returned by SGP4().propagate() ####################
+
+ERROR_NONE = 0
+ERROR_MEAN_ECCENTRICITY = 1
+ERROR_MEAN_MOTION = 2
+ERROR_PERTURBED_ECCENTRICITY = 3
+ERROR_SEMI_LATUS_RECTUM = 4
+ERROR_DECAYED = 6
+
+def gstime(jdut1=None):
+    '''This function returns the Greenwich Mean Sidereal Time (radians) for Julian dates in UT1, using the IAU-82 model that the
+    SGP4 theory was built with. The input can be a scalar or a NumPy array.
+
+    :param jdut1: The Julian date (UT1).
+    :return: The Greenwich Mean Sidereal Time (radians), in the range [0, 2π).
+    '''
+    tut1 = (np.asarray(jdut1, dtype=np.float64) - 2451545.0) / 36525.0
+    temp = -6.2e-6 * tut1**3 + 0.093104 * tut1**2 + (876600.0*3600 + 8640184.812866) * tut1 + 67310.54841
+    return np.remainder(np.radians(temp / 240.0), TWOPI)[()]
+
+class SGP4(object):
+    '''This class is a vectorized implementation of the Simplified General Perturbations (SGP4) propagator, and of its deep-space
+    extension (SDP4) for orbits with periods of 225 minutes or more, which are the propagators the TLE elements are generated for. Unlike
+    a two-body propagation, SGP4 models the secular and periodic effects of the Earth's oblateness (J2, J3 and J4) and of atmospheric
+    drag through the BSTAR drag term, and SDP4 adds the lunar-solar perturbations and the 12-hour and 24-hour resonance effects.
+
+    Everything that only depends on the element sets is computed once for the whole catalog when the SGP4 object is created. The
+    propagate() method then evaluates the theory for every satellite and every time at once, with the deep-space terms only being
+    evaluated for the satellites that need them. The implementation follows the reference implementation in (Vallado 1), in its
+    "improved" operation mode.
+
+    Definition Citation:
+    1. Vallado, David A., Paul Crawford, Richard Hujsak, and T.S. Kelso, “Revisiting Spacetrack Report #3,” presented at the
+            AIAA/AAS Astrodynamics Specialist Conference, Keystone, CO, 2006 August 21–24.
+    '''
+
+    def __init__(self, elements=None, gravity:str='wgs72'):
+        assert gravity in gravity_models, f'The gravity model must be one of {list(gravity_models)}. Please check the value passed in for (gravity).'
+        data = elements.data
+        self.gravity = gravity
+        constants = gravity_models[gravity]
+        self.radius, self.xke = constants['radius'], constants['xke']
+        self.j2, self.j4 = constants['j2'], constants['j4']
+        self.j3oj2 = constants['j3'] / constants['j2']
+
+        epochs = elements.epoch_datetime64()
+        self.epoch = (epochs - np.datetime64('1949-12-31T00:00', 'ns')) / np.timedelta64(1, 'D')
+        self.bstar = data['bstar_drag_term'].astype(np.float64)
+        self.ecco = data['eccentricity'].astype(np.float64)
+        self.argpo = units.degree_to_radian(data['argument_periapsis'])
+        self.inclo = units.degree_to_radian(data['inclination'])
+        self.mo = units.degree_to_radian(data['mean_anomaly'])
+        self.nodeo = units.degree_to_radian(data['right_ascension'])
+        no_kozai = units.rev_per_day_to_radian_per_second(data['mean_motion']) * 60.0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._initialize(no_kozai)
+        return
+
+    def __len__(self):
+        return len(self.ecco)
+
+    def _initialize(self, no_kozai:np.ndarray=None):
+        '''This method computes the near-earth constants of the theory for every satellite, and the deep-space constants for the
+        satellites with periods of 225 minutes or more.'''
+        j2, j4, j3oj2, radius, xke = self.j2, self.j4, self.j3oj2, self.radius, self.xke
+        ecco, inclo, argpo, bstar = self.ecco, self.inclo, self.argpo, self.bstar
+
+        eccsq = ecco * ecco
+        omeosq = 1.0 - eccsq
+        rteosq = np.sqrt(omeosq)
+        cosio = np.cos(inclo)
+        cosio2 = cosio * cosio
+        ak = (xke / no_kozai)**X2O3
+        d1 = 0.75 * j2 * (3.0 * cosio2 - 1.0) / (rteosq * omeosq)
+        delta = d1 / (ak * ak)
+        adel = ak * (1.0 - delta * delta - delta * (1.0/3.0 + 134.0 * delta * delta / 81.0))
+        delta = d1 / (adel * adel)
+        self.no = no = no_kozai / (1.0 + delta)
+        ao = (xke / no)**X2O3
+        sinio = np.sin(inclo)
+        po = ao * omeosq
+        con42 = 1.0 - 5.0 * cosio2
+        self.con41 = con41 = -con42 - cosio2 - cosio2
+        posq = po * po
+        rp = ao * (1.0 - ecco)
+        self.gsto = gstime(self.epoch + 2433281.5)
+
+        perigee = (rp - 1.0) * radius
+        low = perigee < 156.0
+        sfour_km = np.where(perigee < 98.0, 20.0, perigee - 78.0)
+        qzms24 = np.where(low, ((120.0 - sfour_km) / radius)**4, ((120.0 - 78.0) / radius)**4)
+        sfour = np.where(low, sfour_km / radius + 1.0, 78.0 / radius + 1.0)
+
+        pinvsq = 1.0 / posq
+        tsi = 1.0 / (ao - sfour)
+        self.eta = eta = ao * ecco * tsi
+        etasq = eta * eta
+        eeta = ecco * eta
+        psisq = np.abs(1.0 - etasq)
+        coef = qzms24 * tsi**4
+        coef1 = coef / psisq**3.5
+        cc2 = coef1 * no * (ao * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq)) + 0.375 * j2 * tsi / psisq * con41 * (8.0 + 3.0 * etasq * (8.0 + etasq)))
+        self.cc1 = cc1 = bstar * cc2
+        cc3 = np.where(ecco > 1.0e-4, -2.0 * coef * tsi * j3oj2 * no * sinio / ecco, 0.0)
+        self.x1mth2 = 1.0 - cosio2
+        self.cc4 = 2.0 * no * coef1 * ao * omeosq * (eta * (2.0 + 0.5 * etasq) + ecco * (0.5 + 2.0 * etasq) - j2 * tsi / (ao * psisq) *
+                   (-3.0 * con41 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta)) + 0.75 * self.x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) * np.cos(2.0 * argpo)))
+        self.cc5 = 2.0 * coef1 * ao * omeosq * (1.0 + 2.75 * (etasq + eeta) + eeta * etasq)
+        cosio4 = cosio2 * cosio2
+        temp1 = 1.5 * j2 * pinvsq * no
+        temp2 = 0.5 * temp1 * j2 * pinvsq
+        temp3 = -0.46875 * j4 * pinvsq * pinvsq * no
+        self.mdot = no + 0.5 * temp1 * rteosq * con41 + 0.0625 * temp2 * rteosq * (13.0 - 78.0 * cosio2 + 137.0 * cosio4)
+        self.argpdot = -0.5 * temp1 * con42 + 0.0625 * temp2 * (7.0 - 114.0 * cosio2 + 395.0 * cosio4) + temp3 * (3.0 - 36.0 * cosio2 + 49.0 * cosio4)
+        xhdot1 = -temp1 * cosio
+        self.nodedot = xhdot1 + (0.5 * temp2 * (4.0 - 19.0 * cosio2) + 2.0 * temp3 * (3.0 - 7.0 * cosio2)) * cosio
+        xpidot = self.argpdot + self.nodedot
+        self.omgcof = bstar * cc3 * np.cos(argpo)
+        self.xmcof = np.where(ecco > 1.0e-4, -X2O3 * coef * bstar / eeta, 0.0)
+        self.nodecf = 3.5 * omeosq * xhdot1 * cc1
+        self.t2cof = 1.5 * cc1
+        self.xlcof = -0.25 * j3oj2 * sinio * (3.0 + 5.0 * cosio) / np.where(np.abs(cosio + 1.0) > 1.5e-12, 1.0 + cosio, 1.5e-12)
+        self.aycof = -0.5 * j3oj2 * sinio
+        self.delmo = (1.0 + eta * np.cos(self.mo))**3
+        self.sinmao = np.sin(self.mo)
+        self.x7thm1 = 7.0 * cosio2 - 1.0
+
+        self.deep = np.flatnonzero(TWOPI / no >= 225.0)
+        self.simple = (rp < 220.0 / radius + 1.0)
+        self.simple[self.deep] = True
+        full = ~self.simple
+        cc1sq = cc1 * cc1
+        d2 = 4.0 * ao * tsi * cc1sq
+        temp = d2 * tsi * cc1 / 3.0
+        d3 = (17.0 * ao + sfour) * temp
+        d4 = 0.5 * temp * ao * tsi * (221.0 * ao + 31.0 * sfour) * cc1
+        self.d2 = np.where(full, d2, 0.0)
+        self.d3 = np.where(full, d3, 0.0)
+        self.d4 = np.where(full, d4, 0.0)
+        self.t3cof = np.where(full, d2 + 2.0 * cc1sq, 0.0)
+        self.t4cof = np.where(full, 0.25 * (3.0 * d3 + cc1 * (12.0 * d2 + 10.0 * cc1sq)), 0.0)
+        self.t5cof = np.where(full, 0.2 * (3.0 * d4 + 12.0 * cc1 * d3 + 6.0 * d2 * d2 + 15.0 * cc1sq * (2.0 * d2 + cc1sq)), 0.0)
+
+        if self.deep.size:
+            self._initialize_deep_space(eccsq, xpidot)
+        return
+
+    def _initialize_deep_space(self, eccsq:np.ndarray=None, xpidot:np.ndarray=None):
+        '''This method computes the lunar-solar terms (dscom) and the secular and resonance constants (dsinit) of the deep-space
+        theory for the satellites with periods of 225 minutes or more.'''
+        d = self.deep
+        ecco, argpo, inclo, nodeo, no, mo = self.ecco[d], self.argpo[d], self.inclo[d], self.nodeo[d], self.no[d], self.mo[d]
+        epoch, gsto, eccsq = self.epoch[d], self.gsto[d], eccsq[d]
+        zes, zel = 0.01675, 0.05490
+        c1ss, c1l = 2.9864797e-6, 4.7968065e-7
+        znl, zns = 1.5835218e-4, 1.19459e-5
+
+        # Lunar-solar terms (dscom)
+        snodm, cnodm = np.sin(nodeo), np.cos(nodeo)
+        sinomm, cosomm = np.sin(argpo), np.cos(argpo)
+        sinim, cosim = np.sin(inclo), np.cos(inclo)
+        emsq = ecco * ecco
+        betasq = 1.0 - emsq
+        rtemsq = np.sqrt(betasq)
+        day = epoch + 18261.5
+        xnodce = np.remainder(4.5236020 - 9.2422029e-4 * day, TWOPI)
+        stem, ctem = np.sin(xnodce), np.cos(xnodce)
+        zcosil = 0.91375164 - 0.03568096 * ctem
+        zsinil = np.sqrt(1.0 - zcosil * zcosil)
+        zsinhl = 0.089683511 * stem / zsinil
+        zcoshl = np.sqrt(1.0 - zsinhl * zsinhl)
+        gam = 5.8351514 + 0.0019443680 * day
+        zx = np.arctan2(0.39785416 * stem / zsinil, zcoshl * ctem + 0.91744867 * zsinhl * stem)
+        zx = gam + zx - xnodce
+        zcosgl, zsingl = np.cos(zx), np.sin(zx)
+
+        terms = []
+        zcosg, zsing, zcosi, zsini, zcosh, zsinh, cc = 0.1945905, -0.98088458, 0.91744867, 0.39785416, cnodm, snodm, c1ss
+        for body in ('sun', 'moon'):
+            a1 = zcosg * zcosh + zsing * zcosi * zsinh
+            a3 = -zsing * zcosh + zcosg * zcosi * zsinh
+            a7 = -zcosg * zsinh + zsing * zcosi * zcosh
+            a8 = zsing * zsini
+            a9 = zsing * zsinh + zcosg * zcosi * zcosh
+            a10 = zcosg * zsini
+            a2 = cosim * a7 + sinim * a8
+            a4 = cosim * a9 + sinim * a10
+            a5 = -sinim * a7 + cosim * a8
+            a6 = -sinim * a9 + cosim * a10
+            x1 = a1 * cosomm + a2 * sinomm
+            x2 = a3 * cosomm + a4 * sinomm
+            x3 = -a1 * sinomm + a2 * cosomm
+            x4 = -a3 * sinomm + a4 * cosomm
+            x5 = a5 * sinomm
+            x6 = a6 * sinomm
+            x7 = a5 * cosomm
+            x8 = a6 * cosomm
+            z31 = 12.0 * x1 * x1 - 3.0 * x3 * x3
+            z32 = 24.0 * x1 * x2 - 6.0 * x3 * x4
+            z33 = 12.0 * x2 * x2 - 3.0 * x4 * x4
+            z1 = 3.0 * (a1 * a1 + a2 * a2) + z31 * emsq
+            z2 = 6.0 * (a1 * a3 + a2 * a4) + z32 * emsq
+            z3 = 3.0 * (a3 * a3 + a4 * a4) + z33 * emsq
+            z11 = -6.0 * a1 * a5 + emsq * (-24.0 * x1 * x7 - 6.0 * x3 * x5)
+            z12 = -6.0 * (a1 * a6 + a3 * a5) + emsq * (-24.0 * (x2 * x7 + x1 * x8) - 6.0 * (x3 * x6 + x4 * x5))
+            z13 = -6.0 * a3 * a6 + emsq * (-24.0 * x2 * x8 - 6.0 * x4 * x6)
+            z21 = 6.0 * a2 * a5 + emsq * (24.0 * x1 * x5 - 6.0 * x3 * x7)
+            z22 = 6.0 * (a4 * a5 + a2 * a6) + emsq * (24.0 * (x2 * x5 + x1 * x6) - 6.0 * (x4 * x7 + x3 * x8))
+            z23 = 6.0 * a4 * a6 + emsq * (24.0 * x2 * x6 - 6.0 * x4 * x8)
+            z1 = z1 + z1 + betasq * z31
+            z2 = z2 + z2 + betasq * z32
+            z3 = z3 + z3 + betasq * z33
+            s3 = cc / no
+            s2 = -0.5 * s3 / rtemsq
+            s4 = s3 * rtemsq
+            s1 = -15.0 * ecco * s4
+            s5 = x1 * x3 + x2 * x4
+            s6 = x2 * x3 + x1 * x4
+            s7 = x2 * x4 - x1 * x3
+            terms.append(dict(s1=s1, s2=s2, s3=s3, s4=s4, s5=s5, s6=s6, s7=s7, z1=z1, z2=z2, z3=z3, z11=z11, z12=z12, z13=z13,
+                              z21=z21, z22=z22, z23=z23, z31=z31, z32=z32, z33=z33))
+            zcosg, zsing, zcosi, zsini, cc = zcosgl, zsingl, zcosil, zsinil, c1l
+            zcosh = zcoshl * cnodm + zsinhl * snodm
+            zsinh = snodm * zcoshl - cnodm * zsinhl
+        sun, moon = terms
+
+        self.zmol = np.remainder(4.7199672 + 0.22997150 * day - gam, TWOPI)
+        self.zmos = np.remainder(6.2565837 + 0.017201977 * day, TWOPI)
+        self.se2 = 2.0 * sun['s1'] * sun['s6']
+        self.se3 = 2.0 * sun['s1'] * sun['s7']
+        self.si2 = 2.0 * sun['s2'] * sun['z12']
+        self.si3 = 2.0 * sun['s2'] * (sun['z13'] - sun['z11'])
+        self.sl2 = -2.0 * sun['s3'] * sun['z2']
+        self.sl3 = -2.0 * sun['s3'] * (sun['z3'] - sun['z1'])
+        self.sl4 = -2.0 * sun['s3'] * (-21.0 - 9.0 * emsq) * zes
+        self.sgh2 = 2.0 * sun['s4'] * sun['z32']
+        self.sgh3 = 2.0 * sun['s4'] * (sun['z33'] - sun['z31'])
+        self.sgh4 = -18.0 * sun['s4'] * zes
+        self.sh2 = -2.0 * sun['s2'] * sun['z22']
+        self.sh3 = -2.0 * sun['s2'] * (sun['z23'] - sun['z21'])
+        self.ee2 = 2.0 * moon['s1'] * moon['s6']
+        self.e3 = 2.0 * moon['s1'] * moon['s7']
+        self.xi2 = 2.0 * moon['s2'] * moon['z12']
+        self.xi3 = 2.0 * moon['s2'] * (moon['z13'] - moon['z11'])
+        self.xl2 = -2.0 * moon['s3'] * moon['z2']
+        self.xl3 = -2.0 * moon['s3'] * (moon['z3'] - moon['z1'])
+        self.xl4 = -2.0 * moon['s3'] * (-21.0 - 9.0 * emsq) * zel
+        self.xgh2 = 2.0 * moon['s4'] * moon['z32']
+        self.xgh3 = 2.0 * moon['s4'] * (moon['z33'] - moon['z31'])
+        self.xgh4 = -18.0 * moon['s4'] * zel
+        self.xh2 = -2.0 * moon['s2'] * moon['z22']
+        self.xh3 = -2.0 * moon['s2'] * (moon['z23'] - moon['z21'])
+
+        # Secular and resonance constants (dsinit)
+        q22, q31, q33 = 1.7891679e-6, 2.1460748e-6, 2.2123015e-7
+        root22, root44, root54 = 1.7891679e-6, 7.3636953e-9, 2.1765803e-9
+        root32, root52 = 3.7393792e-7, 1.1428639e-7
+        self.irez = np.zeros(d.size, dtype=np.int8)
+        self.irez[(0.0034906585 < no) & (no < 0.0052359877)] = 1
+        self.irez[(8.26e-3 <= no) & (no <= 9.24e-3) & (ecco >= 0.5)] = 2
+
+        ses = sun['s1'] * zns * sun['s5']
+        sis = sun['s2'] * zns * (sun['z11'] + sun['z13'])
+        sls = -zns * sun['s3'] * (sun['z1'] + sun['z3'] - 14.0 - 6.0 * emsq)
+        sghs = sun['s4'] * zns * (sun['z31'] + sun['z33'] - 6.0)
+        equatorial = (inclo < 5.2359877e-2) | (inclo > np.pi - 5.2359877e-2)
+        shs = np.where(equatorial, 0.0, -zns * sun['s2'] * (sun['z21'] + sun['z23']))
+        shs = np.where(sinim != 0.0, shs / sinim, shs)
+        sgs = sghs - cosim * shs
+        self.dedt = ses + moon['s1'] * znl * moon['s5']
+        self.didt = sis + moon['s2'] * znl * (moon['z11'] + moon['z13'])
+        self.dmdt = sls - znl * moon['s3'] * (moon['z1'] + moon['z3'] - 14.0 - 6.0 * emsq)
+        sghl = moon['s4'] * znl * (moon['z31'] + moon['z33'] - 6.0)
+        shll = np.where(equatorial, 0.0, -znl * moon['s2'] * (moon['z21'] + moon['z23']))
+        self.domdt = np.where(sinim != 0.0, sgs + sghl - cosim / sinim * shll, sgs + sghl)
+        self.dnodt = np.where(sinim != 0.0, shs + shll / sinim, shs)
+
+        theta = np.remainder(gsto, TWOPI)
+        aonv = (no / self.xke)**X2O3
+        zeros = np.zeros(d.size)
+        self.d2201, self.d2211, self.d3210, self.d3222, self.d4410 = zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy()
+        self.d4422, self.d5220, self.d5232, self.d5421, self.d5433 = zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy()
+        self.del1, self.del2, self.del3 = zeros.copy(), zeros.copy(), zeros.copy()
+        self.xfact, self.xlamo = zeros.copy(), zeros.copy()
+
+        # 12 hour resonance, for highly eccentric orbits such as Molniya orbits
+        half_day = self.irez == 2
+        if half_day.any():
+            em, emsq2, cosi, sini = ecco[half_day], eccsq[half_day], cosim[half_day], sinim[half_day]
+            cosisq = cosi * cosi
+            eoc = em * emsq2
+            g201 = -0.306 - (em - 0.64) * 0.440
+            low = em <= 0.65
+            g211 = np.where(low, 3.616 - 13.2470 * em + 16.2900 * emsq2, -72.099 + 331.819 * em - 508.738 * emsq2 + 266.724 * eoc)
+            g310 = np.where(low, -19.302 + 117.3900 * em - 228.4190 * emsq2 + 156.5910 * eoc, -346.844 + 1582.851 * em - 2415.925 * emsq2 + 1246.113 * eoc)
+            g322 = np.where(low, -18.9068 + 109.7927 * em - 214.6334 * emsq2 + 146.5816 * eoc, -342.585 + 1554.908 * em - 2366.899 * emsq2 + 1215.972 * eoc)
+            g410 = np.where(low, -41.122 + 242.6940 * em - 471.0940 * emsq2 + 313.9530 * eoc, -1052.797 + 4758.686 * em - 7193.992 * emsq2 + 3651.957 * eoc)
+            g422 = np.where(low, -146.407 + 841.8800 * em - 1629.014 * emsq2 + 1083.4350 * eoc, -3581.690 + 16178.110 * em - 24462.770 * emsq2 + 12422.520 * eoc)
+            g520 = np.where(low, -532.114 + 3017.977 * em - 5740.032 * emsq2 + 3708.2760 * eoc,
+                            np.where(em > 0.715, -5149.66 + 29936.92 * em - 54087.36 * emsq2 + 31324.56 * eoc, 1464.74 - 4664.75 * em + 3763.64 * emsq2))
+            below = em < 0.7
+            g533 = np.where(below, -919.22770 + 4988.6100 * em - 9064.7700 * emsq2 + 5542.21 * eoc, -37995.780 + 161616.52 * em - 229838.20 * emsq2 + 109377.94 * eoc)
+            g521 = np.where(below, -822.71072 + 4568.6173 * em - 8491.4146 * emsq2 + 5337.524 * eoc, -51752.104 + 218913.95 * em - 309468.16 * emsq2 + 146349.42 * eoc)
+            g532 = np.where(below, -853.66600 + 4690.2500 * em - 8624.7700 * emsq2 + 5341.4 * eoc, -40023.880 + 170470.89 * em - 242699.48 * emsq2 + 115605.82 * eoc)
+            sini2 = sini * sini
+            f220 = 0.75 * (1.0 + 2.0 * cosi + cosisq)
+            f221 = 1.5 * sini2
+            f321 = 1.875 * sini * (1.0 - 2.0 * cosi - 3.0 * cosisq)
+            f322 = -1.875 * sini * (1.0 + 2.0 * cosi - 3.0 * cosisq)
+            f441 = 35.0 * sini2 * f220
+            f442 = 39.3750 * sini2 * sini2
+            f522 = 9.84375 * sini * (sini2 * (1.0 - 2.0 * cosi - 5.0 * cosisq) + 0.33333333 * (-2.0 + 4.0 * cosi + 6.0 * cosisq))
+            f523 = sini * (4.92187512 * sini2 * (-2.0 - 4.0 * cosi + 10.0 * cosisq) + 6.56250012 * (1.0 + 2.0 * cosi - 3.0 * cosisq))
+            f542 = 29.53125 * sini * (2.0 - 8.0 * cosi + cosisq * (-12.0 + 8.0 * cosi + 10.0 * cosisq))
+            f543 = 29.53125 * sini * (-2.0 - 8.0 * cosi + cosisq * (12.0 + 8.0 * cosi - 10.0 * cosisq))
+            nm, aonv2 = no[half_day], aonv[half_day]
+            temp1 = 3.0 * nm * nm * aonv2 * aonv2
+            temp = temp1 * root22
+            self.d2201[half_day] = temp * f220 * g201
+            self.d2211[half_day] = temp * f221 * g211
+            temp1 = temp1 * aonv2
+            temp = temp1 * root32
+            self.d3210[half_day] = temp * f321 * g310
+            self.d3222[half_day] = temp * f322 * g322
+            temp1 = temp1 * aonv2
+            temp = 2.0 * temp1 * root44
+            self.d4410[half_day] = temp * f441 * g410
+            self.d4422[half_day] = temp * f442 * g422
+            temp1 = temp1 * aonv2
+            temp = temp1 * root52
+            self.d5220[half_day] = temp * f522 * g520
+            self.d5232[half_day] = temp * f523 * g532
+            temp = 2.0 * temp1 * root54
+            self.d5421[half_day] = temp * f542 * g521
+            self.d5433[half_day] = temp * f543 * g533
+            self.xlamo[half_day] = np.remainder(mo[half_day] + 2.0 * nodeo[half_day] - 2.0 * theta[half_day], TWOPI)
+            self.xfact[half_day] = (self.mdot[d] + self.dmdt + 2.0 * (self.nodedot[d] + self.dnodt - RPTIM) - no)[half_day]
+
+        # 24 hour (geosynchronous) resonance
+        one_day = self.irez == 1
+        if one_day.any():
+            emsq1, cosi, sini = emsq[one_day], cosim[one_day], sinim[one_day]
+            g200 = 1.0 + emsq1 * (-2.5 + 0.8125 * emsq1)
+            g310 = 1.0 + 2.0 * emsq1
+            g300 = 1.0 + emsq1 * (-6.0 + 6.60937 * emsq1)
+            f220 = 0.75 * (1.0 + cosi) * (1.0 + cosi)
+            f311 = 0.9375 * sini * sini * (1.0 + 3.0 * cosi) - 0.75 * (1.0 + cosi)
+            f330 = 1.875 * (1.0 + cosi)**3
+            nm, aonv1 = no[one_day], aonv[one_day]
+            del1 = 3.0 * nm * nm * aonv1 * aonv1
+            self.del2[one_day] = 2.0 * del1 * f220 * g200 * q22
+            self.del3[one_day] = 3.0 * del1 * f330 * g300 * q33 * aonv1
+            self.del1[one_day] = del1 * f311 * g310 * q31 * aonv1
+            self.xlamo[one_day] = np.remainder(mo[one_day] + nodeo[one_day] + argpo[one_day] - theta[one_day], TWOPI)
+            self.xfact[one_day] = (self.mdot[d] + xpidot[d] - RPTIM + self.dmdt + self.domdt + self.dnodt - no)[one_day]
+        return
+
+    def _resonance_rates(self, rows:np.ndarray=None, xli:np.ndarray=None, xni:np.ndarray=None, atime:np.ndarray=None) -> tuple:
+        '''This method evaluates the rates of the resonance integrator (the xndt, xldot and xnddt terms of dspace) for the resonant
+        deep-space satellites at (rows), where the coefficient arrays are broadcast against the (xli), (xni) and (atime) arrays.'''
+        fasx2, fasx4, fasx6 = 0.13130908, 2.8843198, 0.37448087
+        g22, g32, g44, g52, g54 = 5.7686396, 0.95240898, 1.8014998, 1.0508330, 4.4108898
+        shape = (-1,) + (1,) * (xli.ndim - 1)
+        coefficient = lambda name: getattr(self, name)[rows].reshape(shape)
+        irez = coefficient('irez')
+        xldot = xni + coefficient('xfact')
+
+        del1, del2, del3 = coefficient('del1'), coefficient('del2'), coefficient('del3')
+        xndt_one = del1 * np.sin(xli - fasx2) + del2 * np.sin(2.0 * (xli - fasx4)) + del3 * np.sin(3.0 * (xli - fasx6))
+        xnddt_one = del1 * np.cos(xli - fasx2) + 2.0 * del2 * np.cos(2.0 * (xli - fasx4)) + 3.0 * del3 * np.cos(3.0 * (xli - fasx6))
+
+        d = self.deep[rows].reshape(shape)
+        xomi = self.argpo[d] + self.argpdot[d] * atime
+        x2omi, x2li = xomi + xomi, xli + xli
+        d2201, d2211, d3210, d3222, d4410 = (coefficient(name) for name in ('d2201', 'd2211', 'd3210', 'd3222', 'd4410'))
+        d4422, d5220, d5232, d5421, d5433 = (coefficient(name) for name in ('d4422', 'd5220', 'd5232', 'd5421', 'd5433'))
+        xndt_two = (d2201 * np.sin(x2omi + xli - g22) + d2211 * np.sin(xli - g22) + d3210 * np.sin(xomi + xli - g32) + d3222 * np.sin(-xomi + xli - g32) +
+                    d4410 * np.sin(x2omi + x2li - g44) + d4422 * np.sin(x2li - g44) + d5220 * np.sin(xomi + xli - g52) + d5232 * np.sin(-xomi + xli - g52) +
+                    d5421 * np.sin(xomi + x2li - g54) + d5433 * np.sin(-xomi + x2li - g54))
+        xnddt_two = (d2201 * np.cos(x2omi + xli - g22) + d2211 * np.cos(xli - g22) + d3210 * np.cos(xomi + xli - g32) + d3222 * np.cos(-xomi + xli - g32) +
+                     d5220 * np.cos(xomi + xli - g52) + d5232 * np.cos(-xomi + xli - g52) +
+                     2.0 * (d4410 * np.cos(x2omi + x2li - g44) + d4422 * np.cos(x2li - g44) + d5421 * np.cos(xomi + x2li - g54) + d5433 * np.cos(-xomi + x2li - g54)))
+
+        xndt = np.where(irez == 2, xndt_two, xndt_one)
+        xnddt = np.where(irez == 2, xnddt_two, xnddt_one) * xldot
+        return xndt, xldot, xnddt
+
+    def _deep_space_secular(self, t:np.ndarray=None, em=None, argpm=None, inclm=None, mm=None, nodem=None, nm=None) -> tuple:
+        '''This method applies the deep-space secular effects, and the resonance integration (dspace), to the rows of the deep-space
+        satellites. The resonance equations are integrated in fixed steps of 720 minutes from each satellite's epoch. Since every
+        time of a satellite shares the same integration steps, the steps are taken once per satellite, in both directions, and each
+        time then picks up the last step before it.'''
+        em = em + self.dedt[:, None] * t
+        inclm = inclm + self.didt[:, None] * t
+        argpm = argpm + self.domdt[:, None] * t
+        nodem = nodem + self.dnodt[:, None] * t
+        mm = mm + self.dmdt[:, None] * t
+
+        rows = np.flatnonzero(self.irez != 0)
+        if rows.size == 0:
+            return em, argpm, inclm, mm, nodem, nm
+
+        tr = t[rows]
+        steps = int(np.abs(tr).max() // STEP)
+        xli = np.empty((rows.size, 2, steps + 1))
+        xni = np.empty((rows.size, 2, steps + 1))
+        xli[:, :, 0] = self.xlamo[rows, None]
+        xni[:, :, 0] = self.no[self.deep[rows], None]
+        direction = np.array([STEP, -STEP])
+        for k in range(steps):
+            xndt, xldot, xnddt = self._resonance_rates(rows, xli[:, :, k], xni[:, :, k], direction * k)
+            xli[:, :, k + 1] = xli[:, :, k] + xldot * direction + xndt * 259200.0
+            xni[:, :, k + 1] = xni[:, :, k] + xndt * direction + xnddt * 259200.0
+
+        k = (np.abs(tr) // STEP).astype(np.intp)
+        backward = (tr <= 0.0).astype(np.intp)
+        index = np.arange(rows.size)[:, None]
+        xli_k, xni_k = xli[index, backward, k], xni[index, backward, k]
+        atime = direction[backward] * k
+        xndt, xldot, xnddt = self._resonance_rates(rows, xli_k, xni_k, atime)
+        ft = tr - atime
+
+        no = self.no[self.deep[rows], None]
+        theta = np.remainder(self.gsto[self.deep[rows], None] + tr * RPTIM, TWOPI)
+        nm_r = xni_k + xndt * ft + xnddt * ft * ft * 0.5
+        xl = xli_k + xldot * ft + xndt * ft * ft * 0.5
+        mm_r = np.where(self.irez[rows, None] != 1, xl - 2.0 * nodem[rows] + 2.0 * theta, xl - nodem[rows] - argpm[rows] + theta)
+        mm[rows] = mm_r
+        nm = np.array(nm, copy=True)
+        nm[rows] = no + (nm_r - no)
+        return em, argpm, inclm, mm, nodem, nm
+
+    def _deep_space_periodics(self, t:np.ndarray=None, ep=None, inclp=None, nodep=None, argpp=None, mp=None) -> tuple:
+        '''This method applies the lunar-solar periodic effects (dpper) to the rows of the deep-space satellites, including the
+        Lyddane modification for inclinations under 0.2 radians.'''
+        zns, zes, znl, zel = 1.19459e-5, 0.01675, 1.5835218e-4, 0.05490
+        column = lambda name: getattr(self, name)[:, None]
+
+        zm = column('zmos') + zns * t
+        zf = zm + 2.0 * zes * np.sin(zm)
+        sinzf = np.sin(zf)
+        f2 = 0.5 * sinzf * sinzf - 0.25
+        f3 = -0.5 * sinzf * np.cos(zf)
+        ses = column('se2') * f2 + column('se3') * f3
+        sis = column('si2') * f2 + column('si3') * f3
+        sls = column('sl2') * f2 + column('sl3') * f3 + column('sl4') * sinzf
+        sghs = column('sgh2') * f2 + column('sgh3') * f3 + column('sgh4') * sinzf
+        shs = column('sh2') * f2 + column('sh3') * f3
+
+        zm = column('zmol') + znl * t
+        zf = zm + 2.0 * zel * np.sin(zm)
+        sinzf = np.sin(zf)
+        f2 = 0.5 * sinzf * sinzf - 0.25
+        f3 = -0.5 * sinzf * np.cos(zf)
+        sel = column('ee2') * f2 + column('e3') * f3
+        sil = column('xi2') * f2 + column('xi3') * f3
+        sll = column('xl2') * f2 + column('xl3') * f3 + column('xl4') * sinzf
+        sghl = column('xgh2') * f2 + column('xgh3') * f3 + column('xgh4') * sinzf
+        shll = column('xh2') * f2 + column('xh3') * f3
+
+        pe, pinc, pl, pgh, ph = ses + sel, sis + sil, sls + sll, sghs + sghl, shs + shll
+        inclp = inclp + pinc
+        ep = ep + pe
+        sinip, cosip = np.sin(inclp), np.cos(inclp)
+
+        # Periodics applied directly
+        ph_direct = ph / sinip
+        argpp_direct = argpp + pgh - cosip * ph_direct
+        nodep_direct = nodep + ph_direct
+
+        # Lyddane modification for low inclinations
+        sinop, cosop = np.sin(nodep), np.cos(nodep)
+        alfdp = sinip * sinop + ph * cosop + pinc * cosip * sinop
+        betdp = sinip * cosop - ph * sinop + pinc * cosip * cosop
+        xnoh = np.fmod(nodep, TWOPI)
+        xls = mp + argpp + pl + pgh + (cosip - pinc * sinip) * xnoh
+        nodep_lyddane = np.arctan2(alfdp, betdp)
+        wrap = np.abs(xnoh - nodep_lyddane) > np.pi
+        nodep_lyddane = np.where(wrap, np.where(nodep_lyddane < xnoh, nodep_lyddane + TWOPI, nodep_lyddane - TWOPI), nodep_lyddane)
+        argpp_lyddane = xls - (mp + pl) - cosip * nodep_lyddane
+
+        direct = inclp >= 0.2
+        nodep = np.where(direct, nodep_direct, nodep_lyddane)
+        argpp = np.where(direct, argpp_direct, argpp_lyddane)
+        return ep, inclp, nodep, argpp, mp + pl
+
+    def propagate(self, tsince=None) -> tuple:
+        '''This method propagates every satellite to the times in (tsince), which are the minutes since each satellite's epoch,
+        either as an (M,) array shared by all the satellites or as an (N, M) array.
+
+        A satellite whose elements become invalid at a time (i.e. the eccentricity leaves the range [0, 1), or the mean motion
+        becomes negative) has NaN positions and velocities at that time, and the reason is returned as an error code (see the
+        ERROR_ constants of this module). A satellite that is propagated below the surface of the Earth is returned as usual, but
+        flagged with ERROR_DECAYED.
+
+        :param tsince: The times since epoch (minutes).
+        :return: The TEME positions (km) and velocities (km/s) as (N, M, 3) arrays, and the (N, M) array of error codes.
+        '''
+        t = np.asarray(tsince, dtype=np.float64)
+        t = np.broadcast_to(t if t.ndim == 2 else np.atleast_1d(t)[None, :], (len(self), np.atleast_1d(t).shape[-1]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._propagate(t)
+
+    def _propagate(self, t:np.ndarray=None) -> tuple:
+        column = lambda name: getattr(self, name)[:, None]
+        j2, xke, j3oj2 = self.j2, self.xke, self.j3oj2
+        error = np.zeros(t.shape, dtype=np.int8)
+
+        xmdf = column('mo') + column('mdot') * t
+        argpdf = column('argpo') + column('argpdot') * t
+        nodedf = column('nodeo') + column('nodedot') * t
+        t2 = t * t
+        t3 = t2 * t
+        t4 = t3 * t
+        nodem = nodedf + column('nodecf') * t2
+        full = ~column('simple')
+        delmtemp = 1.0 + column('eta') * np.cos(xmdf)
+        temp = np.where(full, column('omgcof') * t + column('xmcof') * (delmtemp * delmtemp * delmtemp - column('delmo')), 0.0)
+        mm = xmdf + temp
+        argpm = argpdf - temp
+        tempa = 1.0 - column('cc1') * t - column('d2') * t2 - column('d3') * t3 - column('d4') * t4
+        tempe = column('bstar') * column('cc4') * t + np.where(full, column('bstar') * column('cc5') * (np.sin(mm) - column('sinmao')), 0.0)
+        templ = column('t2cof') * t2 + column('t3cof') * t3 + t4 * (column('t4cof') + t * column('t5cof'))
+
+        nm = np.broadcast_to(column('no'), t.shape)
+        em = np.broadcast_to(column('ecco'), t.shape)
+        inclm = np.broadcast_to(column('inclo'), t.shape)
+        d = self.deep
+        if d.size:
+            em, argpm, inclm, nm = em.copy(), argpm.copy(), inclm.copy(), nm.copy()
+            em[d], argpm[d], inclm[d], mm[d], nodem[d], nm[d] = self._deep_space_secular(t[d], em[d], argpm[d], inclm[d], mm[d], nodem[d], nm[d])
+
+        error[nm <= 0.0] = ERROR_MEAN_MOTION
+        am = (xke / nm)**X2O3 * tempa * tempa
+        nm = xke / am**1.5
+        em = em - tempe
+        error[(error == 0) & ((em >= 1.0) | (em < -0.001))] = ERROR_MEAN_ECCENTRICITY
+        em = np.maximum(em, 1.0e-6)
+        mm = mm + column('no') * templ
+        xlm = mm + argpm + nodem
+        nodem = np.fmod(nodem, TWOPI)
+        argpm = np.remainder(argpm, TWOPI)
+        xlm = np.remainder(xlm, TWOPI)
+        mm = np.remainder(xlm - argpm - nodem, TWOPI)
+
+        ep, xincp, argpp, nodep, mp = em, inclm, argpm, nodem, mm
+        aycof = np.broadcast_to(column('aycof'), t.shape)
+        xlcof = np.broadcast_to(column('xlcof'), t.shape)
+        con41 = np.broadcast_to(column('con41'), t.shape)
+        x1mth2 = np.broadcast_to(column('x1mth2'), t.shape)
+        x7thm1 = np.broadcast_to(column('x7thm1'), t.shape)
+        if d.size:
+            ep, xincp, nodep, argpp, mp = ep.copy(), xincp.copy(), nodep.copy(), argpp.copy(), mp.copy()
+            ep_d, xincp_d, nodep_d, argpp_d, mp_d = self._deep_space_periodics(t[d], ep[d], xincp[d], nodep[d], argpp[d], mp[d])
+            negative = xincp_d < 0.0
+            xincp_d = np.where(negative, -xincp_d, xincp_d)
+            nodep_d = np.where(negative, nodep_d + np.pi, nodep_d)
+            argpp_d = np.where(negative, argpp_d - np.pi, argpp_d)
+            ep[d], xincp[d], nodep[d], argpp[d], mp[d] = ep_d, xincp_d, nodep_d, argpp_d, mp_d
+            error_d = error[d]
+            error_d[(error_d == 0) & ((ep_d < 0.0) | (ep_d > 1.0))] = ERROR_PERTURBED_ECCENTRICITY
+            error[d] = error_d
+
+            sinip_d, cosip_d = np.sin(xincp_d), np.cos(xincp_d)
+            cosisq_d = cosip_d * cosip_d
+            aycof, xlcof, con41, x1mth2, x7thm1 = aycof.copy(), xlcof.copy(), con41.copy(), x1mth2.copy(), x7thm1.copy()
+            aycof[d] = -0.5 * j3oj2 * sinip_d
+            xlcof[d] = -0.25 * j3oj2 * sinip_d * (3.0 + 5.0 * cosip_d) / np.where(np.abs(cosip_d + 1.0) > 1.5e-12, 1.0 + cosip_d, 1.5e-12)
+            con41[d] = 3.0 * cosisq_d - 1.0
+            x1mth2[d] = 1.0 - cosisq_d
+            x7thm1[d] = 7.0 * cosisq_d - 1.0
+        sinip, cosip = np.sin(xincp), np.cos(xincp)
+
+        # Solve Kepler's equation for the long-period periodics
+        axnl = ep * np.cos(argpp)
+        temp = 1.0 / (am * (1.0 - ep * ep))
+        aynl = ep * np.sin(argpp) + temp * aycof
+        xl = mp + argpp + nodep + temp * xlcof * axnl
+        u = np.remainder(xl - nodep, TWOPI)
+        eo1 = u.copy()
+        sineo1, coseo1 = np.empty_like(u), np.empty_like(u)
+        active = np.flatnonzero(np.isfinite(u))
+        flat = (eo1.reshape(-1), sineo1.reshape(-1), coseo1.reshape(-1), u.reshape(-1), axnl.reshape(-1), aynl.reshape(-1))
+        eo1_f, sin_f, cos_f, u_f, axnl_f, aynl_f = flat
+        sin_f[:] = np.nan
+        cos_f[:] = np.nan
+        for i in range(10):
+            E = eo1_f[active]
+            sin_f[active], cos_f[active] = s, c = np.sin(E), np.cos(E)
+            ax, ay = axnl_f[active], aynl_f[active]
+            tem5 = (u_f[active] - ay * c + ax * s - E) / (1.0 - c * ax - s * ay)
+            tem5 = np.clip(tem5, -0.95, 0.95)
+            eo1_f[active] = E + tem5
+            active = active[np.abs(tem5) >= 1.0e-12]
+            if active.size == 0:
+                break
+
+        # Short-period periodics
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = am * (1.0 - el2)
+        error[(error == 0) & (pl < 0.0)] = ERROR_SEMI_LATUS_RECTUM
+        rl = am * (1.0 - ecose)
+        rdotl = np.sqrt(am) * esine / rl
+        rvdotl = np.sqrt(pl) / rl
+        betal = np.sqrt(1.0 - el2)
+        temp = esine / (1.0 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        su = np.arctan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp = 1.0 / pl
+        temp1 = 0.5 * j2 * temp
+        temp2 = temp1 * temp
+
+        mrt = rl * (1.0 - 1.5 * temp2 * betal * con41) + 0.5 * temp1 * x1mth2 * cos2u
+        su = su - 0.25 * temp2 * x7thm1 * sin2u
+        xnode = nodep + 1.5 * temp2 * cosip * sin2u
+        xinc = xincp + 1.5 * temp2 * cosip * sinip * cos2u
+        mvt = rdotl - nm * temp1 * x1mth2 * sin2u / xke
+        rvdot = rvdotl + nm * temp1 * (x1mth2 * cos2u + 1.5 * con41) / xke
+
+        sinsu, cossu = np.sin(su), np.cos(su)
+        snod, cnod = np.sin(xnode), np.cos(xnode)
+        sini, cosi = np.sin(xinc), np.cos(xinc)
+        xmx = -snod * cosi
+        xmy = cnod * cosi
+        ux = np.stack((xmx * sinsu + cnod * cossu, xmy * sinsu + snod * cossu, sini * sinsu), axis=-1)
+        vx = np.stack((xmx * cossu - cnod * sinsu, xmy * cossu - snod * sinsu, sini * cossu), axis=-1)
+
+        vkmpersec = self.radius * xke / 60.0
+        positions = (mrt * self.radius)[..., None] * ux
+        velocities = (mvt[..., None] * ux + rvdot[..., None] * vx) * vkmpersec
+        error[(error == 0) & (mrt < 1.0)] = ERROR_DECAYED
+        invalid = (error != 0) & (error != ERROR_DECAYED)
+        positions[invalid] = np.nan
+        velocities[invalid] = np.nan
+        return positions, velocities, error
@@ -0,0 +1,70 @@
+import os
+import numpy as np
+
+class MappedFile(object):
+    '''This class is the stand-in for multiprocessing.shared_memory.SharedMemory on Python 3.6 and 3.7, where it is not available.
+    The block is a temporary file that every process maps into its memory, with the same (name), (buf), close() and unlink() as
+    a SharedMemory block. The operating system keeps the pages of the file in its cache, so the arrays are still not pickled.'''
+
+    def __init__(self, name:str=None, create:bool=False, size:int=0):
+        import mmap
+        import tempfile
+        if create is True:
+            descriptor, name = tempfile.mkstemp(prefix='spaceman3D-')
+            os.ftruncate(descriptor, size)
+            os.close(descriptor)
+        self.name = name
+        with open(name, 'r+b') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0)
+        self.buf = memoryview(self._mmap)
+        return
+
+    def close(self):
+        self.buf.release()
+        self._mmap.close()
+        return
+
+    def unlink(self):
+        os.remove(self.name)
+        return
+
+def shared_block(name:str=None, create:bool=False, size:int=0):
+    '''This function creates (or, given its (name), opens) a block of memory shared between processes. It is a SharedMemory
+    block where the multiprocessing.shared_memory module is available (Python 3.8 and later), and a MappedFile otherwise.'''
+    try:
+        from multiprocessing.shared_memory import SharedMemory
+    except ImportError:
+        SharedMemory = MappedFile
+    if create is True:
+        return SharedMemory(create=True, size=max(size, 1))
+    return SharedMemory(name=name)
+
+def release_blocks(blocks=None, unlink:bool=False):
+    '''This function closes (and if (unlink) is True, removes) blocks of shared memory. A block that is still viewed by an array
+    can not be closed, and is left to be closed when the process exits, so a failure to clean up never hides the exception that
+    interrupted the work on the blocks.'''
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass
+        if unlink is True:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+    return
+
+def shared_array(array=None) -> tuple:
+    '''This function copies an array into a new block of shared memory, and returns the block with a description of the array
+    that a worker process can attach to with the attach_array() function.'''
+    block = shared_block(create=True, size=array.nbytes)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype)
+
+def attach_array(description=None) -> tuple:
+    '''This function attaches to a block of shared memory created by the shared_array() function, and returns the block with
+    an array view onto it. The view must be deleted before the block is closed.'''
+    name, shape, dtype = description
+    block = shared_block(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
@@ -1,6 +1,59 @@
+from collections import namedtuple
 from datetime import datetime, timedelta
+from functools import lru_cache
+import os
 import pytz as tz
-import pandas as pd
+from spaceman3D.Orbit import units
+from spaceman3D.Orbit.elements import TLE_LINE_LENGTH, TITLE_LENGTH
+
+# The parsed TLERecords are memoized up to the size of a full catalog (about 25,000 tracked objects), so a pass over a whole
+# catalog does not evict the records of the same catalog before they are looked up again.
+TLE_RECORD_CACHE_SIZE = 32768
+
+class TLERecord(object):
+    '''This class is an immutable record holding every element of a single Two-Line Element (TLE). A record is produced once per
+    TLE by the TLE().tle_record() method, which validates the TLE and takes every fixed-column slice in a single pass. The per-element
+    methods of the TLE class, and the Orbital class, then read the already converted values from the record instead of re-parsing
+    and re-validating the TLE for each element. The class uses __slots__, so a catalog of records stays compact in memory.
+
+    The epoch is held both as a timezone aware datetime (epoch_date) and as a NumPy datetime64[ns] (epoch_datetime64), which can
+    be subtracted from arrays of times directly. Two records are equal when their titles and both of their lines are equal.
+    '''
+
+    __slots__ = ('title', 'line1', 'line2', 'satellite_number', 'classification', 'international_designator_year',
+                 'international_designator_launch_number', 'international_designator_piece_of_launch', 'epoch_year', 'epoch',
+                 'epoch_date', 'epoch_datetime64', 'ballistic_coeffecient', 'second_time_derivative_of_mean_motion', 'bstar_drag_term',
+                 'element_set_number', 'inclination', 'right_ascension', 'eccentricity', 'argument_periapsis', 'mean_anomaly',
+                 'mean_motion', 'revolution')
+
+    def __init__(self, **elements):
+        for name in self.__slots__:
+            object.__setattr__(self, name, elements[name])
+        return
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'A TLERecord is immutable. The ({name}) element cannot be reassigned.')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'A TLERecord is immutable. The ({name}) element cannot be deleted.')
+
+    def __eq__(self, other):
+        if not isinstance(other, TLERecord):
+            return NotImplemented
+        return (self.title, self.line1, self.line2) == (other.title, other.line1, other.line2)
+
+    def __hash__(self):
+        return hash((self.title, self.line1, self.line2))
+
+    def __repr__(self):
+        return f'TLERecord(title={self.title!r}, satellite_number={self.satellite_number}, epoch_date={self.epoch_date.isoformat()})'
+
+@lru_cache(maxsize=TLE_RECORD_CACHE_SIZE)
+def _cached_tle_record(tle:str) -> TLERecord:
+    '''This function parses and validates a multi-line TLE string into a TLERecord. The result is memoized on the TLE string, so
+    repeated per-element lookups on the same TLE only pay for parsing once.'''
+    parser = TLE()
+    return parser.record_from_lines(*parser.parse_tle(tle))
 
 class TLE(object):
 
@@ -141,6 +194,72 @@ class TLE(object):
         '''
         return float(f'-0.{element[1:]}') if element[0] == '-' else float(f'0.{element}')
 
+    def record_from_lines(self, title:str=None, line1:str=None, line2:str=None) -> TLERecord:
+        '''This method takes the title and the two lines of a Two-Line Element (TLE) and builds a TLERecord from them. The validity
+        checks of the check_valid_tle method (line indicators, matching satellite numbers and the Modulo-10 checksums) and every
+        fixed-column slice of the TLE are done here in a single pass, so that no element needs to be parsed a second time.
+
+        :param title: The title of the satellite. This can be an empty string for TLEs that do not carry a title line.
+        :param line1: The first line of the TLE.
+        :param line2: The second line of the TLE.
+        :return: A validated TLERecord containing every element of the TLE.
+        '''
+        for param in (title, line1, line2):
+            assert isinstance(param, str), f'The ({param}) must be of type string. Please check that the value passed in for ({param}) is a string.'
+
+        line_index_chk = line1[:1] == '1' and line2[:1] == '2'
+        sat_number_chk = line1[2:7] == line2[2:7]
+        checksum_chk = self.tle_checksum_algortithm(line1) == line1[-1:] and self.tle_checksum_algortithm(line2) == line2[-1:]
+        assert line_index_chk and sat_number_chk and checksum_chk, "Your TLE data failed the validity check. Confirm that the data is correct, and try again."
+
+        epoch_year = int(line1[18:20])
+        epoch = float(line1[20:32])
+        full_year = 2000 + epoch_year if epoch_year < 70 else 1900 + epoch_year
+        return TLERecord(
+            title=title,
+            line1=line1,
+            line2=line2,
+            satellite_number=int(line1[2:7]),
+            classification=line1[7:8],
+            international_designator_year=int(line1[9:11]),
+            international_designator_launch_number=int(line1[11:14]),
+            international_designator_piece_of_launch=line1[14:17],
+            epoch_year=epoch_year,
+            epoch=epoch,
+            epoch_date=datetime(year=full_year, month=1, day=1, tzinfo=tz.utc) + timedelta(days=epoch-1),
+            epoch_datetime64=units.epoch_to_datetime64(full_year, epoch),
+            ballistic_coeffecient=float(line1[33:43]),
+            second_time_derivative_of_mean_motion=self.scientific_notation_conversion(line1[44:52]),
+            bstar_drag_term=self.scientific_notation_conversion(line1[53:61]),
+            element_set_number=int(line1[64:68]),
+            inclination=float(line2[8:16]),
+            right_ascension=float(line2[17:25]),
+            eccentricity=self.decimal_conversion(line2[26:33]),
+            argument_periapsis=float(line2[34:42]),
+            mean_anomaly=float(line2[43:51]),
+            mean_motion=float(line2[52:63]),
+            revolution=float(line2[63:68]))
+
+    def tle_record(self, tle=None) -> TLERecord:
+        '''This method returns the parsed and validated TLERecord for a Two-Line Element (TLE). The TLE is only parsed the first
+        time it is seen, as the records are memoized on the TLE string (up to TLE_RECORD_CACHE_SIZE of them, see the
+        clear_record_cache() method). If a TLERecord is passed in, it is returned as is, which
+        allows each of the element methods of this class to be called with either a TLE string or an already parsed record.
+
+        :param tle: The Two-Line Element (TLE), or a TLERecord.
+        :return: The TLERecord for the TLE.
+        '''
+        if isinstance(tle, TLERecord):
+            return tle
+        assert isinstance(tle, str), 'The (tle) parameter must be of type string. Please check that the Two line Element (TLE) passed in for tle is a Multi-Line String.'
+        return _cached_tle_record(tle)
+
+    def clear_record_cache(self):
+        '''This method empties the cache of the TLERecords memoized by the tle_record() method, such as after a catalog is
+        replaced by a newer download and its records will not be looked up again.'''
+        _cached_tle_record.cache_clear()
+        return
+
     def individual_element(self, tle:str=None, line:int=None, start:int=None, end:int=None, func=None):
         '''This method is used to parse out the relevant individual elements within a Two-Line Element (TLE). The method uses the
         TLE passed into the (tle) parameter, in conjunction with the (line), (start), and (end) parameters to correctly slice out
@@ -154,13 +273,12 @@ class TLE(object):
         :param func: The function that is used to convert to the element to the proper format.
         :return: The properly formatted TLE.
         '''
-        assert self.check_valid_tle(tle) is True, "Your TLE data failed the validity check. Confirm that the data is correct, and try again."
         assert isinstance(line, int), 'The line parameter needs to be of type int. Please check that the value passed is of type int.'
         assert isinstance(start, int), 'The start parameter needs to be of type int. Please check that the value passed is of type int.'
         assert isinstance(end, int), 'The end parameter needs to be of type int. Please check that the value passed is of type int.'
 
-        title, line1, line2 =  self.parse_tle(tle)
-        line = line1 if line==1 else line2
+        record = self.tle_record(tle)
+        line = record.line1 if line==1 else record.line2
         value = func(line[start:end]) if func is not None else line[start:end]
         return value
 
@@ -180,7 +298,7 @@ class TLE(object):
         :type tle: str
         :return: Ballistic Coeffecient (Revolutions/Day)
         '''
-        return self.individual_element(tle,1,33,43,func=float)
+        return self.tle_record(tle).ballistic_coeffecient
 
     def second_time_derivative_of_mean_motion(self, tle:str=None) -> float:
         '''This method parses and returns the second derivative of mean motion from the Two-Line Element (TLE).
@@ -195,7 +313,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The 2nd Time Derivative of Mean Motion (Revolutions/Day^3)
         '''
-        return self.individual_element(tle,1,44,52,func=self.scientific_notation_conversion)
+        return self.tle_record(tle).second_time_derivative_of_mean_motion
 
     def bstar_drag_term(self, tle:str=None) -> float:
         '''This method parses and returns the BSTAR drag term from the Two-Line Element (TLE). Also called the
@@ -208,7 +326,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The B-Star Drag Term (earth radii^-1)
         '''
-        return self.individual_element(tle,1,53,61,func=self.scientific_notation_conversion)
+        return self.tle_record(tle).bstar_drag_term
 
     def satellite_number_and_classification(self, tle:str=None) -> int:
         '''This method parses and returns the satellite number from the Two-Line Element (TLE). Similar to
@@ -223,7 +341,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The satellites number.
         '''
-        return self.individual_element(tle,1,2,7,func=int)
+        return self.tle_record(tle).satellite_number
 
     def classification(self, tle:str=None) -> str:
         '''This method parses and returns the classification type of the satellite from the Two-Line Element (TLE).
@@ -238,7 +356,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The satellites classification. (i.e. U is an Unclassified piece: C is a Classified piece: S is a Secret piece)
         '''
-        return self.individual_element(tle,1,7,8,func=str)
+        return self.tle_record(tle).classification
 
     def international_designator_year(self, tle:str=None) -> int:
         '''This method parses and returns the international designator year from the Two-Line Element (TLE). The International
@@ -253,7 +371,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The International Designator Year
         '''
-        return self.individual_element(tle,1,9,11,func=int)
+        return self.tle_record(tle).international_designator_year
 
     def international_designator_launch_number(self, tle:str=None) -> int:
         '''This method parses and returns the international designator launch number from the Two-Line Element (TLE). The
@@ -268,7 +386,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The International Designator Launch Number.
         '''
-        return self.individual_element(tle,1,11,14,func=int)
+        return self.tle_record(tle).international_designator_launch_number
 
     def international_designator_piece_of_launch(self, tle:str=None) -> str:
         '''This method parses and returns the international designator piece of launch from the Two-Line Element (TLE). The
@@ -283,7 +401,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the international_designator_piece_of_launch element.
         '''
-        return self.individual_element(tle,1,14,17,func=str)
+        return self.tle_record(tle).international_designator_piece_of_launch
 
     def element_set_number(self, tle:str=None) -> int:
         '''This method parses and returns the element set number from the Two-Line Element (TLE) The element set number is a
@@ -297,7 +415,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the Element Set Number.
         '''
-        return self.individual_element(tle,1,64,68,func=int)
+        return self.tle_record(tle).element_set_number
 
     def epoch_year(self, tle:str=None, full_year:bool=False) -> int:
         '''This method parses and returns the epoch year from the Two-Line Element (TLE). The TLE provides the epoch year using
@@ -311,7 +429,7 @@ class TLE(object):
         '''
         assert isinstance(full_year, bool), "The full_year argument must be of type bool. Please check that the value passed is of type bool."
 
-        epoch_year = self.individual_element(tle,1,18,20,func=int)
+        epoch_year = self.tle_record(tle).epoch_year
         if full_year is True:
             epoch_year = 2000 + epoch_year if epoch_year < 70 else 1900 + epoch_year
         return epoch_year
@@ -324,7 +442,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The epoch (Julian Calander Days)
         '''
-        return self.individual_element(tle,1,20,32,func=float)
+        return self.tle_record(tle).epoch
 
     def epoch_date(self, tle:str=None):
         '''This method parses and returns the epoch date from the Two-Line Element (TLE). The epoch is a concept in astronomy
@@ -334,9 +452,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: The epoch (Datetime Object).
         '''
-        epoch = self.epoch(tle)
-        year = self.epoch_year(tle, full_year=True)
-        return datetime(year=year, month=1, day=1, tzinfo=tz.utc) + timedelta(days=epoch-1)
+        return self.tle_record(tle).epoch_date
 
     def inclination(self, tle:str=None) -> float:
         '''This method parses and returns the orbital inclination of the satellite from the Two-Line Element (TLE). The orbital inclincation
@@ -349,7 +465,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the TEME mean inclination.
         '''
-        return self.individual_element(tle,2,8,16,func=float)
+        return self.tle_record(tle).inclination
 
     def right_ascension(self, tle:str=None) -> float:
         '''This method parses and returns the right ascension of the satellites orbit from the Two-Line Element (TLE).
@@ -364,7 +480,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the TEME mean right ascension of the ascending node.
         '''
-        return self.individual_element(tle,2,17,25,func=float)
+        return self.tle_record(tle).right_ascension
 
     def eccentricity(self, tle:str=None) -> float:
         '''This method parses and returns the orbital eccentricity from the Two-Line Element (TLE). The eccentricity of an
@@ -380,7 +496,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the average eccentricity parameter.
         '''
-        return self.individual_element(tle,2,26,33,func=self.decimal_conversion)
+        return self.tle_record(tle).eccentricity
 
     def argument_periapsis(self, tle:str=None) -> float:
         '''This method parses and returns the argument of periapsis of the satellites orbit from the Two-Line Element (TLE).
@@ -396,7 +512,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the TEME Mean Argument of Perigee. (Degrees)
         '''
-        return self.individual_element(tle,2,34,42,func=float)
+        return self.tle_record(tle).argument_periapsis
 
     def mean_anomaly(self, tle:str=None) -> float:
         '''This method parses and returns the mean anomaly of the satellites orbit from the Two-Line Element (TLE).
@@ -414,7 +530,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the Mean Anomaly (Degrees)
         '''
-        return self.individual_element(tle,2,43,51,func=float)
+        return self.tle_record(tle).mean_anomaly
 
     def mean_motion(self, tle:str=None) -> float:
         '''This method parses and returns the mean motion of the satellites orbit from the Two-Line Element (TLE). The
@@ -427,7 +543,7 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the Mean Motion (Average Number of Orbits/day).
         '''
-        return self.individual_element(tle,2,52,63,func=float)
+        return self.tle_record(tle).mean_motion
 
     def revolution(self, tle:str=None) -> float:
         '''This method parses and returns the satellites orbital revolution from the Two-Line Element (TLE). The orbit number
@@ -441,38 +557,37 @@ class TLE(object):
         :param tle: The Two-Line Element (TLE).
         :return: the orbital Revolution (Number of Revolutions ).
         '''
-        return self.individual_element(tle,2,63,68,func=float)
+        return self.tle_record(tle).revolution
 
     def tle_to_dataframe(self, tle:str=None):
-        '''This method take a Two-Line Element (TLE) and converts its elements into a Pandas DataFrame. This method is structured
-        using slices of the TLE and then type conversions, as opposed to using the individual_element method intentionally.
-        If we were to use the individual_element method we would iteratively call the parse_tle method which is ineffecient.
-        So, for effeciency sake we will just call the parse_tle method once and then take a slice from it.
+        '''This method take a Two-Line Element (TLE) and converts its elements into a Pandas DataFrame. The elements are read from
+        the TLERecord of the TLE, so the TLE is parsed and validated only once regardless of how many elements are converted.
 
         :param tle: The Two-Line Element (TLE).
         :return: a Pandas DataFrame containing all of the elements within a TLE.
         '''
-        title, line1, line2 =  self.parse_tle(tle=tle)
+        record = self.tle_record(tle)
         sat_elements = {
-            'title': title,
-            'satellite_number': int(line1[2:7]),
-            'classification': str(line1[7:8]),
-            'international_designator_year': int(line1[9:11]),
-            'international_designator_launch_number': int(line1[11:14]),
-            'international_designator_piece_of_launch': str(line1[14:17]),
-            'element_set_number': float(line1[64:68]),
-            'inclination': float(line2[8:16]),
-            'right_ascension': float(line2[17:25]),
-            'eccentricity': self.decimal_conversion(line2[26:33]),
-            'argument_periapsis': float(line2[34:42]),
-            'mean_anomaly': float(line2[43:51]),
-            'mean_motion': float(line2[52:63]),
-            'epoch_date': self.epoch_date(tle=tle),
-            'revolution': float(line2[63:68]),
-            'bstar_drag_term': self.scientific_notation_conversion(line[53:61]),
-            'second_time_derivative_of_mean_motion': self.scientific_notation_conversion(line1[44:52]),
-            'ballistic_coeffecient': float(line1[33:43])
+            'title': record.title,
+            'satellite_number': record.satellite_number,
+            'classification': record.classification,
+            'international_designator_year': record.international_designator_year,
+            'international_designator_launch_number': record.international_designator_launch_number,
+            'international_designator_piece_of_launch': record.international_designator_piece_of_launch,
+            'element_set_number': float(record.element_set_number),
+            'inclination': record.inclination,
+            'right_ascension': record.right_ascension,
+            'eccentricity': record.eccentricity,
+            'argument_periapsis': record.argument_periapsis,
+            'mean_anomaly': record.mean_anomaly,
+            'mean_motion': record.mean_motion,
+            'epoch_date': record.epoch_date,
+            'revolution': record.revolution,
+            'bstar_drag_term': record.bstar_drag_term,
+            'second_time_derivative_of_mean_motion': record.second_time_derivative_of_mean_motion,
+            'ballistic_coeffecient': record.ballistic_coeffecient
         }
+        import pandas as pd
         df = pd.DataFrame(sat_elements, index=[0])
         return df
 
@@ -484,17 +599,9 @@ class TLE(object):
         :return: The satellites keplerian elements. (i.e. a tuple containing the satellites Title, Inclination,
         Right Ascension, Eccentricty, Argument Perigee, Mean Anomaly and Motion, and Epoch Date)
         '''
-        assert self.check_valid_tle(tle) is True, "Your TLE data failed the validity check. Confirm that the data is correct, and try again."
-
-        title, line1, line2 =  self.parse_tle(tle)
-        inclination = float(line2[8:16])
-        right_ascension = float(line2[17:25])
-        eccentricity = self.decimal_conversion(line2[26:33])
-        argument_periapsis = float(line2[34:42])
-        mean_anomaly = float(line2[43:51])
-        mean_motion = float(line2[52:63])
-        epoch_date = self.epoch_date(tle=tle)
-        return title, inclination, right_ascension, eccentricity, argument_periapsis, mean_anomaly, mean_motion, epoch_date
+        record = self.tle_record(tle)
+        return (record.title, record.inclination, record.right_ascension, record.eccentricity, record.argument_periapsis,
+                record.mean_anomaly, record.mean_motion, record.epoch_date)
 
     def satellite_identitfier_elements(self, tle:str=None) -> tuple:
         '''This method parses and returns the satellite's identifying elements as individual components from the Two-Line Element (TLE).
@@ -504,13 +611,147 @@ class TLE(object):
         :return: The satellites identifying elements. (i.e. a tuple containing Satellite Number, Classification,
         International Designator Elements, and the Element Set Number)
         '''
-        assert self.check_valid_tle(tle) is True, "Your TLE data failed the validity check. Confirm that the data is correct, and try again."
+        record = self.tle_record(tle)
+        return (record.satellite_number, record.classification, record.international_designator_year,
+                record.international_designator_launch_number, record.international_designator_piece_of_launch,
+                float(record.element_set_number))
+
+    def read_catalog(self, source=None, on_error=None, max_errors:int=100):
+        '''This method opens a catalog of Two-Line Elements (TLE), such as the catalog files published by CelesTrak and Space-Track,
+        for streaming. The catalog can be a path to a file or an open file object, and may be in either the 2-line or the 3-line
+        (titled) format. See the TLECatalogReader class for details.
+
+        :param source: A path to a catalog file, or a file object opened on one.
+        :param on_error: An optional function that is called with a TLECatalogError for each bad record in the catalog.
+        :param max_errors: The maximum number of bad records kept in the (errors) list of the reader.
+        :return: A TLECatalogReader that yields a TLERecord for each valid TLE in the catalog.
+        '''
+        return TLECatalogReader(source=source, on_error=on_error, max_errors=max_errors)
+
+TLECatalogError = namedtuple('TLECatalogError', ['line_number', 'lines', 'message'])
+TLECatalogError.__doc__ = '''A bad record found while reading a catalog. The (line_number) is the line of the catalog the record starts on,
+(lines) are the raw lines of the record, and (message) describes why the record was rejected.'''
+
+class TLECatalogReader(object):
+    '''This class streams the Two-Line Elements (TLE) of a catalog file as TLERecords. The catalog is read one line at a time, so
+    memory use stays flat regardless of the size of the catalog. Both the 2-line format and the 3-line format, where each TLE is
+    preceded by a title line (optionally prefixed by a "0 " as in Space-Track 3LE files), are supported, and may even be mixed.
+
+    Records that cannot be paired up or that fail the validity checks are reported rather than aborting the read. Each bad record
+    is passed to the (on_error) function as a TLECatalogError if one was given, and counted in (error_count). Only the first
+    (max_errors) bad records are kept in the (errors) list, so a feed full of bad records does not grow the memory of the reader.
+    The errors are reset each time the catalog is read.
+
+    Example:
+
+        reader = TLE().read_catalog('active.txt')
+        for record in reader:
+            ...
+        for chunk in reader.chunks(1000):
+            ...
+    '''
+
+    def __init__(self, source=None, on_error=None, max_errors:int=100):
+        assert isinstance(source, (str, os.PathLike)) or hasattr(source, 'read'), 'The (source) parameter must be a path or a file object. Please check the value passed in for (source).'
+        assert on_error is None or callable(on_error), 'The (on_error) parameter must be a function. Please check the value passed in for (on_error).'
+        assert isinstance(max_errors, int) and max_errors >= 0, 'The (max_errors) parameter must be a non-negative integer. Please check the value passed in for (max_errors).'
+        self.source = source
+        self.on_error = on_error
+        self.max_errors = max_errors
+        self.errors = []
+        self.error_count = 0
+        return
+
+    def __iter__(self):
+        return self.records()
+
+    def lines(self):
+        '''This method lazily yields the line number and the stripped text of each non-blank line in the catalog. Paths are opened
+        (and closed) by the method, while file objects are read from their current position. Lines read from binary file
+        objects are decoded as ASCII.
+
+        :return: A generator of (line_number, line) tuples.
+        '''
+        if isinstance(self.source, (str, os.PathLike)):
+            with open(self.source, 'r', encoding='ascii', errors='replace') as catalog:
+                yield from self._numbered_lines(catalog)
+        else:
+            yield from self._numbered_lines(self.source)
+
+    def _numbered_lines(self, catalog):
+        for line_number, line in enumerate(catalog, start=1):
+            if isinstance(line, bytes):
+                line = line.decode('ascii', errors='replace')
+            line = line.strip()
+            if line:
+                yield line_number, line
+
+    def _report(self, line_number:int=None, lines:tuple=None, message:str=None):
+        error = TLECatalogError(line_number=line_number, lines=lines, message=message)
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(error)
+        if self.on_error is not None:
+            self.on_error(error)
+        return
 
-        title, line1, line2 =  self.parse_tle(tle=tle)
-        satellite_number = int(line1[2:7])
-        classification = str(line1[7:8])
-        international_designator_year = int(line1[9:11])
-        international_designator_launch_number = int(line1[11:14])
-        international_designator_piece_of_launch = str(line1[14:17])
-        element_set_number = float(line1[64:68])
-        return satellite_number, classification, international_designator_year, international_designator_launch_number, international_designator_piece_of_launch, element_set_number
+    def records(self):
+        '''This method lazily parses the catalog, yielding a TLERecord for every valid TLE. A line starting with "1 " is taken
+        as the first line of a TLE, a line starting with "2 " as the second line, and any other line as the title of the next TLE.
+        A line starting with "1 " or "2 " that is no longer than a title (such as "1 HTS") is taken as a title as well, and a TLE
+        with a line that is longer than a title but shorter than a full TLE line is reported as truncated.
+
+        :return: A generator of TLERecords.
+        '''
+        parser = TLE()
+        title = line1 = None
+        start = None
+        self.errors = []
+        self.error_count = 0
+        for line_number, line in self.lines():
+            tle_line = len(line) > TITLE_LENGTH
+            if tle_line and line.startswith('1 '):
+                if line1 is not None:
+                    self._report(start, (line1,), 'The first line of the TLE is not followed by a second line.')
+                    # The title belonged to the dropped first line, not to this one.
+                    title = start = None
+                line1 = line
+                start = start if title is not None else line_number
+            elif tle_line and line.startswith('2 '):
+                if line1 is None:
+                    self._report(line_number, (line,), 'The second line of the TLE is not preceded by a first line.')
+                elif len(line1) < TLE_LINE_LENGTH or len(line) < TLE_LINE_LENGTH:
+                    self._report(start, (title, line1, line) if title is not None else (line1, line), f'The lines of the TLE must be {TLE_LINE_LENGTH} characters long, but they are truncated.')
+                else:
+                    try:
+                        record = parser.record_from_lines(title or '', line1, line)
+                    except (AssertionError, ValueError) as error:
+                        self._report(start, (title, line1, line) if title is not None else (line1, line), str(error))
+                    else:
+                        yield record
+                title = line1 = start = None
+            else:
+                if line1 is not None:
+                    self._report(start, (line1,), 'The first line of the TLE is not followed by a second line.')
+                    line1 = None
+                title = line[2:].strip() if line.startswith('0 ') else line
+                start = line_number
+        if line1 is not None:
+            self._report(start, (line1,), 'The first line of the TLE is not followed by a second line.')
+
+    def chunks(self, chunk_size:int=1000):
+        '''This method lazily parses the catalog in chunks, yielding lists of at most (chunk_size) TLERecords. Only a single
+        chunk is held in memory at any time, which makes this the preferred way to process very large catalogs in batches.
+
+        :param chunk_size: The maximum number of records in each chunk.
+        :return: A generator of lists of TLERecords.
+        '''
+        assert isinstance(chunk_size, int) and chunk_size > 0, 'The (chunk_size) parameter must be a positive integer. Please check the value passed in for (chunk_size).'
+        chunk = []
+        for record in self.records():
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
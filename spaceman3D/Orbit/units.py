@@ -0,0 +1,128 @@
+import numpy as np
+
+SECONDS_PER_DAY = 24*60*60
+
+#################### Angles ####################
+
+def degree_to_radian(degree=None):
+    '''This function converts degrees into radians. The input can be a scalar or a NumPy array of any shape.
+
+    :param degree: The degree value(s) to be converted.
+    :return: The radian value(s) corresponding to the degree value(s).
+    '''
+    return np.multiply(degree, np.pi/180)
+
+def radian_to_degree(radian=None):
+    '''This function converts radians into degrees. The input can be a scalar or a NumPy array of any shape.
+
+    :param radian: The radian value(s) to be converted.
+    :return: The degree value(s) corresponding to the radian value(s).
+    '''
+    return np.multiply(radian, 180/np.pi)
+
+#################### Mean Motion ####################
+
+def rev_per_day_to_radian_per_second(mean_motion=None):
+    '''This function converts a mean motion in revolutions per day, as it is given in a TLE, into radians per second using
+    the equation [(2π)n]/86400. The input can be a scalar or a NumPy array of any shape.
+
+    :param mean_motion: The mean motion(s) (rev/day).
+    :return: The mean motion(s) (rad/s).
+    '''
+    return np.multiply(mean_motion, 2*np.pi/SECONDS_PER_DAY)
+
+def radian_per_second_to_rev_per_day(mean_motion=None):
+    '''This function converts a mean motion in radians per second into revolutions per day. The input can be a scalar or a
+    NumPy array of any shape.
+
+    :param mean_motion: The mean motion(s) (rad/s).
+    :return: The mean motion(s) (rev/day).
+    '''
+    return np.multiply(mean_motion, SECONDS_PER_DAY/(2*np.pi))
+
+#################### Distances ####################
+
+def km_to_m(km=None):
+    '''This function converts kilometers into meters. The input can be a scalar or a NumPy array of any shape.
+
+    :param km: The distance(s) (km).
+    :return: The distance(s) (m).
+    '''
+    return np.multiply(km, 1000.0)
+
+def m_to_km(m=None):
+    '''This function converts meters into kilometers. The input can be a scalar or a NumPy array of any shape.
+
+    :param m: The distance(s) (m).
+    :return: The distance(s) (km).
+    '''
+    return np.divide(m, 1000.0)
+
+#################### Epochs ####################
+
+def full_epoch_year(epoch_year=None):
+    '''This function converts the two digit epoch years of the TLE format into full years. Years 70-99 are in the 1900s and
+    years 00-69 are in the 2000s. The input can be a scalar or a NumPy array of any shape.
+
+    :param epoch_year: The two digit epoch year(s).
+    :return: The full epoch year(s).
+    '''
+    epoch_year = np.asarray(epoch_year)
+    return np.where(epoch_year < 70, 2000 + epoch_year, 1900 + epoch_year)[()]
+
+def epoch_to_datetime64(epoch_year=None, epoch=None) -> np.ndarray:
+    '''This function converts the epoch of a TLE, given as the full year and the (fractional) day of the year starting at 1.0,
+    into a NumPy datetime64[ns]. Whole columns of epochs can be converted at once, without creating a datetime object for each
+    TLE.
+
+    :param epoch_year: The full epoch year(s).
+    :param epoch: The epoch day(s) of the year.
+    :return: The epoch(s), as datetime64[ns] values.
+    '''
+    years = (np.asarray(epoch_year, dtype=np.int64) - 1970).astype('datetime64[Y]').astype('datetime64[ns]')
+    return (years + np.round((np.asarray(epoch, dtype=np.float64) - 1) * 86400e9).astype('timedelta64[ns]'))[()]
+
+def datetime64_to_epoch(times=None) -> tuple:
+    '''This function converts NumPy datetime64 values into the TLE epoch format, which is the full year and the (fractional)
+    day of the year starting at 1.0. It is the inverse of the epoch_to_datetime64() function.
+
+    :param times: The datetime64 value(s).
+    :return: The full epoch year(s) and the epoch day(s) of the year.
+    '''
+    times = np.asarray(times, dtype='datetime64[ns]')
+    years = times.astype('datetime64[Y]')
+    epoch = (times - years.astype('datetime64[ns]')) / np.timedelta64(1, 'D') + 1
+    return (years.astype(np.int64) + 1970)[()], epoch[()]
+
+def datetime64_to_julian(times=None):
+    '''This function converts NumPy datetime64 values (UTC) into Julian dates, the continuous count of days since noon on
+    January 1, 4713 BC that astronomical formulas are written in. The input can be a scalar or an array of any shape.
+
+    :param times: The datetime64 value(s).
+    :return: The Julian date(s), as float64 values.
+    '''
+    times = np.asarray(times, dtype='datetime64[ns]')
+    return ((times - np.datetime64('2000-01-01T12:00', 'ns')) / np.timedelta64(1, 'D') + 2451545.0)[()]
+
+def julian_to_datetime64(julian=None) -> np.ndarray:
+    '''This function converts Julian dates into NumPy datetime64[ns] values (UTC). It is the inverse of the datetime64_to_julian()
+    function, to the precision of a float64 Julian date (about 40 microseconds).
+
+    :param julian: The Julian date(s).
+    :return: The datetime64[ns] value(s).
+    '''
+    days = np.asarray(julian, dtype=np.float64) - 2451545.0
+    return (np.datetime64('2000-01-01T12:00', 'ns') + np.round(days * 86400e9).astype('timedelta64[ns]'))[()]
+
+def epoch_to_julian(epoch_year=None, epoch=None):
+    '''This function converts the epoch of a TLE, given as the full year and the (fractional) day of the year starting at 1.0,
+    directly into a Julian date. The Julian date of day 0.0 of each year is found with the Gregorian calendar rules, so whole
+    columns of epochs are converted with a few array operations.
+
+    :param epoch_year: The full epoch year(s).
+    :param epoch: The epoch day(s) of the year.
+    :return: The Julian date(s), as float64 values.
+    '''
+    previous = np.asarray(epoch_year, dtype=np.int64) - 1
+    year_start = 1721424.5 + (365*previous + previous//4 - previous//100 + previous//400)
+    return (year_start + np.asarray(epoch, dtype=np.float64))[()]
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    '''This class is an HTTPServer that handles each connection on a thread of its own (http.server.ThreadingHTTPServer is
+    only available from Python 3.7).'''
+    daemon_threads = True
+
+class StandInServer(object):
+    '''This class is a local stand-in for the CelesTrak catalog server, for testing the ingestion module without a network. It
+    serves the catalog groups held in (groups) at the same paths as CelesTrak (/NORAD/elements/gp.php?GROUP=name&FORMAT=tle),
+    over HTTP/1.1 keep-alive connections, and answers conditional requests with 304 (Not Modified) while a group is unchanged.
+    The connections and requests it receives are counted, so tests can check that connections are reused.
+
+    Example:
+
+        with StandInServer({'stations': catalog}) as server:
+            fetcher = CatalogFetcher(url=server.url)
+    '''
+
+    def __init__(self, groups:dict=None):
+        self.groups = {}
+        self.validators = {}
+        self.lock = threading.Lock()
+        self.connections = self.requests = self.not_modified = 0
+        for group, body in (groups or {}).items():
+            self.update(group, body)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler())
+        self.thread = None
+        return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        '''The URL template of the groups of the server, for the (url) parameter of the CatalogFetcher.'''
+        return f'http://127.0.0.1:{self.server.server_address[1]}/NORAD/elements/gp.php?GROUP={{group}}&FORMAT=tle'
+
+    def update(self, group:str=None, body:bytes=None):
+        '''This method sets the catalog of a group, with a new ETag and Last-Modified date.'''
+        with self.lock:
+            revision = self.validators.get(group, (None, 0.0))[1] + 1
+            self.groups[group] = body
+            self.validators[group] = ('"' + hashlib.sha1(body).hexdigest() + f'-{revision}"', 1.6e9 + revision)
+        return
+
+    def start(self):
+        '''This method starts serving on a background thread.'''
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return
+
+    def stop(self):
+        '''This method stops the server and closes its socket.'''
+        self.server.shutdown()
+        self.server.server_close()
+        return
+
+    def handler(self):
+        '''This method builds the request handler class of the server, bound to this StandInServer.'''
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                with stand_in.lock:
+                    stand_in.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                return
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                group = parse_qs(parts.query).get('GROUP', [None])[0]
+                with stand_in.lock:
+                    stand_in.requests += 1
+                    body = stand_in.groups.get(group)
+                    etag, modified = stand_in.validators.get(group, (None, None))
+                if parts.path != '/NORAD/elements/gp.php' or body is None:
+                    self.respond(404, b'No GP data found', {})
+                    return
+                headers = {'ETag': etag, 'Last-Modified': formatdate(modified, usegmt=True)}
+                since = self.headers.get('If-Modified-Since')
+                if self.headers.get('If-None-Match') == etag or (self.headers.get('If-None-Match') is None and since is not None and parsedate_to_datetime(since).timestamp() >= modified):
+                    with stand_in.lock:
+                        stand_in.not_modified += 1
+                    self.respond(304, b'', headers)
+                    return
+                self.respond(200, body, headers)
+
+            def respond(self, status, body, headers):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header('Content-Type', 'text/plain')
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+        return Handler
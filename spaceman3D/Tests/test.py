@@ -1,5 +1,19 @@
+import io
 import unittest
-from spaceman3D.Orbit import TLE, satellites
+import numpy as np
+from spaceman3D.Orbit import TLE, Orbital, ElementSet, Propagator, SGP4, satellites, solve_kepler, true_anomaly_from_eccentric
+from spaceman3D.Orbit.sgp4 import ERROR_NONE, ERROR_DECAYED
+from spaceman3D.Orbit import units
+from spaceman3D.Orbit.conjunction import ConjunctionScreen, apsis_buckets, apsis_filter, plane_filter, grid_pairs
+from spaceman3D.Orbit.elements import read_keys, validate_bytes, TLE_ERROR_LINE_NUMBER, TLE_ERROR_SATELLITE_NUMBER, TLE_ERROR_CHECKSUM_LINE1, TLE_ERROR_CHECKSUM_LINE2, TLE_ERROR_MISSING_LINE
+from spaceman3D.Orbit.archive import ElementArchive
+from spaceman3D.Orbit.history import ElementHistory
+from spaceman3D.Orbit.catalog import Catalog
+from spaceman3D.Orbit.ingest import CatalogFetcher
+from spaceman3D.Tests.server import StandInServer
+from spaceman3D.Orbit.passes import PassPredictor, look_angles
+from spaceman3D.Orbit.groundtrack import gmst, eci_to_ecef, ecef_to_geodetic, geodetic_to_ecef, ground_track
+from spaceman3D.Orbit.astronomical_objects import objects
 
 class setup_tests:
 
@@ -47,6 +61,15 @@ class setup_tests:
 
         return wrong_chksum, wrong_satnum, wrong_linenum
 
+    def setup_catalog(self) -> str:
+        ''' We use this method to setup a small catalog of Two-Line Elements (TLE) from the example satellites. The catalog
+        mixes the 3-line format, the 2-line format, and the "0 " prefixed titles used by Space-Track.
+
+        :return: The catalog as a multi-line string.
+        '''
+        two_line = '\n'.join(satellites.ISS.split('\n')[1:])
+        return '\n'.join([satellites.Dragon, two_line, '0 ' + satellites.chinasat, satellites.Dragon_Demo]) + '\n'
+
 class TestSpaceman(unittest.TestCase):
 
 ################ TLE().parse_tle() #################
@@ -337,5 +360,995 @@ class TestSpaceman(unittest.TestCase):
         with self.assertRaises(AssertionError):
             TLE().scientific_notation_conversion(element='00000001-1')
 
+################ TLE().tle_record() #################
+    #40
+    def test_tle_record_elements(self):
+        '''This test is for the TLE().tle_record() method and checks that the elements of the parsed record match the values
+        returned by the individual element methods.'''
+        record = TLE().tle_record(satellites.ISS)
+        self.assertEqual(record.title, 'ISS (ZARYA)')
+        self.assertEqual(record.satellite_number, 25544)
+        self.assertEqual(record.inclination, 51.6416)
+        self.assertEqual(record.eccentricity, 0.0006703)
+        self.assertEqual(record.mean_motion, 15.72125391)
+        self.assertEqual(record.bstar_drag_term, TLE().bstar_drag_term(satellites.ISS))
+        self.assertEqual(record.epoch_date, TLE().epoch_date(satellites.ISS))
+    #41
+    def test_tle_record_immutable(self):
+        '''This test is for the TLE().tle_record() method and checks that the record that is returned cannot be modified.'''
+        record = TLE().tle_record(satellites.ISS)
+        with self.assertRaises(AttributeError):
+            record.inclination = 0.0
+        with self.assertRaises(AttributeError):
+            record.extra_element = 0.0
+    #42
+    def test_tle_record_invalid(self):
+        '''This test is for the TLE().tle_record() method and checks that the AssertionError is raised when
+        a TLE that fails the validity checks is passed in to the (tle) parameter of the method.'''
+        for tle in setup_tests().setup_wrong_tle():
+            with self.assertRaises(AssertionError):
+                TLE().tle_record(tle)
+    #43
+    def test_tle_record_passthrough(self):
+        '''This test is for the TLE().tle_record() method and checks that a record passed in is returned unchanged, and that
+        the element methods accept a record in place of the TLE string, that records with different titles are not equal, and
+        that the cache of records can be cleared.'''
+        record = TLE().tle_record(satellites.Dragon)
+        self.assertIs(TLE().tle_record(record), record)
+        self.assertEqual(TLE().mean_anomaly(record), TLE().mean_anomaly(satellites.Dragon))
+        renamed = TLE().tle_record('DRAGON' + satellites.Dragon[satellites.Dragon.index('\n'):])
+        self.assertEqual(renamed.title, 'DRAGON')
+        self.assertNotEqual(renamed, record)
+        self.assertEqual(TLE().tle_record(satellites.Dragon), record)
+        TLE().clear_record_cache()
+        self.assertIsNot(TLE().tle_record(satellites.Dragon), record)
+
+################ TLE().read_catalog() #################
+    #44
+    def test_read_catalog_formats(self):
+        '''This test is for the TLE().read_catalog() method and checks that a catalog mixing the 3-line and 2-line formats
+        is read into records, in order.'''
+        catalog = io.StringIO(setup_tests().setup_catalog())
+        records = list(TLE().read_catalog(catalog))
+        self.assertEqual([record.satellite_number for record in records], [39115, 25544, 43920, 44063])
+        self.assertEqual([record.title for record in records], ['DRAGON CRS-2', '', 'CHINASAT 2D', 'CREW DRAGON DEMO-1'])
+    #45
+    def test_read_catalog_bad_records(self):
+        '''This test is for the TLE().read_catalog() method and checks that bad records, including truncated ones, are reported
+        without aborting the read of the rest of the catalog, and that a title starting with "1 " is read as a title.'''
+        wrong_chksum, wrong_satnum, wrong_linenum = setup_tests().setup_wrong_tle()
+        reported = []
+        catalog = io.BytesIO('\n'.join([wrong_chksum, satellites.ISS, wrong_satnum, satellites.Dragon]).encode('ascii'))
+        reader = TLE().read_catalog(catalog, on_error=reported.append)
+        records = list(reader)
+        self.assertEqual([record.satellite_number for record in records], [25544, 39115])
+        self.assertEqual(len(reader.errors), 2)
+        self.assertEqual(reader.errors, reported)
+        self.assertEqual(reader.errors[0].line_number, 1)
+        catalog.seek(0)
+        self.assertEqual(len(list(reader)), 2)
+        self.assertEqual((len(reader.errors), reader.error_count), (2, 2))
+        catalog.seek(0)
+        capped = TLE().read_catalog(catalog, max_errors=1)
+        list(capped)
+        self.assertEqual((len(capped.errors), capped.error_count), (1, 2))
+        title, line1, line2 = satellites.ISS.split('\n')
+        orphan = io.StringIO('\n'.join(['ORPHAN', line1, line1, line2]))
+        records = list(TLE().read_catalog(orphan))
+        self.assertEqual([record.title for record in records], [''])
+        catalog = io.StringIO('\n'.join(['1 HTS', line1, line2, 'TRUNCATED', line1[:40], line2, satellites.Dragon]))
+        reader = TLE().read_catalog(catalog)
+        self.assertEqual([record.title for record in reader], ['1 HTS', 'DRAGON CRS-2'])
+        self.assertEqual([(error.line_number, error.lines[0]) for error in reader.errors], [(4, 'TRUNCATED')])
+    #46
+    def test_read_catalog_chunks(self):
+        '''This test is for the TLE().read_catalog() method and checks that the chunked mode yields lists of at most
+        (chunk_size) records.'''
+        catalog = io.StringIO('\n'.join([satellites.Dragon, satellites.ISS, satellites.Dragon_Demo, satellites.chinasat]))
+        chunks = list(TLE().read_catalog(catalog).chunks(3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+
+################ ElementSet.from_bytes() #################
+    #47
+    def test_element_set_from_bytes(self):
+        '''This test is for the ElementSet.from_bytes() method and checks that the vectorized parser returns the same elements
+        as the TLERecords parsed from the same catalog, and that read_keys() reads the same keys.'''
+        catalog = setup_tests().setup_catalog()
+        element_set = ElementSet.from_bytes(catalog.replace('\n', '\r\n').encode('ascii'))
+        records = ElementSet.from_records(TLE().read_catalog(io.StringIO(catalog)))
+        self.assertEqual(len(element_set), 4)
+        self.assertEqual(list(element_set.titles), ['DRAGON CRS-2', '', 'CHINASAT 2D', 'CREW DRAGON DEMO-1'])
+        for name in element_set.data.dtype.names:
+            self.assertTrue(np.allclose(element_set[name], records[name], rtol=1e-12, atol=0), name)
+        keys, lines = read_keys(catalog.encode('ascii'))
+        self.assertEqual(keys['satellite_number'].tolist(), element_set['satellite_number'].tolist())
+        self.assertTrue(np.array_equal(keys['epoch'], element_set.epoch_datetime64()))
+        self.assertEqual(len(lines.line1), 4)
+    #48
+    def test_element_set_empty(self):
+        '''This test is for the ElementSet.from_bytes() method and checks that a catalog without any TLEs returns an
+        empty ElementSet.'''
+        self.assertEqual(len(ElementSet.from_bytes(b'')), 0)
+        self.assertEqual(len(ElementSet.from_bytes(b'ISS (ZARYA)\n')), 0)
+    #49
+    def test_element_set_to_dataframe(self):
+        '''This test is for the ElementSet().to_dataframe() method and checks that the columns of the DataFrame are views onto
+        the element data.'''
+        element_set = ElementSet.from_bytes(setup_tests().setup_catalog().encode('ascii'))
+        df = element_set.to_dataframe(titles=True)
+        self.assertEqual(len(df), 4)
+        self.assertEqual(df['title'][0], 'DRAGON CRS-2')
+        self.assertTrue(np.shares_memory(df['inclination'].to_numpy(), element_set.data))
+
+################ solve_kepler() #################
+    #50
+    def test_solve_kepler_broadcast(self):
+        '''This test is for the solve_kepler() function and checks that a grid of satellites by timesteps is solved to within
+        the tolerance, including highly eccentric orbits and mean anomalies past a whole revolution.'''
+        mean_anomaly = np.linspace(-10, 10, 41)[None, :]
+        eccentricity = np.array([0.0, 0.0006703, 0.5, 0.9, 0.999])[:, None]
+        eccentric_anomaly = solve_kepler(mean_anomaly, eccentricity, tolerance=1e-13)
+        self.assertEqual(eccentric_anomaly.shape, (5, 41))
+        residual = eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly) - mean_anomaly
+        self.assertLess(np.abs(residual).max(), 1e-12)
+    #51
+    def test_solve_kepler_scalar(self):
+        '''This test is for the solve_kepler() function and the Orbital().eccentric_anomoly_calculation() method, and checks
+        that scalar inputs return a single converged value.'''
+        eccentric_anomaly = Orbital().eccentric_anomoly_calculation(mean_anomaly=1.0, eccentricity=0.9, max_accuracy=1e-12)
+        self.assertIsInstance(float(eccentric_anomaly), float)
+        self.assertAlmostEqual(eccentric_anomaly - 0.9 * np.sin(eccentric_anomaly), 1.0, places=12)
+        self.assertAlmostEqual(solve_kepler(np.pi, 0.5), np.pi, places=12)
+    #52
+    def test_solve_kepler_eccentricity(self):
+        '''This test is for the solve_kepler() function and checks that the AssertionError is raised when an eccentricity
+        outside of the range [0, 1) is passed in to the (eccentricity) parameter of the function.'''
+        with self.assertRaises(AssertionError):
+            solve_kepler(1.0, 1.0)
+        with self.assertRaises(AssertionError):
+            solve_kepler(1.0, np.array([0.1, -0.1]))
+    #53
+    def test_true_anomaly_from_eccentric(self):
+        '''This test is for the true_anomaly_from_eccentric() function and checks that calculation for the function is correct.'''
+        self.assertAlmostEqual(true_anomaly_from_eccentric(np.pi/2, 0.5), 2*np.pi/3, places=12)
+        self.assertTrue(np.allclose(true_anomaly_from_eccentric(np.array([0.0, 1.0]), 0.0), [0.0, 1.0]))
+        self.assertTrue(np.allclose(true_anomaly_from_eccentric(np.array([np.pi, 3.5, 2*np.pi + 1.0]), 0.0), [np.pi, 3.5 - 2*np.pi, 1.0]))
+
+################ Propagator().propagate() #################
+    #54
+    def test_propagate_shape(self):
+        '''This test is for the Propagator().propagate() method and checks that N satellites at M times return (N, M, 3)
+        positions and velocities, for both absolute times and seconds since epoch.'''
+        propagator = Propagator([satellites.ISS, satellites.Dragon, satellites.chinasat])
+        positions, velocities = propagator.propagate(np.arange(0, 600, 60), since_epoch=True)
+        self.assertEqual(positions.shape, (3, 10, 3))
+        self.assertEqual(velocities.shape, (3, 10, 3))
+        times = np.arange('2019-03-04T00:00', '2019-03-04T01:00', 10, dtype='datetime64[m]')
+        self.assertEqual(propagator.propagate(times, velocity=False).shape, (3, 6, 3))
+    #55
+    def test_propagate_orbit_invariants(self):
+        '''This test is for the Propagator().propagate() method and checks that the propagated states keep the orbital energy,
+        inclination, and right ascension of the ascending node of each element set.'''
+        element_set = ElementSet.from_bytes(setup_tests().setup_catalog().encode('ascii'))
+        propagator = Propagator(element_set)
+        positions, velocities = propagator.propagate(np.linspace(0, 86400, 25), since_epoch=True)
+        mu = objects['Earth']['standard_gravitational_parameter']
+        energy = (velocities**2).sum(axis=-1)/2 - mu/np.linalg.norm(positions, axis=-1)
+        self.assertTrue(np.allclose(energy, -mu/(2*propagator.semi_major_axis[:, None])))
+        h = np.cross(positions, velocities)
+        inclination = np.degrees(np.arccos(h[..., 2]/np.linalg.norm(h, axis=-1)))
+        right_ascension = np.degrees(np.arctan2(h[..., 0], -h[..., 1])) % 360
+        self.assertTrue(np.allclose(inclination, element_set['inclination'][:, None]))
+        self.assertTrue(np.allclose(right_ascension, element_set['right_ascension'][:, None]))
+    #56
+    def test_propagate_period(self):
+        '''This test is for the Propagator().propagate() method and checks that a satellite returns to the same position after
+        a full orbital period.'''
+        propagator = Propagator(satellites.ISS)
+        period = 2*np.pi/propagator.mean_motion[0]
+        positions = propagator.propagate(np.array([0, period]), since_epoch=True, velocity=False)
+        self.assertTrue(np.allclose(positions[0, 0], positions[0, 1], atol=1e-6))
+
+################ SGP4().propagate() #################
+    #57
+    def test_sgp4_near_earth(self):
+        '''This test is for the SGP4().propagate() method and checks the near-earth (SGP4) positions and velocities of the ISS
+        against the values of the reference implementation.'''
+        sgp4 = SGP4(ElementSet.from_bytes(satellites.ISS.encode('ascii')))
+        positions, velocities, errors = sgp4.propagate(np.array([0.0, 360.0, 4320.0]))
+        self.assertTrue(np.all(errors == ERROR_NONE))
+        self.assertTrue(np.allclose(positions[0], [[4083.902463520656, -993.6319996058096, 5243.603665370765],
+                                                   [2748.401544598741, -3564.8924045783733, 4992.448308873714],
+                                                   [4805.492242225285, 4530.664635381158, 1272.9769168256034]], rtol=0, atol=1e-6))
+        self.assertTrue(np.allclose(velocities[0], [[2.512837295156162, 7.259888524980963, -0.5837785365057586],
+                                                    [4.342862050164389, 6.063045163748943, 1.9277717102596412],
+                                                    [-2.5095489904526733, 4.323312814604382, -5.862404343114451]], rtol=0, atol=1e-9))
+    #58
+    def test_sgp4_deep_space(self):
+        '''This test is for the SGP4().propagate() method and checks the deep-space (SDP4) positions and velocities of a
+        geosynchronous satellite against the values of the reference implementation, which includes the 24 hour resonance.'''
+        sgp4 = SGP4(ElementSet.from_bytes(satellites.chinasat.encode('ascii')))
+        self.assertEqual(list(sgp4.deep), [0])
+        positions, velocities, errors = sgp4.propagate(np.array([0.0, 360.0, 4320.0]))
+        self.assertTrue(np.all(errors == ERROR_NONE))
+        self.assertTrue(np.allclose(positions[0], [[-19134.954297745167, -37575.0048619249, 11.725569955426995],
+                                                   [37652.17873415772, -18967.21111386947, 5.794880909459882],
+                                                   [-17172.213976614315, -38511.81878198216, 8.865615211576632]], rtol=0, atol=1e-6))
+        self.assertTrue(np.allclose(velocities[0, 2], [2.808150151455207, -1.251796636178205, 0.00022076769167180823], rtol=0, atol=1e-9))
+    #59
+    def test_sgp4_decayed(self):
+        '''This test is for the SGP4().propagate() method and checks that a satellite that has re-entered is flagged with the
+        ERROR_DECAYED code, while the other satellites propagated with it are not.'''
+        propagator = Propagator([satellites.ISS, satellites.Dragon_Demo], backend='sgp4')
+        positions, velocities, errors = propagator.sgp4.propagate(np.array([0.0, 4320.0]))
+        self.assertTrue(np.all(errors[0] == ERROR_NONE))
+        self.assertEqual(list(errors[1]), [ERROR_NONE, ERROR_DECAYED])
+    #60
+    def test_propagate_backend(self):
+        '''This test is for the Propagator() class and checks that the sgp4 backend returns the same shapes as the kepler backend,
+        and that the backend and body parameters are validated.'''
+        elements = [satellites.ISS, satellites.Dragon, satellites.chinasat]
+        kepler = Propagator(elements).propagate(np.arange(0, 600, 60), since_epoch=True, velocity=False)
+        positions = Propagator(elements, backend='sgp4').propagate(np.arange(0, 600, 60), since_epoch=True, velocity=False)
+        self.assertEqual(positions.shape, kepler.shape)
+        self.assertTrue(np.all(np.linalg.norm(positions - kepler, axis=-1) < 100))
+        with self.assertRaises(AssertionError):
+            Propagator(elements, backend='sgp8')
+        with self.assertRaises(AssertionError):
+            Propagator(elements, body='Moon', backend='sgp4')
+
+################ Orbital().anomoly_calc() #################
+    #61
+    def test_anomoly_calc_pure(self):
+        '''This test is for the Orbital().anomoly_calc() method and checks that calling it does not modify the satellite, so
+        repeated calls with the same time return the same true anomaly.'''
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        time = np.datetime64('2019-03-04T12:00')
+        first = o.anomoly_calc(time)
+        self.assertEqual(o.mean_anomaly, 325.0288)
+        self.assertEqual(o.anomoly_calc(time), first)
+    #62
+    def test_anomoly_calc_epoch(self):
+        '''This test is for the Orbital().time_adjusted_mean_anomaly_calc() and Orbital().anomoly_calc() methods, and checks the
+        anomalies at the epoch and one orbital period after it, for both datetimes and seconds since the epoch.'''
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        self.assertAlmostEqual(o.time_adjusted_mean_anomaly_calc(o.epoch_date), 325.0288, places=9)
+        self.assertAlmostEqual(o.time_adjusted_mean_anomaly_calc(o.period_calc(), since_epoch=True), 325.0288, places=6)
+        eccentric_anomaly = solve_kepler(np.radians(325.0288), o.eccentricity)
+        true_anomaly = np.degrees(true_anomaly_from_eccentric(eccentric_anomaly, o.eccentricity))
+        self.assertAlmostEqual(o.anomoly_calc(0.0, since_epoch=True), true_anomaly, places=9)
+        # Without (times), the anomaly is calculated at the current UTC time, as in the epoch_time_diff() method.
+        self.assertTrue(-180 < o.anomoly_calc() <= 180)
+        self.assertGreater(o.seconds_since_epoch(), o.epoch_time_diff(np.datetime64('2019-01-01')))
+        with self.assertRaises(ValueError):
+            o.anomoly_calc(since_epoch=True)
+    #63
+    def test_orbital_propagate_times(self):
+        '''This test is for the Orbital().propagate() method and checks that a datetime64 range returns one state per time,
+        matching the batch Propagator for the same satellite.'''
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        times = np.arange('2019-03-04T00:00', '2019-03-04T01:00', 10, dtype='datetime64[m]')
+        positions, velocities = o.propagate(times)
+        self.assertEqual(positions.shape, (6, 3))
+        expected_positions, expected_velocities = Propagator(satellites.ISS).propagate(times)
+        self.assertTrue(np.allclose(positions, expected_positions[0], rtol=0, atol=1e-6))
+        self.assertTrue(np.allclose(velocities, expected_velocities[0], rtol=0, atol=1e-9))
+
+################ Orbital().cached() #################
+    #64
+    def test_orbital_derived_cache(self):
+        '''This test is for the Orbital().cached() method and checks that the derived quantities are only computed once, and
+        are kept per celestial body.'''
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        orientation = o.orientation_matrix_calc()
+        self.assertIs(o.orientation_matrix_calc(), orientation)
+        self.assertNotEqual(o.semi_major_axis_calc(body='Earth'), o.semi_major_axis_calc(body='Mars'))
+        self.assertIn(('semi_major_axis', 'Earth'), o.derived)
+        self.assertIn(('semi_major_axis', 'Mars'), o.derived)
+    #65
+    def test_orbital_derived_invalidation(self):
+        '''This test is for the Orbital() class and checks that setting an element clears the cached quantities derived from it,
+        while setting the mean anomaly does not.'''
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        period = o.period_calc()
+        o.mean_anomaly = 0.0
+        self.assertIn('period', o.derived)
+        o.mean_motion = o.mean_motion / 2
+        self.assertEqual(o.derived, {})
+        self.assertAlmostEqual(o.period_calc(), 2*period, places=9)
+    #66
+    def test_orbital_perigee_apogee(self):
+        '''This test is for the Orbital().perigee_radius_calc() and Orbital().apogee_radius_calc() methods and checks that
+        they bound the semi-major axis by the eccentricity.'''
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        a = o.semi_major_axis_calc()
+        self.assertAlmostEqual(o.perigee_radius_calc(), a*(1 - 0.0006703), places=9)
+        self.assertAlmostEqual(o.apogee_radius_calc(), a*(1 + 0.0006703), places=9)
+        self.assertAlmostEqual(o.perigee_radius_calc() + o.apogee_radius_calc(), 2*a, places=9)
+
+################ units #################
+    #67
+    def test_units_angles_arrays(self):
+        '''This test is for the angle and mean motion conversions of the units module and checks that they accept NumPy
+        scalars and arrays, and that each conversion is the inverse of the other.'''
+        degrees = np.array([0.0, 90.0, 180.0, 360.0])
+        self.assertTrue(np.allclose(units.degree_to_radian(degrees), [0, np.pi/2, np.pi, 2*np.pi]))
+        self.assertTrue(np.allclose(units.radian_to_degree(units.degree_to_radian(degrees)), degrees))
+        self.assertAlmostEqual(Orbital().degree_to_radian(np.float32(180.0)), np.pi, places=6)
+        self.assertAlmostEqual(units.rev_per_day_to_radian_per_second(1.0), 2*np.pi/86400, places=15)
+        self.assertAlmostEqual(units.radian_per_second_to_rev_per_day(units.rev_per_day_to_radian_per_second(15.72125391)), 15.72125391, places=12)
+    #68
+    def test_units_distances(self):
+        '''This test is for the km_to_m() and m_to_km() functions of the units module and checks the calculation is correct.'''
+        self.assertTrue(np.array_equal(units.km_to_m(np.array([1.0, 6378.135])), [1000.0, 6378135.0]))
+        self.assertEqual(units.m_to_km(500.0), 0.5)
+    #69
+    def test_units_epochs(self):
+        '''This test is for the epoch conversions of the units module and checks a column of TLE epochs converts into datetime64
+        values and back.'''
+        self.assertTrue(np.array_equal(units.full_epoch_year(np.array([8, 69, 70, 99])), [2008, 2069, 1970, 1999]))
+        times = units.epoch_to_datetime64(np.array([2008, 2019]), np.array([264.51782528, 1.5]))
+        self.assertEqual(times[1], np.datetime64('2019-01-01T12:00'))
+        self.assertEqual(times[0], np.datetime64(TLE().epoch_date(satellites.ISS).replace(tzinfo=None), 'ns'))
+        years, epochs = units.datetime64_to_epoch(times)
+        self.assertTrue(np.array_equal(years, [2008, 2019]))
+        self.assertTrue(np.allclose(epochs, [264.51782528, 1.5], rtol=0, atol=1e-9))
+
+################ Propagator().propagate(workers) #################
+    #70
+    def test_propagate_workers(self):
+        '''This test is for the process pool mode of the Propagator().propagate() method and checks that splitting the
+        satellites across worker processes returns exactly the same states as propagating them in the current process.'''
+        element_set = ElementSet.from_bytes(setup_tests().setup_catalog().encode('ascii'))
+        times = np.arange('2019-03-04T00:00', '2019-03-04T06:00', 15, dtype='datetime64[m]')
+        for backend in Propagator.backends:
+            propagator = Propagator(element_set, backend=backend)
+            positions, velocities = propagator.propagate(times)
+            parallel_positions, parallel_velocities = propagator.propagate(times, workers=2)
+            self.assertTrue(np.array_equal(positions, parallel_positions, equal_nan=True))
+            self.assertTrue(np.array_equal(velocities, parallel_velocities, equal_nan=True))
+        seconds = np.arange(0, 3600, 60.0)
+        self.assertTrue(np.array_equal(propagator.propagate(seconds, since_epoch=True, velocity=False, workers=3),
+                                       propagator.propagate(seconds, since_epoch=True, velocity=False), equal_nan=True))
+        import sys
+        from unittest import mock
+        from spaceman3D.Orbit.shared import shared_block, MappedFile
+        # Without the multiprocessing.shared_memory module (Python 3.6 and 3.7), the blocks are memory mapped temporary files.
+        with mock.patch.dict(sys.modules, {'multiprocessing.shared_memory': None}):
+            block = shared_block(create=True, size=16)
+            self.assertIsInstance(block, MappedFile)
+            block.close()
+            block.unlink()
+            self.assertTrue(np.array_equal(propagator.propagate(seconds, since_epoch=True, velocity=False, workers=2),
+                                           propagator.propagate(seconds, since_epoch=True, velocity=False), equal_nan=True))
+    #71
+    def test_propagate_workers_invalid(self):
+        '''This test is for the Propagator().propagate() method and checks that the (workers) parameter must be a positive
+        integer.'''
+        propagator = Propagator(satellites.ISS)
+        with self.assertRaises(AssertionError):
+            propagator.propagate(np.arange(0, 600, 60), since_epoch=True, workers=0)
+        with self.assertRaises(AssertionError):
+            propagator.propagate(np.arange(0, 600, 60), since_epoch=True, workers=2.0)
+        from spaceman3D.Orbit.propagator import _propagate_shard
+        from spaceman3D.Orbit.shared import shared_array, release_blocks
+        blocks, descriptions = zip(*(shared_array(array) for array in (propagator.elements.data, np.zeros((1, 3)), np.zeros((1, 3, 3)))))
+        try:
+            # An exception of a worker is raised as is, rather than being replaced by a failure to close its blocks.
+            with self.assertRaises(AssertionError):
+                _propagate_shard((0, 1, descriptions[0], descriptions[1], descriptions[2:], dict(body='Pluto2', backend='kepler')))
+        finally:
+            release_blocks(blocks, unlink=True)
+
+################ Draw().animate() #################
+    #72
+    def test_animate_frames(self):
+        '''This test is for the Draw().animate() method and checks that the static artists are drawn once, with the orbits as a
+        single collection, and that each frame only moves the single marker artist to the propagated positions of the satellites.'''
+        from spaceman3D.Draw import Draw
+        d = Draw()
+        elements = [satellites.ISS, satellites.Dragon, satellites.chinasat]
+        times = np.arange(0, 3600, 300.0)
+        d.animate(elements, times, since_epoch=True, show=False)
+        d.fig.canvas.draw()
+        artists = len(d.ax.lines)
+        self.assertIn(d.orbits, d.ax.collections)
+        self.assertEqual(len(d.orbits.get_segments()), 3)
+        positions = Propagator(elements).propagate(times, since_epoch=True, velocity=False)
+        for frame in (0, 5, 11):
+            d.animation_frame(frame)
+            x, y, z = d.markers.get_data_3d()
+            self.assertTrue(np.allclose(np.column_stack((x, y, z)), positions[:, frame]))
+        self.assertEqual(len(d.ax.lines), artists)
+    #73
+    def test_orbit_paths(self):
+        '''This test is for the Draw().orbit_paths() method and checks that the propagated positions lie on the sampled orbit
+        of each satellite.'''
+        from spaceman3D.Draw import Draw
+        propagator = Propagator([satellites.ISS, satellites.chinasat])
+        paths = Draw().orbit_paths(propagator, samples=3600)
+        self.assertEqual(paths.shape, (2, 3600, 3))
+        positions = propagator.propagate(np.array([0.0, 1000.0]), since_epoch=True, velocity=False)
+        distance = np.linalg.norm(paths[:, None, :, :] - positions[:, :, None, :], axis=-1).min(axis=-1)
+        self.assertTrue(np.all(distance / np.linalg.norm(positions, axis=-1) < 1e-3))
+
+################ Lazy imports #################
+    #74
+    def test_lazy_imports(self):
+        '''This test checks that importing the Orbit and Draw packages does not load matplotlib or pandas, which are only
+        imported the first time they are used.'''
+        import subprocess, sys
+        code = 'import sys, spaceman3D.Orbit, spaceman3D.Draw; print(*[name in sys.modules for name in ("matplotlib", "pandas")])'
+        output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+        self.assertEqual(output, ['False', 'False'])
+    #75
+    def test_draw_lazy_figure(self):
+        '''This test is for the Draw() class and checks that a figure is only created when a Draw instance first uses it, and
+        that each instance gets its own figure, drawn in the dark background style without restyling the other figures.'''
+        from spaceman3D.Draw import Draw
+        from spaceman3D.Draw.draw import pyplot
+        facecolor = pyplot().rcParams['figure.facecolor']
+        d, other = Draw(), Draw()
+        self.assertIsNone(d._fig)
+        self.assertEqual(d.ax.name, '3d')
+        self.assertIs(d.ax.figure, d.fig)
+        self.assertIsNot(other.fig, d.fig)
+        d.draw_catalog(satellites.ISS, time=np.datetime64('2008-09-20T12:00'), show=False)
+        self.assertEqual(pyplot().rcParams['figure.facecolor'], facecolor)
+        self.assertEqual(d.ax.texts[-1].get_color(), 'white')
+
+################ Draw().draw_catalog() #################
+    #76
+    def test_draw_catalog_collections(self):
+        '''This test is for the Draw().draw_catalog() method and checks that a large catalog is drawn with a single scatter
+        collection and a single line collection, with the number of labels limited by (max_labels).'''
+        from spaceman3D.Draw import Draw
+        sample = ElementSet.from_bytes(setup_tests().setup_catalog().encode('ascii'))
+        index = np.arange(500) % 3
+        element_set = ElementSet(data=sample.data[index], titles=sample.titles[index])
+        d = Draw()
+        satellites_artist, orbits = d.draw_catalog(element_set, time=np.datetime64('2019-03-04T00:00'), max_labels=10, show=False)
+        d.fig.canvas.draw()
+        self.assertEqual(len(d.ax.collections), 3)
+        self.assertEqual(len(orbits.get_segments()), 500)
+        self.assertEqual(len(satellites_artist.get_offsets()), 500)
+        self.assertEqual(len(d.ax.texts), 10 + 4)
+    #77
+    def test_label_indices(self):
+        '''This test is for the Draw().label_indices() method and checks that the labels are spread evenly over the catalog
+        and never exceed the number of satellites.'''
+        from spaceman3D.Draw import Draw
+        d = Draw()
+        self.assertEqual(list(d.label_indices(100, 5)), [0, 25, 50, 74, 99])
+        self.assertEqual(list(d.label_indices(3, 20)), [0, 1, 2])
+        self.assertEqual(len(d.label_indices(100, 0)), 0)
+
+################ Orbit geometry #################
+    #78
+    def test_body_mesh_cache(self):
+        '''This test is for the body_mesh() function and checks that the mesh of a body is built once per resolution, has the
+        radius of the body, and cannot be modified, and that Draw().plot_earth() uses the cached mesh of a sphere of its radius.'''
+        from spaceman3D.Draw.draw import body_mesh
+        x, y, z = body_mesh('Earth', 50)
+        self.assertIs(body_mesh('Earth', 50)[0], x)
+        self.assertIsNot(body_mesh('Earth', 60)[0], x)
+        self.assertEqual(x.shape, (50, 50))
+        self.assertTrue(np.allclose(np.sqrt(x**2 + y**2 + z**2), objects['Earth']['radius']))
+        with self.assertRaises(ValueError):
+            x[0, 0] = 0
+        from spaceman3D.Draw import Draw
+        self.assertIs(Draw().plot_earth(1000.0)[0], body_mesh(radius=1000.0)[0])
+        self.assertTrue(np.allclose(np.sqrt(sum(coordinates**2 for coordinates in Draw().plot_earth(1000.0))), 1000.0))
+    #79
+    def test_define_orbit_matches_propagator(self):
+        '''This test is for the Draw().define_orbit() method and checks that a satellite's point, at its true anomaly, is the
+        position returned by the Propagator for the same time, and pins the orientation of two known orbits.'''
+        from spaceman3D.Draw import Draw
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        true_anomaly = o.anomoly_calc(1000.0, since_epoch=True)
+        point = Draw().define_orbit(o.semi_major_axis_calc(), o.eccentricity, o.inclination, o.right_ascension, o.argument_periapsis,
+                                    units.degree_to_radian(true_anomaly))
+        self.assertEqual(point.shape, (3, 1))
+        position = Propagator(satellites.ISS).propagate(1000.0, since_epoch=True, velocity=False)[0, 0]
+        self.assertTrue(np.allclose(point[:, 0], position, rtol=0, atol=1e-6))
+        # A polar orbit with its ascending node on the y axis crosses the y axis, and is over the north pole a quarter orbit later.
+        points = Draw().define_orbit(7000, 0, 90, 90, 0, np.radians([0, 90]))
+        self.assertTrue(np.allclose(points, [[0, 0], [7000, 0], [0, 7000]], rtol=0, atol=1e-9))
+        # In an equatorial orbit, the right ascension and the argument of periapsis add up.
+        points = Draw().define_orbit(7000, 0, 0, 30, 60, 0.0)
+        self.assertTrue(np.allclose(points[:, 0], [0, 7000, 0], rtol=0, atol=1e-9))
+    #80
+    def test_orbit_geometry_adaptive(self):
+        '''This test is for the orbit_geometry() function and checks that the adaptive points lie on the orbit ellipse, and
+        are closer together at the perigee of an eccentric orbit than evenly spaced true anomalies are.'''
+        from spaceman3D.Orbit.propagator import orbit_geometry, rotation_matrices
+        rotation = rotation_matrices(np.radians([63.4, 0.0]), np.radians([30.0, 0.0]), np.radians([270.0, 0.0]))
+        a, e = np.array([26600.0, 42164.0]), np.array([0.7, 0.0])
+        adaptive = orbit_geometry(a, e, rotation, samples=361)
+        uniform = orbit_geometry(a, e, rotation, samples=361, adaptive=False)
+        self.assertEqual(adaptive.shape, (2, 361, 3))
+        radius = np.linalg.norm(adaptive, axis=-1)
+        self.assertAlmostEqual(radius[0].min(), a[0]*(1 - e[0]), places=6)
+        self.assertAlmostEqual(radius[0].max(), a[0]*(1 + e[0]), delta=1.0)
+        self.assertTrue(np.allclose(adaptive[0, 0], adaptive[0, -1]))
+        spacing = lambda points: np.linalg.norm(points[1] - points[0])
+        self.assertLess(spacing(adaptive[0]), spacing(uniform[0])/2)
+        self.assertTrue(np.allclose(adaptive[1], uniform[1]))
+
+################ Renderer() #################
+    #81
+    def test_renderer_buffers(self):
+        '''This test is for the Renderer().thumbnails() method and checks that one PNG is rendered into an in-memory buffer per
+        satellite, and that the figure is reused between frames.'''
+        from spaceman3D.Draw import Renderer
+        renderer = Renderer(size=(2, 2), dpi=50)
+        buffers = renderer.thumbnails([satellites.ISS, satellites.chinasat], time=np.datetime64('2019-03-04T00:00'))
+        figure = renderer.fig
+        self.assertEqual(len(buffers), 2)
+        self.assertTrue(all(buffer.getvalue().startswith(b'\x89PNG') for buffer in buffers))
+        renderer.thumbnails(satellites.Dragon, time=np.datetime64('2019-03-04T00:00'))
+        self.assertIs(renderer.fig, figure)
+        self.assertEqual(len(renderer.ax.collections), 2)
+    #82
+    def test_renderer_files_workers(self):
+        '''This test is for the Renderer().time_series() method and checks that the frames of a time series are written to SVG
+        files named in time order when they are rendered by a process pool.'''
+        import os, tempfile
+        from spaceman3D.Draw import Renderer
+        times = np.arange('2019-03-04T00:00', '2019-03-04T00:40', 10, dtype='datetime64[m]')
+        with tempfile.TemporaryDirectory() as directory:
+            paths = Renderer(format='svg', size=(2, 2)).time_series([satellites.ISS, satellites.Dragon], times, directory=directory, workers=2)
+            self.assertEqual([os.path.basename(path) for path in paths], ['000000.svg', '000001.svg', '000002.svg', '000003.svg'])
+            for path in paths:
+                with open(path, 'rb') as frame:
+                    self.assertIn(b'<svg', frame.read())
+
+################ Ground track #################
+    #83
+    def test_gmst_eci_to_ecef(self):
+        '''This test is for the gmst() and eci_to_ecef() functions and checks the sidereal time at the J2000 epoch, and that a
+        position on the x-axis is rotated by minus the sidereal time into the Earth-fixed frame.'''
+        j2000 = np.datetime64('2000-01-01T12:00')
+        self.assertAlmostEqual(units.radian_to_degree(gmst(j2000)), 280.46061837, places=6)
+        self.assertAlmostEqual(units.datetime64_to_julian(j2000), 2451545.0)
+        ecef = eci_to_ecef([7000.0, 0.0, 100.0], j2000)
+        self.assertAlmostEqual(np.degrees(np.arctan2(ecef[1], ecef[0])) % 360, 360 - 280.46061837, places=6)
+        self.assertAlmostEqual(np.linalg.norm(ecef), np.hypot(7000.0, 100.0), places=9)
+    #84
+    def test_geodetic_roundtrip(self):
+        '''This test is for the geodetic_to_ecef() and ecef_to_geodetic() functions and checks that geodetic coordinates,
+        including the poles and the antimeridian, survive a roundtrip through the Earth-fixed frame.'''
+        latitude, longitude, altitude = [45.0, -33.3, 90.0, -90.0, 0.0], [10.0, 179.9, 0.0, 20.0, -180.0], [0.5, 400.0, 1.0, 3.0, 35786.0]
+        ecef = geodetic_to_ecef(latitude, longitude, altitude)
+        self.assertAlmostEqual(ecef[0, 2], 4487.702, places=3)
+        result = ecef_to_geodetic(ecef)
+        self.assertTrue(np.allclose(result[0], latitude, atol=1e-9))
+        self.assertTrue(np.allclose(result[1][:2], longitude[:2], atol=1e-9))
+        self.assertEqual(result[1][4], -180.0)
+        self.assertTrue(np.allclose(result[2], altitude, atol=1e-6))
+    #85
+    def test_ground_track(self):
+        '''This test is for the ground_track() function and checks that the sub-satellite points of the ISS over an orbit stay
+        within its inclination at a low Earth orbit altitude, that the result has one row per satellite, and that a Propagator
+        can be passed in place of the elements.'''
+        times = np.arange('2008-09-20T12:00', '2008-09-20T13:40', 1, dtype='datetime64[m]')
+        latitude, longitude, altitude = ground_track([satellites.ISS, satellites.Dragon], times)
+        self.assertEqual(latitude.shape, (2, 100))
+        self.assertLess(np.abs(latitude[0]).max(), 52.0)
+        self.assertGreater(np.abs(latitude[0]).max(), 51.0)
+        self.assertTrue(np.all((longitude >= -180) & (longitude < 180)))
+        self.assertTrue(np.all((altitude[0] > 300) & (altitude[0] < 420)))
+        propagator = Propagator([satellites.ISS, satellites.Dragon], backend='sgp4')
+        self.assertTrue(np.array_equal(ground_track(propagator, times)[0], latitude))
+    #86
+    def test_draw_ground_track(self):
+        '''This test is for the Draw().draw_ground_track() method and checks that the tracks of a catalog are drawn as a single
+        line, broken by NaN points between the satellites and where the tracks wrap around the antimeridian.'''
+        from spaceman3D.Draw import Draw
+        d = Draw()
+        x, y = d.ground_track_lines([[0, 1, 2], [3, 4, 5]], [[170, 179, -179], [10, 20, 30]])
+        self.assertTrue(np.array_equal(x, [170, 179, np.nan, -179, np.nan, 10, 20, 30, np.nan], equal_nan=True))
+        self.assertTrue(np.array_equal(y, [0, 1, np.nan, 2, np.nan, 3, 4, 5, np.nan], equal_nan=True))
+        times = np.arange('2019-03-04T00:00', '2019-03-04T03:00', 2, dtype='datetime64[m]')
+        tracks = d.draw_ground_track([satellites.ISS, satellites.Dragon, satellites.chinasat], times, show=False)
+        self.assertEqual(len(d.track_ax.lines), 2)
+        self.assertEqual(np.count_nonzero(~np.isnan(tracks.get_xdata())), 3*len(times))
+
+################ Conjunctions #################
+    #87
+    def test_grid_pairs(self):
+        '''This test is for the grid_pairs() function and checks that the grid hash finds exactly the same close pairs at each
+        time step as comparing every pair, and that points that are not finite are skipped.'''
+        positions = np.random.default_rng(1).uniform(-100, 100, (300, 4, 3))
+        positions[7, 2] = np.nan
+        first, second, steps, separation = grid_pairs(positions, 8.0)
+        distances = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+        upper = np.arange(300)[:, None, None] < np.arange(300)[None, :, None]
+        expected = set(zip(*np.nonzero((distances <= 8.0) & upper)))
+        self.assertEqual(set(zip(first, second, steps)), expected)
+        self.assertTrue(np.all(first < second))
+        self.assertTrue(np.allclose(separation, distances[first, second, steps]))
+        groups = np.arange(300) % 3
+        first, second, steps, separation = grid_pairs(positions, 8.0, groups)
+        self.assertEqual(set(zip(first, second, steps)), {pair for pair in expected if groups[pair[0]] == groups[pair[1]]})
+    #88
+    def test_conjunction_prefilters(self):
+        '''This test is for the apsis_filter() and plane_filter() functions and checks that satellites whose altitudes never
+        overlap are left out, and that crossing orbits are only kept if they are at the same radius where their planes cross.'''
+        from spaceman3D.Orbit.propagator import rotation_matrices
+        mask = apsis_filter([6700, 6745, 42164, 6790], [6740, 6800, 42166, 9000], 10.0)
+        self.assertFalse(apsis_filter([6700, 6750], [6720, 6800], 10.0).any())
+        self.assertEqual(mask.tolist(), [True, True, False, True])
+        buckets = apsis_buckets([6700, 42160, 6745, 42164, 20000], [6740, 42170, 6800, 42166, 20010], 10.0)
+        self.assertEqual((buckets[0], buckets[1], buckets[4]), (buckets[2], buckets[3], -1))
+        self.assertNotEqual(buckets[0], buckets[1])
+        rotation = rotation_matrices(np.radians([0.0, 45.0, 45.0]), np.zeros(3), np.radians([0.0, 90.0, 90.0]))
+        semi_major_axis, eccentricity = np.array([7000.0, 8000.0, 7000.0]), np.array([0.0, 0.2, 0.0])
+        passed = plane_filter([0, 0], [1, 2], semi_major_axis, eccentricity, rotation, 30.0)
+        self.assertEqual(passed.tolist(), [False, True])
+    #89
+    def test_conjunction_screen(self):
+        '''This test is for the ConjunctionScreen().screen() method and checks that two satellites crossing the same node at
+        the same time are found, with the time of closest approach and the miss distance refined, while a geostationary satellite
+        is left out by the apogee/perigee prefilter, and orbits that cross at different radii by the orbit-plane prefilter.'''
+        elements = Propagator([satellites.ISS, satellites.ISS, satellites.chinasat]).elements
+        data = elements.data.copy()
+        data['inclination'][1] = 60.0
+        data['argument_periapsis'][:2], data['mean_anomaly'][:2] = 0.0, 0.0
+        elements = ElementSet(data=data, titles=elements.titles)
+        epoch = elements.epoch_datetime64()[0]
+        screen = ConjunctionScreen(elements, threshold=10.0, backend='kepler')
+        self.assertEqual(screen.candidates().tolist(), [0, 1])
+        conjunctions = screen.screen(epoch - np.timedelta64(10, 'm'), epoch + np.timedelta64(60, 'm'))
+        self.assertEqual(len(conjunctions), 2)
+        self.assertEqual((conjunctions['primary'][0], conjunctions['secondary'][0]), (0, 1))
+        self.assertLess(abs((conjunctions['time'][0] - epoch) / np.timedelta64(1, 's')), 1e-3)
+        self.assertLess(conjunctions['miss_distance'].max(), 1e-6)
+        self.assertAlmostEqual(conjunctions['relative_speed'][0], 1.1224, places=3)
+        conjunctions = ConjunctionScreen(elements, threshold=10.0).screen(epoch - np.timedelta64(10, 'm'), epoch + np.timedelta64(10, 'm'))
+        self.assertEqual(len(conjunctions), 1)
+        self.assertLess(conjunctions['miss_distance'][0], 10.0)
+        # An eccentric orbit crossing the node of a circular one at the same time, but 97 km higher, only fails the plane prefilter.
+        data = data[:2].copy()
+        semi_major_axis, eccentricity = np.array([7000.0, 7100.0]), np.array([0.0, 0.02])
+        eccentric_anomaly = 2*np.arctan(np.sqrt((1 - eccentricity[1])/(1 + eccentricity[1]))*np.tan(np.radians(-45.0)))
+        data['mean_motion'] = np.sqrt(objects['Earth']['standard_gravitational_parameter']/semi_major_axis**3)*86400/(2*np.pi)
+        data['eccentricity'], data['inclination'], data['argument_periapsis'] = eccentricity, [0.0, 60.0], [0.0, 90.0]
+        data['mean_anomaly'] = [0.0, np.degrees(np.remainder(eccentric_anomaly - eccentricity[1]*np.sin(eccentric_anomaly), 2*np.pi))]
+        screen = ConjunctionScreen(ElementSet(data=data, titles=elements.titles[:2]), threshold=10.0, backend='kepler')
+        self.assertEqual(screen.candidates().tolist(), [0, 1])
+        self.assertEqual(len(screen.encounters(epoch - np.timedelta64(60, 's'), np.arange(0, 120, 20.0))[0]), 0)
+
+################ Passes #################
+    #90
+    def test_look_angles(self):
+        '''This test is for the look_angles() function and checks the azimuth, elevation and range of a point straight above
+        a station, and of a point due east of it on its horizon.'''
+        zenith = geodetic_to_ecef(45.0, 10.0, 500.0)
+        azimuth, elevation, distance = look_angles(zenith, 45.0, 10.0, 0.0)
+        self.assertAlmostEqual(elevation, 90.0, places=6)
+        self.assertAlmostEqual(distance, 500.0, places=6)
+        station = geodetic_to_ecef(0.0, 0.0, 0.0)
+        azimuth, elevation, distance = look_angles(station + np.array([0.0, 1000.0, 0.0]), 0.0, 0.0, 0.0)
+        self.assertAlmostEqual(azimuth, 90.0, places=6)
+        self.assertAlmostEqual(elevation, 0.0, places=6)
+    #91
+    def test_pass_predictor(self):
+        '''This test is for the PassPredictor().predict() method and checks that the rises and sets of the ISS over a station
+        match those found by sampling its elevation every second, and that the culmination is the highest point of each pass.'''
+        start = np.datetime64('2008-09-20T18:00')
+        predictor = PassPredictor(satellites.ISS, [(51.48, 0.0, 0.05)], min_elevation=10.0)
+        passes = predictor.predict(start, start + np.timedelta64(8, 'h'))
+        times = start + np.arange(0, 8*3600, 1).astype('timedelta64[s]')
+        ecef = eci_to_ecef(predictor.propagator.propagate(times, velocity=False), times)
+        elevation = look_angles(ecef, 51.48, 0.0, 0.05)[1][0]
+        edges = times[1:][np.diff((elevation > 10.0).astype(int)) != 0]
+        self.assertEqual(len(passes), len(edges) // 2)
+        self.assertTrue(np.all(np.abs((passes['rise'] - edges[0::2]) / np.timedelta64(1, 's')) < 1.0))
+        self.assertTrue(np.all(np.abs((passes['set'] - edges[1::2]) / np.timedelta64(1, 's')) < 1.0))
+        self.assertTrue(np.all((passes['rise'] < passes['culmination']) & (passes['culmination'] < passes['set'])))
+        for rise, set_, max_elevation in zip(edges[0::2], edges[1::2], passes['max_elevation']):
+            highest = elevation[(times >= rise) & (times <= set_)].max()
+            self.assertTrue(highest - 1e-6 <= max_elevation < highest + 0.5)
+    #92
+    def test_pass_predictor_workers(self):
+        '''This test is for the PassPredictor().predict() method and checks that splitting the stations across worker processes
+        gives the same passes, and that a geostationary pass that never ends has no rise or set.'''
+        start = np.datetime64('2019-03-04T00:00')
+        stations = [(51.48, 0.0, 0.05), (0.0, 130.0, 0.0), (-33.9, 151.2, 0.0)]
+        predictor = PassPredictor([satellites.Dragon, satellites.chinasat], stations, backend='kepler')
+        passes = predictor.predict(start, start + np.timedelta64(6, 'h'))
+        parallel = predictor.predict(start, start + np.timedelta64(6, 'h'), workers=2)
+        self.assertEqual(passes.tolist(), parallel.tolist())
+        geostationary = passes[(passes['station'] == 1) & (passes['satellite'] == 1)]
+        self.assertEqual(len(geostationary), 1)
+        self.assertTrue(np.isnat(geostationary['rise'][0]) and np.isnat(geostationary['set'][0]))
+        self.assertGreater(geostationary['max_elevation'][0], 89.0)
+
+################ Epochs #################
+    #93
+    def test_epoch_julian(self):
+        '''This test is for the epoch_to_julian() and julian_to_datetime64() functions and checks that the Julian dates of the
+        epochs of a catalog agree with their datetime64 epochs, across both centuries of the two digit epoch years.'''
+        elements = Propagator([satellites.ISS, satellites.Dragon, satellites.chinasat]).elements
+        julian = elements.epoch_julian()
+        self.assertAlmostEqual(julian[0], 2454730.01782528, places=8)
+        self.assertTrue(np.allclose(julian, units.datetime64_to_julian(elements.epoch_datetime64()), rtol=0, atol=1e-9))
+        self.assertEqual(units.epoch_to_julian(2000, 1.5), 2451545.0)
+        self.assertEqual(units.epoch_to_julian(1970, 1.0), 2440587.5)
+        self.assertEqual(units.epoch_to_julian(units.full_epoch_year(99), 1.0), 2451179.5)
+        errors = (units.julian_to_datetime64(julian) - elements.epoch_datetime64()) / np.timedelta64(1, 's')
+        self.assertLess(np.abs(errors).max(), 1e-4)
+    #94
+    def test_epoch_datetime64_cache(self):
+        '''This test is for the epoch_datetime64 of the TLERecord and Orbital classes and checks that the record carries the same
+        epoch as the ElementSet, and that the cached epoch of an Orbital follows a new epoch_date.'''
+        from datetime import datetime, timedelta
+        import pytz as tz
+        record = TLE().tle_record(satellites.ISS)
+        self.assertEqual(record.epoch_datetime64, Propagator(satellites.ISS).epochs[0])
+        o = Orbital()
+        o.import_tle(satellites.ISS)
+        self.assertEqual(o.seconds_since_epoch(record.epoch_datetime64 + np.timedelta64(90, 's')), 90.0)
+        o.epoch_date = datetime(2008, 9, 20, tzinfo=tz.utc)
+        self.assertEqual(o.seconds_since_epoch(datetime(2008, 9, 20, tzinfo=tz.utc) + timedelta(seconds=30)), 30.0)
+
+################ validate_bytes() #################
+    #95
+    def test_validate_bytes(self):
+        '''This test is for the validate_bytes() function and checks that each kind of invalid TLE in a catalog is flagged with
+        its error code, and that a TLE line without a partner is reported as missing a line.'''
+        lines = '\n'.join(tle.strip('\n') for tle in (satellites.ISS, satellites.Dragon, satellites.chinasat)).split('\n')
+        lines[1] = lines[1][:-1] + str((int(lines[1][-1]) + 1) % 10)
+        lines[5] = '3' + lines[5][1:]
+        lines[8] = lines[8][:2] + '43921' + lines[8][7:]
+        catalog = '\r\n'.join(lines + ['EXTRA', lines[2]]).encode('ascii')
+        valid, errors, numbers = validate_bytes(catalog)
+        self.assertEqual(valid.tolist(), [False, False, False, False])
+        self.assertEqual(errors.tolist(), [TLE_ERROR_CHECKSUM_LINE1, TLE_ERROR_LINE_NUMBER | TLE_ERROR_CHECKSUM_LINE2,
+                                           TLE_ERROR_SATELLITE_NUMBER | TLE_ERROR_CHECKSUM_LINE2, TLE_ERROR_MISSING_LINE])
+        self.assertEqual(numbers.tolist(), [25544, 39115, 43920, 25544])
+        self.assertEqual(len(validate_bytes(b'')[0]), 0)
+    #96
+    def test_validate_bytes_matches_check_valid_tle(self):
+        '''This test is for the validate_bytes() function and checks that it agrees with the TLE().check_valid_tle() method on
+        randomly corrupted TLEs, and that the validate option of ElementSet.from_bytes() leaves out the invalid ones.'''
+        rng = np.random.default_rng(0)
+        line1, line2 = satellites.ISS.strip('\n').split('\n')[1:]
+        tles = []
+        for i in range(200):
+            lines = [list(line1), list(line2)]
+            for change in range(rng.integers(0, 3)):
+                lines[rng.integers(0, 2)][rng.integers(0, 69)] = rng.choice(list('0123456789 -+.'))
+            tles.append('ISS (ZARYA)\n' + ''.join(lines[0]) + '\n' + ''.join(lines[1]))
+        valid = validate_bytes('\n'.join(tles).encode('ascii'))[0]
+        self.assertEqual(len(valid), 200)
+        self.assertEqual(valid.tolist(), [TLE().check_valid_tle(tle) for tle in tles])
+        element_set = ElementSet.from_bytes('\n'.join(tles).encode('ascii'), validate=True)
+        self.assertEqual(len(element_set), valid.sum())
+
+################ ElementArchive() #################
+    #97
+    def test_archive_append(self):
+        '''This test is for the ElementArchive().append() method and checks that element sets are stored with their titles, that
+        element sets already in the archive are skipped, that a reopened archive reads the same records, and that the index segments
+        of the appends are merged by the compact() method.'''
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            archive = ElementArchive(directory)
+            self.assertEqual(archive.append([satellites.ISS, satellites.Dragon]), 2)
+            self.assertEqual(archive.append([satellites.ISS, satellites.chinasat, satellites.chinasat]), 1)
+            self.assertEqual(archive.append(satellites.ISS), 0)
+            reopened = ElementArchive(directory)
+            self.assertEqual(len(reopened), 3)
+            self.assertEqual(reopened.satellite_numbers().tolist(), [25544, 39115, 43920])
+            self.assertEqual(reopened.satellite(39115).titles.tolist(), ['DRAGON CRS-2'])
+            expected = Propagator([satellites.ISS, satellites.Dragon, satellites.chinasat]).elements.data
+            self.assertEqual(reopened.records.tolist(), expected.tolist())
+            self.assertIsInstance(reopened.records, np.memmap)
+            self.assertEqual(reopened.segments, [(0, 2), (2, 3)])
+            reopened.compact()
+            self.assertEqual(ElementArchive(directory).segments, [(0, 3)])
+            self.assertEqual(sorted(name for name in os.listdir(directory) if name.startswith('index')), ['index-0-3.bin'])
+            self.assertEqual(reopened.index['satellite_number'].tolist(), [25544, 39115, 43920])
+    #98
+    def test_archive_lookup(self):
+        '''This test is for the ElementArchive().satellite() and between() methods and checks that the history of a satellite,
+        and an epoch range across satellites, are loaded sorted by epoch from several appends, across several index segments.'''
+        import tempfile
+        sample = Propagator([satellites.ISS, satellites.Dragon]).elements
+        with tempfile.TemporaryDirectory() as directory:
+            archive = ElementArchive(directory)
+            for week in (3, 0, 2, 1):
+                data = sample.data.copy()
+                data['epoch_year'], data['epoch'] = 2010, 1.0 + 7*week
+                archive.append(ElementSet(data=data, titles=sample.titles))
+                if week == 2:
+                    # The third append gets a segment of its own, which the fourth is merged into along with the first segment.
+                    self.assertEqual(archive.segments, [(0, 4), (4, 6)])
+                    self.assertEqual(archive.satellite(25544).epoch_datetime64().tolist(), sorted(archive.satellite(25544).epoch_datetime64().tolist()))
+                    self.assertEqual(len(archive.satellite(25544)), 3)
+                    self.assertEqual(archive.append(ElementSet(data=data, titles=sample.titles)), 0)
+            self.assertEqual(archive.segments, [(0, 8)])
+            history = archive.satellite(25544)
+            self.assertEqual(len(history), 4)
+            self.assertTrue(np.all(np.diff(history.epoch_datetime64()) == np.timedelta64(7, 'D')))
+            history = archive.satellite(25544, start=np.datetime64('2010-01-08'), stop=np.datetime64('2010-01-22'))
+            self.assertEqual(history.epoch_datetime64().tolist(), [np.datetime64('2010-01-08', 'ns').item(), np.datetime64('2010-01-15', 'ns').item()])
+            week = archive.between(np.datetime64('2010-01-08'), np.datetime64('2010-01-15'))
+            self.assertEqual(sorted(week['satellite_number'].tolist()), [25544, 39115])
+            self.assertEqual(len(archive.satellite(99999)), 0)
+
+################ Element History #################
+
+    def history_sample(self):
+        sample = Propagator([satellites.ISS, satellites.Dragon]).elements
+        weeks = []
+        for week in (2, 0, 3, 1):
+            data = sample.data.copy()
+            data['epoch_year'], data['epoch'] = 2008, 250.0 + 7*week
+            weeks.append(ElementSet(data=data, titles=sample.titles))
+        return ElementSet(data=np.concatenate([week.data for week in weeks]), titles=np.concatenate([week.titles for week in weeks]))
+
+    #99
+    def test_history_select(self):
+        '''This test is for the ElementHistory().select() method and checks that each time selects the element set of the satellite
+        with the latest epoch at or before it, and the first element set for times before the history.'''
+        history = ElementHistory(self.history_sample())
+        self.assertEqual(history.satellite_numbers.tolist(), [25544, 39115])
+        self.assertTrue(np.all(np.diff(history.epochs[:4]) == np.timedelta64(7, 'D')))
+        start = units.epoch_to_datetime64(2008, 250.0)
+        times = start + np.array([-3, 0, 1, 7, 13, 14, 30], dtype='timedelta64[D]')
+        selected = history.select(times)
+        self.assertEqual(selected.shape, (2, 7))
+        self.assertEqual(selected[0].tolist(), [0, 0, 0, 1, 1, 2, 3])
+        self.assertEqual(selected[1].tolist(), [4, 4, 4, 5, 5, 6, 7])
+        self.assertTrue(np.all(history.elements['satellite_number'][selected[1]] == 39115))
+        self.assertEqual(history.select(times, 39115).tolist(), [selected[1].tolist()])
+
+    #100
+    def test_history_propagate(self):
+        '''This test is for the ElementHistory().propagate() method and checks that the batched propagation matches propagating the
+        selected element set of each satellite to each time on its own, and that histories load from an ElementArchive.'''
+        import tempfile
+        history = ElementHistory(self.history_sample())
+        times = units.epoch_to_datetime64(2008, 249.0) + np.arange(0, 30*86400, 7919, dtype=np.int64).astype('timedelta64[s]')
+        positions, velocities = history.propagate(times)
+        self.assertEqual(positions.shape, (2, len(times), 3))
+        selected = history.select(times)
+        for row in range(2):
+            for column in range(0, len(times), 37):
+                element = history.elements[int(selected[row, column])]
+                expected, expected_velocity = Propagator(element, backend='sgp4').propagate(np.array([times[column]]))
+                self.assertTrue(np.allclose(positions[row, column], expected[0, 0], atol=1e-6))
+                self.assertTrue(np.allclose(velocities[row, column], expected_velocity[0, 0], atol=1e-9))
+        with tempfile.TemporaryDirectory() as directory:
+            archive = ElementArchive(directory)
+            archive.append(self.history_sample())
+            loaded = ElementHistory.from_archive(archive, [25544], start=units.epoch_to_datetime64(2008, 260.0))
+            self.assertEqual(len(loaded), 3)
+            self.assertEqual(loaded.epochs[0], units.epoch_to_datetime64(2008, 257.0))
+            self.assertTrue(np.allclose(loaded.propagate(times[-5:], velocity=False), positions[:1, -5:]))
+
+################ Catalog #################
+
+    def reissue(self, tle, element_set_number, epoch):
+        title, line1, line2 = tle.split('\n')
+        line1 = line1[:20] + f'{epoch:012.8f}' + line1[32:64] + f'{element_set_number:4d}' + line1[68:]
+        return '\n'.join((title, line1[:68] + TLE().tle_checksum_algortithm(line1), line2))
+
+    #101
+    def test_catalog_refresh(self):
+        '''This test is for the Catalog().refresh() method and checks that only the new and changed TLEs are parsed, that the added,
+        updated and removed satellites are reported, and that the element sets and Orbitals of unchanged satellites are kept.'''
+        catalog = Catalog()
+        first = '\n'.join((satellites.ISS, satellites.Dragon, satellites.chinasat))
+        self.assertEqual(catalog.refresh(first.encode()).tolist(), sorted(catalog.satellite_numbers.tolist()))
+        self.assertEqual((len(catalog), catalog.parsed), (3, 3))
+        chinasat = int(catalog.satellite_numbers[catalog.elements.titles == 'CHINASAT 2D'][0])
+        iss, unchanged = catalog.orbital(25544), catalog.orbital(chinasat)
+        before = iss.semi_major_axis_calc()
+        self.assertEqual(catalog.refresh(first.encode()).tolist(), [])
+        self.assertEqual(catalog.parsed, 0)
+
+        iss_tle = self.reissue(satellites.ISS, 293, 264.75)
+        second = '\r\n'.join((satellites.chinasat, iss_tle, satellites.Dragon_Demo))
+        changed = catalog.refresh(second.encode())
+        self.assertEqual(catalog.parsed, 2)
+        self.assertEqual(catalog.updated.tolist(), [25544])
+        self.assertEqual(catalog.removed.tolist(), [39115])
+        self.assertEqual(len(catalog.added), 1)
+        self.assertEqual(changed.tolist(), sorted([25544, 39115, int(catalog.added[0])]))
+        expected = ElementSet.from_records(TLE().tle_record(tle) for tle in (satellites.chinasat, iss_tle, satellites.Dragon_Demo))
+        expected = expected[np.argsort(expected['satellite_number'])]
+        self.assertTrue(np.array_equal(catalog.elements.data, expected.data))
+        self.assertEqual(catalog.elements.titles.tolist(), expected.titles.tolist())
+        self.assertEqual(catalog.keys['element_set_number'][catalog.index(25544)].tolist(), [293])
+        self.assertIs(catalog.orbital(25544), iss)
+        self.assertIs(catalog.orbital(chinasat), unchanged)
+        self.assertEqual(catalog.orbital(25544).semi_major_axis_calc(), before)
+        self.assertEqual(iss.epoch_date.hour, 18)
+        self.assertNotIn(39115, catalog)
+
+    #102
+    def test_catalog_refresh_errors(self):
+        '''This test is for the Catalog().refresh() method and checks that a satellite whose new TLE fails the validity checks keeps
+        its previous element set, that an invalid new satellite is left out, and that the latest of repeated TLEs is used.'''
+        catalog = Catalog()
+        catalog.refresh(satellites.ISS.encode())
+        broken = self.reissue(satellites.ISS, 300, 265.0)
+        broken = broken[:-1] + str((int(broken[-1]) + 1) % 10)
+        dragon = satellites.Dragon[:-1] + str((int(satellites.Dragon[-1]) + 1) % 10)
+        self.assertEqual(catalog.refresh('\n'.join((broken, dragon)).encode()).tolist(), [])
+        self.assertEqual(len(catalog.errors), 2)
+        self.assertEqual(catalog.keys['element_set_number'].tolist(), [292])
+        self.assertEqual(catalog.satellite_numbers.tolist(), [25544])
+        catalog.refresh('\n'.join((broken, dragon)).encode())
+        self.assertEqual(len(catalog.errors), 2)
+        latest = self.reissue(satellites.ISS, 301, 266.0)
+        catalog.refresh('\n'.join((latest, self.reissue(satellites.ISS, 299, 265.5))).encode())
+        self.assertEqual(catalog.updated.tolist(), [25544])
+        self.assertEqual(catalog.keys['element_set_number'].tolist(), [301])
+        self.assertAlmostEqual(float(catalog.elements['epoch'][0]), 266.0)
+        self.assertEqual(catalog.errors, [])
+
+################ Ingestion #################
+
+    #103
+    def test_fetcher_conditional_requests(self):
+        '''This test is for the CatalogFetcher().fetch_all() method and checks that the groups are downloaded concurrently over
+        reused connections, that the next download is answered from the cache after a 304 (Not Modified) response, and that a
+        request on a broken pooled connection is retried on a new one.'''
+        import http.client
+        import socket
+        import tempfile
+        groups = {'stations': '\n'.join((satellites.ISS, satellites.Dragon)).encode(), 'geo': satellites.chinasat.encode()}
+        with StandInServer(groups) as server, tempfile.TemporaryDirectory() as directory:
+            with CatalogFetcher(url=server.url, cache=directory, connections=2) as fetcher:
+                self.assertEqual(fetcher.fetch_all(['stations', 'geo']), groups)
+                self.assertEqual(fetcher.status, {'stations': 'fetched', 'geo': 'fetched'})
+                for repeat in range(3):
+                    self.assertEqual(fetcher.fetch_all(['stations', 'geo']), groups)
+                self.assertEqual(fetcher.status, {'stations': 'not modified', 'geo': 'not modified'})
+            self.assertEqual((server.requests, server.not_modified), (8, 6))
+            self.assertLessEqual(server.connections, 2)
+            with self.assertRaises(ConnectionError), CatalogFetcher(url=server.url) as fetcher:
+                fetcher.fetch('missing')
+            with CatalogFetcher(url=server.url) as fetcher:
+                closed = socket.socket()
+                closed.bind(('127.0.0.1', 0))
+                port = closed.getsockname()[1]
+                closed.close()
+                fetcher.pool.idle[('http', '127.0.0.1', server.server.server_address[1])] = [http.client.HTTPConnection('127.0.0.1', port)]
+                self.assertEqual(fetcher.fetch('geo'), groups['geo'])
+
+    #104
+    def test_fetcher_records(self):
+        '''This test is for the CatalogFetcher().records() method and checks that a downloaded group streams into TLERecords, that
+        an updated group is downloaded again, and that the cache on disk makes the requests of a new fetcher conditional.'''
+        import tempfile
+        with StandInServer({'stations': satellites.ISS.encode()}) as server, tempfile.TemporaryDirectory() as directory:
+            with CatalogFetcher(url=server.url, cache=directory) as fetcher:
+                self.assertEqual([record.satellite_number for record in fetcher.records('stations')], [25544])
+            fetcher = CatalogFetcher(url=server.url, cache=directory)
+            self.assertEqual(fetcher.fetch('stations'), satellites.ISS.encode())
+            self.assertEqual(fetcher.status['stations'], 'not modified')
+            server.update('stations', '\n'.join((satellites.ISS, satellites.Dragon_Demo)).encode())
+            records = list(fetcher.records('stations'))
+            self.assertEqual(fetcher.status['stations'], 'fetched')
+            self.assertEqual([record.title for record in records], ['ISS (ZARYA)', 'CREW DRAGON DEMO-1'])
+            catalog = Catalog()
+            catalog.refresh(fetcher.fetch('stations'))
+            self.assertEqual(len(catalog), 2)
+            fetcher.close()
+
 if __name__ == "__main__":
     unittest.main()